@@ -1,65 +1,137 @@
 import pandas as pd
 import os
 
-# 현재 스크립트가 있는 디렉토리 경로
-script_dir = os.path.dirname(os.path.abspath(__file__))
-output_dir = script_dir
+from CG_io import write_stage
+from CG_metrics import StageMetrics
+from CG_source_margin import margin_rates
+from CG_stage_cache import FORCE, StageCache, parse_stage_args
 
-print(f"결과 저장 위치: {output_dir}")
 
-# 파일 경로 설정
-input_file = '00_CG_eBay_active_listing_data.csv'
-output_file = '01_CG_eBay_active_listing_data_cleaned.csv'
+def delete_sku_prefix(sku: pd.Series) -> pd.Series:
+    """
+    'Custom label (SKU)' 값에서 첫 번째 콜론(:) 앞의 접두사 제거
 
-input_path = os.path.join(output_dir, input_file)
-output_path = os.path.join(output_dir, output_file)
+    Args:
+        sku: 'Custom label (SKU)' 컬럼
 
-print(f"\n{'=' * 50}")
-print("CSV 파일 처리 중...")
-print(f"{'=' * 50}")
+    Returns:
+        접두사가 제거된 SKU 컬럼 (빈 값은 '')
+    """
+    # 문자열로 변환 후 첫 번째 콜론 기준으로 split하여 뒤쪽만 남김
+    cleaned = sku.astype(str).str.split(':', n=1).str[-1]
 
-# CSV 파일 읽기
-print(f"\n1. CSV 파일 읽는 중: {input_path}")
-df = pd.read_csv(input_path, encoding='utf-8-sig')
-print(f"   총 {len(df):,}개 행")
-print(f"   컬럼: {df.columns.tolist()}")
+    # 빈 문자열이나 'nan'을 빈 값으로 처리
+    return cleaned.replace('nan', '').fillna('')
 
-# 'Custom label (SKU)' 컬럼에서 접두사 제거 (콜론 기준)
-if 'Custom label (SKU)' in df.columns:
-    print(f"\n2. 'Custom label (SKU)' 컬럼에서 접두사 제거 중 (: 기준)...")
 
-    # 처리 전 샘플 확인
-    print(f"\n   처리 전 샘플 (처음 10개):")
-    print(df[['Item number', 'Custom label (SKU)']].head(10))
+def split_sku_source(sku: pd.Series) -> pd.Series:
+    """
+    'Custom label (SKU)' 값의 첫 번째 콜론(:) 앞 접두사(소싱 채널, 예: koibito / kream / gugus)
 
-    # 문자열로 변환 후 첫 번째 콜론 기준으로 split하여 뒤쪽만 남김
-    df['Custom label (SKU)'] = df['Custom label (SKU)'].astype(str).str.split(':', n=1).str[-1]
+    Args:
+        sku: 'Custom label (SKU)' 컬럼 (접두사 제거 전)
+
+    Returns:
+        소문자 source 컬럼 (category, 접두사가 없거나 빈 값은 NaN)
+    """
+    parts = sku.astype(str).str.partition(':')
+    source = parts[0].str.strip().str.lower().where((parts[1] == ':') & sku.notna())
+    return source.where(source != '').astype('category').rename('source')
+
+
+def add_source_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    SKU 접두사로 source / margin_rate 칼럼을 추가하고 SKU에서 접두사 제거
+
+    Args:
+        df: 'Custom label (SKU)' 컬럼이 있는 리스팅 DataFrame
+
+    Returns:
+        source(category), margin_rate(CG_source_margins.json 기준) 칼럼이 추가된 DataFrame
+    """
+    source = split_sku_source(df['Custom label (SKU)'])
+    df['Custom label (SKU)'] = delete_sku_prefix(df['Custom label (SKU)'])
+    df['source'] = source
+    df['margin_rate'] = margin_rates(source)
+    return df
+
+
+def main(force: bool = FORCE):
+    # 현재 스크립트가 있는 디렉토리 경로
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    output_dir = script_dir
+
+    print(f"결과 저장 위치: {output_dir}")
+
+    # 파일 경로 설정
+    input_file = '00_CG_eBay_active_listing_data.csv'
+    output_file = '01_CG_eBay_active_listing_data_cleaned'
 
-    # 빈 문자열이나 'nan'을 원래대로 유지 (또는 빈 값으로 처리)
-    df['Custom label (SKU)'] = df['Custom label (SKU)'].replace('nan', '')
+    input_path = os.path.join(output_dir, input_file)
+    output_path = os.path.join(output_dir, output_file)
 
-    print(f"\n   접두사 제거 완료")
-    print(f"   처리된 행 수: {len(df):,}")
+    print(f"\n{'=' * 50}")
+    print("CSV 파일 처리 중...")
+    print(f"{'=' * 50}")
 
-    # 처리 결과 샘플 확인
-    print(f"\n   처리 후 샘플 (처음 10개):")
-    print(df[['Item number', 'Custom label (SKU)']].head(10))
+    metrics = StageMetrics('00_delete_prefix')
+    # 입력 / 코드가 바뀌지 않았으면 이전 결과 사용 (--force로 다시 실행)
+    cache = StageCache('00_delete_prefix', [input_path], [output_path], force=force)
+    if cache.restore():
+        metrics.finish(cache_hit=True)
+        return
+    metrics.read_file(input_path)
 
-    # 콜론이 남아있는지 확인
-    remaining_colons = df['Custom label (SKU)'].astype(str).str.contains(':', na=False).sum()
-    if remaining_colons > 0:
-        print(f"\n   ℹ 참고: 콜론이 포함된 항목이 {remaining_colons}개 있습니다 (값 자체에 콜론 포함).")
+    # CSV 파일 읽기
+    print(f"\n1. CSV 파일 읽는 중: {input_path}")
+    df = pd.read_csv(input_path, encoding='utf-8-sig')
+    print(f"   총 {len(df):,}개 행")
+    print(f"   컬럼: {df.columns.tolist()}")
+
+    # 'Custom label (SKU)' 컬럼에서 접두사 제거 (콜론 기준)
+    if 'Custom label (SKU)' in df.columns:
+        print(f"\n2. 'Custom label (SKU)' 컬럼에서 접두사 제거 중 (: 기준)...")
+
+        # 처리 전 샘플 확인
+        print(f"\n   처리 전 샘플 (처음 10개):")
+        print(df[['Item number', 'Custom label (SKU)']].head(10))
+
+        # 접두사는 소싱 채널(source)로 남기고 마진율 표와 매칭
+        df = add_source_columns(df)
+
+        print(f"\n   접두사 제거 완료")
+        print(f"   처리된 행 수: {len(df):,}")
+        print(f"\n   source별 행 수 / 마진율:")
+        print(df.groupby('source', observed=True, dropna=False)['margin_rate'].agg(['size', 'first']).to_string())
+
+        # 처리 결과 샘플 확인
+        print(f"\n   처리 후 샘플 (처음 10개):")
+        print(df[['Item number', 'Custom label (SKU)']].head(10))
+
+        # 콜론이 남아있는지 확인
+        remaining_colons = df['Custom label (SKU)'].astype(str).str.contains(':', na=False).sum()
+        if remaining_colons > 0:
+            print(f"\n   ℹ 참고: 콜론이 포함된 항목이 {remaining_colons}개 있습니다 (값 자체에 콜론 포함).")
+        else:
+            print(f"\n   ✓ 모든 접두사가 제거되었습니다.")
     else:
-        print(f"\n   ✓ 모든 접두사가 제거되었습니다.")
-else:
-    print("'Custom label (SKU)' 컬럼을 찾을 수 없습니다.")
-    print(f"사용 가능한 컬럼: {df.columns.tolist()}")
-
-# 처리된 데이터를 새 CSV 파일로 저장
-print(f"\n3. 처리된 데이터 저장 중...")
-df.to_csv(output_path, index=False, encoding='utf-8-sig')
-print(f"   ✓ 처리된 데이터 저장 완료: {output_path}")
-
-print(f"\n{'=' * 50}")
-print("처리 완료!")
-print(f"{'=' * 50}")
+        print("'Custom label (SKU)' 컬럼을 찾을 수 없습니다.")
+        print(f"사용 가능한 컬럼: {df.columns.tolist()}")
+
+    # 처리된 데이터를 중간 파일로 저장 (기본 Parquet, CG_STAGE_FORMAT=csv이면 CSV)
+    print(f"\n3. 처리된 데이터 저장 중...")
+    output_path = write_stage(df, output_path)
+    print(f"   ✓ 처리된 데이터 저장 완료: {output_path}")
+
+    metrics.add(rows_in=len(df), rows_out=len(df))
+    metrics.wrote_file(output_path)
+    metrics.finish()
+    cache.save()
+
+    print(f"\n{'=' * 50}")
+    print("처리 완료!")
+    print(f"{'=' * 50}")
+
+
+if __name__ == "__main__":
+    main(parse_stage_args('SKU 접두사 제거 (00_CG → 01_CG)').force)
@@ -1,25 +1,77 @@
 import pandas as pd
 import os
 
-script_dir = os.path.dirname(os.path.abspath(__file__))
+from CG_io import read_stage, write_stage
+from CG_metrics import StageMetrics
+from CG_raw_data import SIDECAR_FILE, split_raw_data
+from CG_sku_store import SkuStore, default_store_path
+from CG_stage_cache import FORCE, StageCache, parse_stage_args
 
-cg_file = '01_CG_eBay_active_listing_data_cleaned.csv'
-db_file = '00_DB_eBay_active_listing_data.csv'
-output_file = '02_CG_eBay_active_listing_data_filtered.csv'
+# 02_ 파일에 남길 칼럼 (source / margin_rate는 00_CG_delete_prefix.py에서 SKU 접두사로 추가)
+OUTPUT_COLUMNS = ['Item number', 'origin_id', 'Title', 'eBay category 1 name', 'source', 'margin_rate', 'raw_data']
 
-cg_path = os.path.join(script_dir, cg_file)
-db_path = os.path.join(script_dir, db_file)
-output_path = os.path.join(script_dir, output_file)
 
-df_cg = pd.read_csv(cg_path)
-print(f'데이터 로드 완료:{cg_file}')
-df_db = pd.read_csv(db_path)
-print(f'데이터 로드 완료:{db_file}')
+def filter_listings(df_cg, df_db):
+    """
+    접두사가 제거된 리스팅과 DB 데이터를 SKU(origin_id) 기준으로 병합
+    """
+    df_results = pd.merge(df_cg, df_db, how='left', left_on='Custom label (SKU)', right_on='origin_id')
+    return df_results[OUTPUT_COLUMNS]
 
-df_results = pd.merge(df_cg, df_db, how='left', left_on='Custom label (SKU)', right_on='origin_id')
-print(f'데이터 병합 완료:{cg_file} 과 {db_file}')
-df_results = df_results[['Item number', 'origin_id', 'Title', 'eBay category 1 name', 'raw_data']]
 
-df_results.to_csv(output_path, index=False)
+def main(force: bool = FORCE):
+    script_dir = os.path.dirname(os.path.abspath(__file__))
 
-print(f'데이터 저장 완료:{output_file}')
\ No newline at end of file
+    cg_file = '01_CG_eBay_active_listing_data_cleaned'
+    db_file = '00_DB_eBay_active_listing_data.csv'
+    output_file = '02_CG_eBay_active_listing_data_filtered'
+
+    cg_path = os.path.join(script_dir, cg_file)
+    db_path = os.path.join(script_dir, db_file)
+    output_path = os.path.join(script_dir, output_file)
+    sidecar_path = os.path.join(script_dir, SIDECAR_FILE)
+
+    metrics = StageMetrics('00_filtering')
+    # 입력(01_ / 00_DB 파일) / 코드가 바뀌지 않았으면 이전 결과 사용
+    cache = StageCache('00_filtering', [cg_path, db_path], [output_path, sidecar_path], force=force)
+    if cache.restore():
+        metrics.finish(cache_hit=True)
+        return
+    metrics.read_file(cg_path)
+
+    df_cg = read_stage(cg_path)
+    print(f'데이터 로드 완료:{cg_file}')
+    # DB 파일은 origin_id 인덱스 저장소(SQLite)에 적재한 뒤 리스팅에 있는 SKU의 행만 조회
+    store = SkuStore(default_store_path(db_path))
+    sync_stats = store.sync(db_path)
+    if not sync_stats['skipped']:
+        # DB 덤프는 바뀌었을 때만 읽음
+        metrics.read_file(db_path)
+    if sync_stats['skipped']:
+        print(f'DB 저장소 사용 (변경 없음, {sync_stats["rows"]:,}개 행):{store.path}')
+    else:
+        print(f'DB 저장소 적재 완료 (저장: {sync_stats["written"]:,}, 삭제: {sync_stats["deleted"]:,}):{store.path}')
+    df_db = store.fetch(df_cg['Custom label (SKU)'])
+    store.close()
+    print(f'데이터 로드 완료:{db_file} ({len(df_db):,}개 행)')
+
+    df_results = filter_listings(df_cg, df_db)
+    print(f'데이터 병합 완료:{cg_file} 과 {db_file}')
+
+    # raw_data는 사이드카 파일에 한 번만 저장하고 02_ 파일에는 raw_data_ref만 남김
+    df_results, df_raw_data = split_raw_data(df_results)
+    metrics.wrote_file(write_stage(df_raw_data, sidecar_path, fmt='parquet'))
+    print(f'raw_data 사이드카 저장 완료:{SIDECAR_FILE} ({len(df_raw_data):,}개 행)')
+
+    metrics.wrote_file(write_stage(df_results, output_path, encoding='utf-8'))
+
+    print(f'데이터 저장 완료:{output_file}')
+
+    metrics.add(rows_in=len(df_cg), rows_out=len(df_results))
+    metrics.finish(db_rows=len(df_db), db_matched=int(df_results['origin_id'].notna().sum()),
+                   db_written=sync_stats['written'])
+    cache.save()
+
+
+if __name__ == "__main__":
+    main(parse_stage_args('리스팅과 DB 데이터 병합 (01_ → 02_)').force)
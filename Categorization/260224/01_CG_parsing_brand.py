@@ -1,8 +1,48 @@
 import pandas as pd
+import numpy as np
 import json
 import sys
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
+
+try:
+    import orjson
+except ImportError:
+    # orjson이 없으면 모든 행을 json.loads(느린 경로)로 처리
+    orjson = None
+
+from CG_brand_trie import load_brand_trie, select_observed_brands
+from CG_io import add_stage_columns, iter_stage_chunks, stage_columns
+from CG_metrics import StageMetrics
+from CG_parallel import map_chunks
+from CG_raw_data import REF_COLUMN, RawDataSidecar, sidecar_base_path
+from CG_sku_store import SkuStore, default_store_path
+from CG_stage_cache import StageCache, parse_stage_args
+
+DB_FILE = '00_DB_eBay_active_listing_data.csv'
+# brand를 찾은 곳 ('raw_data' / 'title', 찾지 못하면 '')
+BRAND_SOURCE_COLUMN = 'brand_source'
+# DB raw_data에서 관찰된 brand 값 (set_observed_brands로 지정, Title 기반 brand 보완 trie에 추가)
+OBSERVED_BRANDS = ()
+
+
+def brand_from_spec_dict(spec_dict) -> str:
+    """
+    파싱된 raw_data에서 brand 값 (brand가 비어 있으면 Brand, 리스트면 첫 번째 원소, dict가 아니면 '')
+    """
+    brand = ''
+    if isinstance(spec_dict, dict):
+        for key in ('brand', 'Brand'):
+            if brand or key not in spec_dict:
+                continue
+            brand_value = spec_dict[key]
+            if isinstance(brand_value, str):
+                brand = brand_value
+            elif isinstance(brand_value, list) and len(brand_value) > 0:
+                brand = str(brand_value[0])
+            else:
+                brand = str(brand_value)
+    return brand
 
 
 def extract_brand_from_spec(spec_str: str) -> Dict[str, str]:
@@ -14,32 +54,10 @@ def extract_brand_from_spec(spec_str: str) -> Dict[str, str]:
     
     try:
         # JSON 문자열을 딕셔너리로 파싱
-        spec_dict = json.loads(spec_str)
-        
-        if isinstance(spec_dict, dict):
-            # brand 추출
-            if 'brand' in spec_dict:
-                brand_value = spec_dict['brand']
-                if isinstance(brand_value, str):
-                    result['brand'] = brand_value
-                elif isinstance(brand_value, list) and len(brand_value) > 0:
-                    result['brand'] = str(brand_value[0])
-                else:
-                    result['brand'] = str(brand_value)
-            
-            # Brand (대문자) 확인
-            if not result['brand'] and 'Brand' in spec_dict:
-                brand_value = spec_dict['Brand']
-                if isinstance(brand_value, str):
-                    result['brand'] = brand_value
-                elif isinstance(brand_value, list) and len(brand_value) > 0:
-                    result['brand'] = str(brand_value[0])
-                else:
-                    result['brand'] = str(brand_value)
-        
+        result['brand'] = brand_from_spec_dict(json.loads(spec_str))
     except json.JSONDecodeError:
-        # JSON 파싱 실패 시 빈 문자열 반환
-        pass
+        # JSON 파싱 실패 시 빈 문자열 반환 (실패 행 수 집계용 표시)
+        result['json_error'] = True
     except Exception as e:
         # 기타 오류 시 빈 문자열 반환
         pass
@@ -47,57 +65,216 @@ def extract_brand_from_spec(spec_str: str) -> Dict[str, str]:
     return result
 
 
-def process_csv_file(input_file: str, output_file: str, chunk_size: int = 10000):
+def scan_brand(spec_str: str):
+    """
+    빠른 경로: orjson으로 raw_data 전체를 파싱하여 brand 값을 찾음 (json.loads보다 약 4배 빠름)
+
+    orjson도 blob 전체를 검증하므로 잘못된 JSON은 brand를 반환하지 않음.
+    orjson이 거부하는 형태(잘못된 JSON, NaN / Infinity, 짝이 없는 서로게이트 등), brand 값이 문자열
+    (또는 첫 원소가 문자열인 리스트)이 아닌 경우(큰 정수를 orjson은 float로 읽음),
+    orjson이 설치되지 않은 경우는 None을 반환하여 느린 경로(extract_brand_from_spec, json.loads)로 넘김
+
+    Returns:
+        brand 문자열 (없으면 ''), 빠른 경로로 처리할 수 없으면 None
+    """
+    if not spec_str:
+        return ''
+    if orjson is None:
+        return None
+    try:
+        spec_dict = orjson.loads(spec_str)
+    except orjson.JSONDecodeError:
+        return None
+    if isinstance(spec_dict, dict):
+        for key in ('brand', 'Brand'):
+            brand_value = spec_dict.get(key)
+            if isinstance(brand_value, list) and brand_value:
+                brand_value = brand_value[0]
+            if brand_value is not None and not isinstance(brand_value, str):
+                return None
+    return brand_from_spec_dict(spec_dict)
+
+
+def extract_brands(raw_data: pd.Series) -> Tuple[pd.Series, Dict[str, int]]:
+    """
+    raw_data 칼럼 전체에서 brand를 한 번에 추출
+
+    빠른 경로(scan_brand)로 대부분의 행을 처리하고,
+    나머지 행만 모아서 느린 경로(extract_brand_from_spec, json.loads 전체 파싱)로 처리
+
+    Args:
+        raw_data: raw_data 칼럼
+
+    Returns:
+        (raw_data와 같은 인덱스의 brand 칼럼,
+         파싱 통계 {'fallback': 느린 경로로 처리한 행 수, 'json_errors': 느린 경로에서 JSON 파싱에 실패한 행 수})
+    """
+    raw = raw_data.fillna('').astype(str)
+    brands = pd.Series([scan_brand(spec_str) for spec_str in raw], index=raw_data.index, dtype=object)
+
+    slow = brands.isna()
+    parse_stats = {'fallback': int(slow.sum()), 'json_errors': 0}
+    if parse_stats['fallback'] > 0:
+        parsed = raw[slow].map(extract_brand_from_spec)
+        brands[slow] = [x['brand'] for x in parsed]
+        parse_stats['json_errors'] = sum('json_error' in x for x in parsed)
+
+    return brands, parse_stats
+
+
+def set_observed_brands(observed: tuple):
+    """
+    Title 기반 brand 보완에 사용할 DB brand 값 지정 (작업 프로세스 초기화에서도 호출)
+    """
+    global OBSERVED_BRANDS
+    OBSERVED_BRANDS = tuple(observed)
+
+
+def load_observed_brands(db_store_path: str) -> tuple:
     """
-    CSV 파일을 청크 단위로 읽어서 brand를 추출하고 새로운 CSV 파일 생성
+    DB 저장소(SQLite)에 저장된 raw_data의 brand 값 (저장소가 없으면 빈 튜플)
+    """
+    if not os.path.exists(db_store_path):
+        return ()
+    store = SkuStore(db_store_path)
+    try:
+        return select_observed_brands(store.observed_brands(extract_brands))
+    finally:
+        store.close()
+
+
+def fill_brands_from_titles(brands: pd.Series, titles: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    """
+    raw_data에서 brand를 찾지 못한 행만 Title에서 브랜드명을 찾아 채움 (CG_brand_trie)
+
+    Args:
+        brands: extract_brands의 brand 칼럼
+        titles: 같은 행의 Title 칼럼
+
+    Returns:
+        (brand 칼럼, brand_source 칼럼 - 'raw_data' / 'title' / '')
+    """
+    brands = brands.copy()
+    sources = pd.Series(np.where(brands != '', 'raw_data', ''), index=brands.index, dtype=object)
+
+    missing = (brands == '').to_numpy()
+    if missing.any():
+        found = load_brand_trie(OBSERVED_BRANDS).find(titles[missing])
+        positions = np.flatnonzero(missing)[found.notna().to_numpy()]
+        brands.iloc[positions] = found.dropna().to_numpy()
+        sources.iloc[positions] = 'title'
+    return brands, sources
+
+
+def extract_listing_brands(task) -> Tuple[pd.Series, pd.Series, Dict[str, int]]:
+    """
+    raw_data에서 brand를 추출하고 찾지 못한 행은 Title로 보완
+
+    Args:
+        task: (raw_data 칼럼, Title 칼럼)
+
+    Returns:
+        (brand 칼럼, brand_source 칼럼, 파싱 통계 - extract_brands 통계 + title_brands)
+    """
+    raw_data, titles = task
+    brands, parse_stats = extract_brands(raw_data)
+    brands, sources = fill_brands_from_titles(brands, titles)
+    parse_stats['title_brands'] = int((sources == 'title').sum())
+    return brands, sources, parse_stats
+
+
+def add_brand_column(chunk: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """
+    청크의 raw_data에서 brand를 추출하여 brand / brand_source 칼럼이 추가된 DataFrame 반환
+    (raw_data에 brand가 없으면 Title에서 찾은 브랜드명)
+
+    Returns:
+        (brand 칼럼이 추가된 DataFrame, 파싱 통계 - extract_listing_brands 참고)
+    """
+    brands, sources, parse_stats = extract_listing_brands((chunk['raw_data'], chunk['Title']))
+
+    # 입력 칼럼(source / margin_rate 포함) + brand / brand_source
+    result_chunk = chunk.copy()
+    result_chunk['brand'] = brands
+    result_chunk[BRAND_SOURCE_COLUMN] = sources
+    return result_chunk, parse_stats
+
+
+def process_stage_file(input_file: str, output_file: str, chunk_size: int = 10000, workers: int = None,
+                       observed_brands: tuple = ()):
+    """
+    중간 파일의 raw_data / Title 칼럼만 청크 단위로 읽어서 brand를 추출하고,
+    입력 파일에 brand / brand_source 칼럼을 추가한 새 중간 파일 생성
     
     Args:
-        input_file: 입력 CSV 파일 경로
-        output_file: 출력 CSV 파일 경로
+        input_file: 입력 파일 경로 (확장자 없음)
+        output_file: 출력 파일 경로 (확장자 없음)
         chunk_size: 한 번에 처리할 행 수
+        workers: 작업 프로세스 수 (None이면 CG_WORKERS 환경변수, 기본값 1)
+        observed_brands: Title 기반 brand 보완에 추가할 DB brand 값
+
+    Returns:
+        출력 파일을 저장했으면 True (필요한 칼럼이 없어 처리하지 않았으면 False)
     """
-    print(f"CSV 파일 처리 시작: {input_file}")
+    print(f"파일 처리 시작: {input_file}")
     
-    # 첫 번째 청크를 읽어서 칼럼 확인
-    first_chunk = pd.read_csv(input_file, nrows=5, encoding='utf-8-sig')
-    print(f"칼럼: {first_chunk.columns.tolist()}")
+    # 칼럼 확인
+    columns = stage_columns(input_file)
+    print(f"칼럼: {columns}")
     
     # 필요한 칼럼 확인
     required_columns = [
-        'Item number', 'origin_id', 'Title', 'eBay category 1 name', 'raw_data']
-    missing_columns = [col for col in required_columns if col not in first_chunk.columns]
+        'Item number', 'origin_id', 'Title', 'eBay category 1 name']
+    missing_columns = [col for col in required_columns if col not in columns]
+    if 'raw_data' not in columns and REF_COLUMN not in columns:
+        missing_columns.append('raw_data')
     if missing_columns:
         print(f"오류: 필요한 칼럼이 없습니다: {missing_columns}")
-        return
+        return False
+    
+    # raw_data 칼럼이 없으면 raw_data_ref로 사이드카 파일에서 청크별로 조회
+    if 'raw_data' in columns:
+        source_column = 'raw_data'
+        get_raw_data = lambda chunk: chunk['raw_data']
+    else:
+        source_column = REF_COLUMN
+        sidecar = RawDataSidecar(sidecar_base_path(input_file))
+        print(f"raw_data 사이드카 사용: {sidecar.path}")
+        get_raw_data = lambda chunk: sidecar.resolve(chunk[REF_COLUMN])
     
     # 결과를 저장할 리스트
-    all_results = []
+    all_brands = []
+    all_sources = []
     
-    # 청크 단위로 파일 읽기
+    # 청크 단위로 파일 읽기 (brand 추출에 필요한 raw_data / raw_data_ref만)
     chunk_count = 0
     total_rows = 0
+    total_fallback = 0
+    total_json_errors = 0
+    total_title_brands = 0
+    metrics = StageMetrics('01_parsing_brand')
+    metrics.read_file(input_file)
+    if source_column == REF_COLUMN:
+        metrics.read_file(sidecar.path)
     
     try:
-        for chunk in pd.read_csv(input_file, chunksize=chunk_size, encoding='utf-8-sig'):
+        # brand 추출 (CG_WORKERS > 1이면 청크를 프로세스 풀에서 병렬 처리, 결과는 순서대로)
+        chunks = iter_stage_chunks(input_file, chunk_size, columns=[source_column, 'Title'])
+        results = map_chunks(extract_listing_brands, chunks, workers,
+                             payload=lambda chunk: (get_raw_data(chunk), chunk['Title']),
+                             initializer=set_observed_brands, initargs=(observed_brands,))
+        for chunk, (brands, sources, parse_stats) in metrics.track(results):
             chunk_count += 1
             total_rows += len(chunk)
             
-            print(f"청크 {chunk_count} 처리 중... (행 수: {len(chunk)}, 누적: {total_rows})")
+            print(f"청크 {chunk_count} 처리 완료 (행 수: {len(chunk)}, 누적: {total_rows})")
             
-            # brand 추출
-            brand_data = chunk['raw_data'].apply(extract_brand_from_spec)
+            total_fallback += parse_stats['fallback']
+            total_json_errors += parse_stats['json_errors']
+            total_title_brands += parse_stats['title_brands']
             
-            # 새로운 DataFrame 생성
-            result_chunk = pd.DataFrame({
-                'Item number': chunk['Item number'],
-                'origin_id': chunk['origin_id'],
-                'Title': chunk['Title'],
-                'eBay category 1 name': chunk['eBay category 1 name'],
-                'raw_data': chunk['raw_data'],
-                'brand': [x['brand'] for x in brand_data]
-            })
-            
-            all_results.append(result_chunk)
+            all_brands.append(brands)
+            all_sources.append(sources)
             
             # 진행 상황 출력
             if chunk_count % 10 == 0:
@@ -105,21 +282,32 @@ def process_csv_file(input_file: str, output_file: str, chunk_size: int = 10000)
         
         # 모든 청크 합치기
         print("\n모든 청크를 합치는 중...")
-        final_df = pd.concat(all_results, ignore_index=True)
+        brand_column = pd.concat(all_brands, ignore_index=True) if all_brands else pd.Series(dtype=object)
+        source_column = pd.concat(all_sources, ignore_index=True) if all_sources else pd.Series(dtype=object)
         
-        print(f"\n총 {len(final_df)}개의 행이 처리되었습니다.")
-        print(f"칼럼: {final_df.columns.tolist()}")
+        print(f"\n총 {len(brand_column)}개의 행이 처리되었습니다.")
+        print(f"칼럼: {columns + ['brand', BRAND_SOURCE_COLUMN]}")
         print(f"\n샘플 데이터:")
-        print(final_df.head())
+        print(brand_column.head())
         
-        # 결과 저장
+        # 결과 저장 (입력 파일 칼럼 + brand / brand_source)
         print(f"\n결과를 '{output_file}'에 저장 중...")
-        final_df.to_csv(output_file, index=False, encoding='utf-8-sig')
-        print(f"저장 완료!")
+        output_path = add_stage_columns(input_file, output_file,
+                                        {'brand': brand_column, BRAND_SOURCE_COLUMN: source_column})
+        print(f"저장 완료! ({output_path})")
         
         # 통계 정보
         print(f"\n=== 통계 ===")
-        print(f"brand가 있는 행: {final_df['brand'].notna().sum()}개 ({final_df['brand'].notna().sum() / len(final_df) * 100:.1f}%)")
+        print(f"brand가 있는 행: {(brand_column != '').sum()}개 ({(brand_column != '').sum() / len(brand_column) * 100:.1f}%)")
+        print(f"Title에서 찾은 brand 행: {total_title_brands}개 (DB brand {len(observed_brands)}개 포함)")
+        print(f"json.loads 전체 파싱(느린 경로) 행: {total_fallback}개 ({total_fallback / len(brand_column) * 100:.1f}%)")
+        print(f"JSON 파싱 실패 행: {total_json_errors}개")
+
+        metrics.add(rows_out=len(brand_column), json_parse_failures=total_json_errors)
+        metrics.wrote_file(output_path)
+        metrics.finish(brand_fallback=total_fallback, brand_found=int((brand_column != '').sum()),
+                       brand_from_title=total_title_brands)
+        return True
         
     except Exception as e:
         print(f"오류 발생: {e}")
@@ -129,10 +317,24 @@ def process_csv_file(input_file: str, output_file: str, chunk_size: int = 10000)
 
 if __name__ == "__main__":
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    input_file = '02_CG_eBay_active_listing_data_filtered.csv'
-    output_file = '03_CG_eBay_active_listing_data_filtered_with_brand.csv'
+    input_file = '02_CG_eBay_active_listing_data_filtered'
+    output_file = '03_CG_eBay_active_listing_data_filtered_with_brand'
 
     input_path = os.path.join(script_dir, input_file)
     output_path = os.path.join(script_dir, output_file)
     
-    process_csv_file(input_path, output_path, chunk_size=10000)
\ No newline at end of file
+    db_path = os.path.join(script_dir, DB_FILE)
+
+    # 입력(02_ 파일 + raw_data 사이드카 + DB 덤프) / 코드가 바뀌지 않았으면 이전 결과 사용
+    args = parse_stage_args('brand 추출 (02_ → 03_)')
+    cache = StageCache('01_parsing_brand', [input_path], [output_path], force=args.force,
+                       optional_inputs=[sidecar_base_path(input_path), db_path])
+    if cache.restore():
+        StageMetrics('01_parsing_brand').finish(cache_hit=True)
+    else:
+        # DB brand는 00_CG_filtering.py가 만든 DB 저장소에서 (덤프가 바뀌었을 때만 다시 집계)
+        # 출력 파일을 저장한 경우에만 캐시에 저장 (처리하지 못했으면 이전 출력이 새 키로 저장되지 않도록)
+        if not process_stage_file(input_path, output_path, chunk_size=10000,
+                                  observed_brands=load_observed_brands(default_store_path(db_path))):
+            sys.exit(1)
+        cache.save()
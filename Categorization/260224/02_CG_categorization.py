@@ -1,82 +1,61 @@
 import pandas as pd
 import os
-import numpy as np
+
+from CG_io import add_stage_columns, iter_stage_chunks
+from CG_metrics import StageMetrics
+from CG_stage_cache import FORCE, StageCache, parse_stage_args
+from CG_parallel import map_chunks
+from CG_schema import COMPACT, MEMORY_BUDGET_MB, compact_frame, concat_frames, memory_report
+from CG_keyword_index import match_title, match_titles, match_tokens
+from CG_taxonomy import load_taxonomy
+from CG_title_cache import STAGE_CACHE_PATH, lookup_titles, open_taxonomy_cache
+
+# 카테고리별 키워드 / 우선순위(Bags > Watches > Shoes > Clothes > Accessaries)는 CG_taxonomy.json에서 관리
+TAXONOMY = load_taxonomy()
+CATEGORY_KEYWORDS = TAXONOMY.category_rules
+
+# 모듈 로드 시 한 번만 컴파일
+KEYWORD_INDEX, PRIORITY_TO_CATEGORY = TAXONOMY.category_index
+
 
 def categorize_ebay_category(title_name):
     """
-    Title을 카테고리로 분류
+    Title을 카테고리로 분류 (키워드가 없으면 Others)
     """
-    # category_name 없으면 Others로 분류
-    if pd.isna(title_name) or title_name == '':
-        return 'Others'
-    # category_name을 소문자로 변환하고 공백 기준으로 단어 리스트 생성
-    title_lower = str(title_name).lower()
-    title_words = title_lower.split()
+    return match_title(title_name, KEYWORD_INDEX, PRIORITY_TO_CATEGORY, TAXONOMY.default)
 
-    # Bags 카테고리
-    bag_keywords = ['bag', 'bags', 'handbag', 'handbags', 'wallet', 'wallets',
-                   'clutch', 'clutches', 'tote', 'totes', 'duffel', 'duffels',
-                   'luggage', 'backpack', 'backpacks', 'crossbody', 'cross-body',
-                   'pouch', 'pouches', 'shoulder']
-    if any(keyword in title_words for keyword in bag_keywords):
-        return 'Bags'
-    
-    # Watches 카테고리
-    watch_keywords = ['watch', 'watches', 'wristwatch', 'wristwatches', 'timepiece', 'timepieces']
-    if any(keyword in title_words for keyword in watch_keywords):
-        return 'Watches'
-    
-    # Shoes 카테고리
-    shoe_keywords = ['shoe', 'shoes', 'heel', 'heels', 'boot', 'boots',
-                    'sandal', 'sandals', 'slipper', 'slippers', 'flat', 'flats',
-                    'sneaker', 'sneakers', 'loafer', 'loafers', 'pump', 'pumps',
-                    'espadrille', 'espadrilles', 'mule', 'mules', 'athletic',
-                    'sport', 'running', 'lace-up', 'low-top', 'high-top',
-                    'stiletto', 'stilettos', 'wedge', 'wedges', 'moccasin', 'moccasins',
-                    'ankle', 'knee', 'combat']
-    if any(keyword in title_words for keyword in shoe_keywords):
-        return 'Shoes'
 
-    # Clothes 카테고리
-    clothes_keywords = ['coat', 'coats', 'jacket', 'jackets', 'vest', 'vests',
-                       'sweater', 'sweaters', 'top', 'tops', 'shirt', 'shirts',
-                       'blouse', 'blouses', 't-shirt', 't-shirts', 'pants',
-                       'trouser', 'trousers', 'jean', 'jeans', 'short', 'shorts',
-                       'skirt', 'skirts', 'dress', 'dresses', 'suit', 'suits',
-                       'blazer', 'blazers', 'hoodie', 'hoodies', 'sweatshirt',
-                       'sweatshirts', 'cardigan', 'cardigans', 'jogging',
-                       'activewear', 'outerwear', 'sleepwear', 'robe', 'robes',
-                       'kimono', 'kimonos', 'outer', 'puffer', 'puffers', 'bomber',
-                       'bombers', 'biker', 'bikers', 'trench', 'trenches',
-                       'windbreaker', 'windbreakers', 'knit', 'knits', 'sheer',
-                       'jersey', 'jerseys', 'polo', 'polos', 'pant', 'legging',
-                       'leggings', 'denim', 'gown', 'gowns', 'one-piece']
-    if any(keyword in title_words for keyword in clothes_keywords):
-        return 'Clothes'
-    
-    # Accessaries 카테고리
-    accessory_keywords = ['belt', 'belts', 'scarf', 'scarves', 'glove', 'gloves',
-                         'hat', 'hats', 'cap', 'caps', 'sunglass', 'sunglasses',
-                         'jewelry', 'bracelet', 'bracelets', 'necklace', 'necklaces',
-                         'ring', 'rings', 'earring', 'earrings', 'tie', 'ties',
-                         'cufflink', 'cufflinks', 'umbrella', 'umbrellas',
-                         'keychain', 'keychains']
-    if any(keyword in title_words for keyword in accessory_keywords):
-        return 'Accessaries'
-    
-    # 그 외는 Others
-    return 'Others'
+def categorize_titles(titles: pd.Series, tokens=None) -> pd.Series:
+    """
+    Title 칼럼 전체를 한 번에 카테고리로 분류 (categorize_ebay_category의 벡터화 버전)
+    tokens(titles 순서의 Title 토큰 행렬)가 있으면 다시 토큰화하지 않고 사용
+    """
+    if tokens is None:
+        return match_titles(titles, KEYWORD_INDEX, PRIORITY_TO_CATEGORY, TAXONOMY.default)
+    return pd.Series(match_tokens(tokens, KEYWORD_INDEX, PRIORITY_TO_CATEGORY, TAXONOMY.default), index=titles.index)
 
-def add_category_column():
+def add_category_column(workers: int = None, compact: bool = None, force: bool = FORCE,
+                        title_cache_path: str = STAGE_CACHE_PATH):
     """
-    CSV 파일에 Category 칼럼 추가
+    중간 파일에 Category 칼럼 추가 (분류에 필요한 Title 칼럼만 읽음)
+
+    Args:
+        workers: 작업 프로세스 수 (None이면 CG_WORKERS 환경변수, 기본값 1)
+        compact: 청크를 압축 스키마(category / 정수 / Arrow 문자열)로 모으기 (None이면 CG_COMPACT 환경변수)
+        force: True인 경우 입력 / 코드가 바뀌지 않았어도 다시 실행 (기본값: CG_FORCE)
+        title_cache_path: Title 분류 결과 캐시(SQLite) 경로 - 캐시에 있는 제목은 저장된 Category 사용
+                          (Subcategory가 정해지는 03_ 단계에서 저장, None이면 사용 안 함)
+
+    Returns:
+        출력 파일을 저장했거나 이전 결과를 사용했으면 True, 오류가 나서 저장하지 못했으면 False
     """
+    compact = COMPACT if compact is None else compact
     # 현재 스크립트가 있는 디렉토리로 이동
     script_dir = os.path.dirname(os.path.abspath(__file__))
     os.chdir(script_dir)
     
-    input_file = '03_CG_eBay_active_listing_data_filtered_with_brand.csv'
-    output_file = '04_CG_eBay_active_listing_data_categorized.csv'
+    input_file = '03_CG_eBay_active_listing_data_filtered_with_brand'
+    output_file = '04_CG_eBay_active_listing_data_categorized'
     
     print(f"파일 읽기 중: {input_file}")
     
@@ -84,24 +63,42 @@ def add_category_column():
     chunk_size = 10000
     chunks_processed = []
     total_rows = 0
+    metrics = StageMetrics('02_categorization')
+    # 입력 / 코드 / taxonomy가 바뀌지 않았으면 이전 결과 사용
+    cache = StageCache('02_categorization', [input_file], [output_file], force=force)
+    if cache.restore():
+        metrics.finish(cache_hit=True)
+        return True
+    metrics.read_file(input_file)
+    title_cache = open_taxonomy_cache(title_cache_path, TAXONOMY) if title_cache_path else None
     
     try:
-        for chunk_num, chunk in enumerate(pd.read_csv(input_file, chunksize=chunk_size, dtype=str), 1):
-            print(f"  청크 {chunk_num} 처리 중... ({len(chunk)}개 행)")
+        # 캐시 조회는 현재 프로세스에서 청크 단위로 한 번에, 캐시에 없는 제목만 분류
+        # (CG_WORKERS > 1이면 청크를 프로세스 풀에서 병렬 처리, 결과는 순서대로)
+        chunks = ((chunk, lookup_titles(title_cache, chunk['Title']))
+                  for chunk in iter_stage_chunks(input_file, chunk_size, columns=['Title'], dtype=str))
+        results = map_chunks(categorize_titles, chunks, workers,
+                             payload=lambda item: item[0]['Title'][~item[1]['found']])
+        for chunk_num, ((chunk, cached), categories) in enumerate(metrics.track(results), 1):
+            print(f"  청크 {chunk_num} 처리 완료 ({len(chunk)}개 행)")
             
-            # Category 칼럼 생성
-            chunk['Category'] = chunk['Title'].apply(categorize_ebay_category)
+            # Category 칼럼 생성 (캐시에 있던 제목은 저장된 Category)
+            chunk['Category'] = cached['Category'].where(cached['found'], categories)
+            if compact:
+                chunk = compact_frame(chunk)
             
             chunks_processed.append(chunk)
             total_rows += len(chunk)
         
         # 모든 청크 합치기
         print(f"\n모든 청크 합치는 중... (총 {total_rows}개 행)")
-        df_result = pd.concat(chunks_processed, ignore_index=True)
+        df_result = concat_frames(chunks_processed)
+        if compact or MEMORY_BUDGET_MB is not None:
+            memory_report(df_result, input_file, MEMORY_BUDGET_MB)
         
-        # 결과 저장
+        # 결과 저장 (입력 파일 칼럼 + Category)
         print(f"\n결과 저장 중: {output_file}")
-        df_result.to_csv(output_file, index=False, encoding='utf-8-sig')
+        output_path = add_stage_columns(input_file, output_file, {'Category': df_result['Category']}, dtype=str)
         
         print(f"\n=== 완료 ===")
         print(f"총 행 수: {len(df_result)}")
@@ -112,18 +109,34 @@ def add_category_column():
             print(f"  {category}: {count}개 ({percentage:.2f}%)")
         
         print(f"\n=== 샘플 데이터 (처음 10개 행) ===")
-        sample_cols = ['Title', 'Category']
-        if all(col in df_result.columns for col in sample_cols):
-            print(df_result[sample_cols].head(10).to_string())
-        else:
-            print(df_result.head(10).to_string())
+        print(df_result[['Title', 'Category']].head(10).to_string())
         
-        print(f"\n파일 저장 완료: {output_file}")
+        print(f"\n파일 저장 완료: {output_path}")
+
+        cache_stats = {}
+        if title_cache is not None:
+            stats = title_cache.stats()
+            cache_stats = {'title_cache_hits': stats['hits'], 'title_cache_misses': stats['misses']}
+            print(f"Title 캐시: hit {stats['hits']:,} / miss {stats['misses']:,} (저장된 제목 {stats['entries']:,}개)")
+
+        metrics.add(rows_out=len(df_result))
+        metrics.add_distribution(df_result['Category'])
+        metrics.wrote_file(output_path)
+        metrics.finish(**cache_stats)
+        # 출력 파일까지 저장한 경우에만 캐시에 저장
+        cache.save()
+        return True
         
     except Exception as e:
         print(f"오류 발생: {e}")
         import traceback
         traceback.print_exc()
+        return False
+    finally:
+        if title_cache is not None:
+            title_cache.close()
 
 if __name__ == "__main__":
-    add_category_column()
\ No newline at end of file
+    args = parse_stage_args('카테고리 분류 (03_ → 04_)', title_cache=True)
+    if not add_category_column(force=args.force, title_cache_path=args.title_cache):
+        raise SystemExit(1)
@@ -1,100 +1,53 @@
 import pandas as pd
+import numpy as np
 import os
+import sys
+
+# 브랜드 표준화 모듈은 날짜 폴더 밖의 공통 폴더(Categorization/common)에서 불러옴
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'common'))
+
+from CG_io import add_stage_columns, iter_stage_chunks
+from CG_metrics import StageMetrics
+from CG_stage_cache import FORCE, StageCache, parse_stage_args
+from CG_parallel import map_chunks
+from CG_schema import COMPACT, MEMORY_BUDGET_MB, compact_frame, concat_frames, memory_report
+from CG_keyword_index import match_title, match_tokens
+from CG_token_matrix import tokenize_titles
+from CG_taxonomy import load_taxonomy
+from CG_brand_index import load_brand_index, normalize_brand
+from CG_title_cache import STAGE_CACHE_PATH, lookup_titles, open_taxonomy_cache
+
+# 카테고리별 하위 카테고리 규칙(Title 기준, 리스트 순서가 우선순위)과
+# Watches 하위 카테고리(brand 기준 부분 문자열 매칭, 순서대로 확인)는 CG_taxonomy.json에서 관리
+TAXONOMY = load_taxonomy()
+SUBCATEGORY_RULES = TAXONOMY.subcategory_rules
+WATCH_BRANDS = TAXONOMY.watch_brands
+
+# 모듈 로드 시 한 번만 컴파일: Category → 키워드 인덱스
+SUBCATEGORY_INDEX = TAXONOMY.subcategory_index
+
+# brand 부분 문자열로 찾지 못한 Watches는 표준 브랜드명(오타 / 별칭 보정, CG_brand_aliases.json)으로 한 번 더 확인
+BRAND_INDEX = load_brand_index()
+# 표준 브랜드명은 시계 브랜드 목록과 정확히 일치할 때만 사용 (정규화된 브랜드명 → 하위 카테고리)
+WATCH_CANONICAL_BRANDS = {normalize_brand(brand_key): brand_name for brand_key, brand_name in WATCH_BRANDS.items()}
 
 def get_subcategory_bags(title_value):
     """
     Bags 카테고리의 하위 카테고리 분류 (Title 기준)
     """
-    if pd.isna(title_value) or title_value == '':
-        return 'Others'
-
-    title_lower = str(title_value).lower()
-    title_words = title_lower.split()
-
-    # Shoulder
-    if any(keyword in title_words for keyword in ['shoulder']):
-        return 'Shoulder'
-
-    # Tote
-    if any(keyword in title_words for keyword in ['tote', 'totes']):
-        return 'Tote'
-
-    # Crossbody
-    if any(keyword in title_words for keyword in ['crossbody', 'cross-body']):
-        return 'Crossbody'
-
-    # Clutch
-    if any(keyword in title_words for keyword in ['hand', 'handbag', 'handbags', 'clutch', 'clutches']):
-        return 'Clutch'
-
-    # Others
-    return 'Others'
+    return match_title(title_value, *SUBCATEGORY_INDEX['Bags'])
 
 def get_subcategory_clothes(title_value):
     """
     Clothes 카테고리의 하위 카테고리 분류 (Title 기준)
     """
-    if pd.isna(title_value) or title_value == '':
-        return 'Others'
-
-    title_lower = str(title_value).lower()
-    title_words = title_lower.split()
-
-    # Outer
-    if any(keyword in title_words for keyword in ['outer', 'outerwear', 'coat', 'coats', 'jacket', 'jackets',
-                                                   'blazer', 'blazers', 'vest', 'vests', 'puffer', 'bomber',
-                                                   'biker', 'trench', 'windbreaker']):
-        return 'Outer'
-
-    # Tops
-    if any(keyword in title_words for keyword in ['top', 'tops', 'shirt', 'shirts', 'blouse', 'blouses',
-                                                   't-shirt', 't-shirts', 'sweater', 'sweaters', 'cardigan',
-                                                   'cardigans', 'hoodie', 'hoodies', 'sweatshirt', 'sweatshirts',
-                                                   'knit', 'sheer', 'jersey', 'polo']):
-        return 'Tops'
-
-    # Pants & Skirts
-    if any(keyword in title_words for keyword in ['pant', 'pants', 'trouser', 'trousers', 'jean', 'jeans',
-                                                   'short', 'shorts', 'skirt', 'skirts', 'jogging',
-                                                   'legging', 'leggings', 'denim']):
-        return 'Pants & Skirts'
-
-    # Dresses
-    if any(keyword in title_words for keyword in ['dress', 'dresses', 'gown', 'gowns', 'one-piece']):
-        return 'Dress'
-
-    # Others
-    return 'Others'
+    return match_title(title_value, *SUBCATEGORY_INDEX['Clothes'])
 
 def get_subcategory_shoes(title_value):
     """
     Shoes 카테고리의 하위 카테고리 분류 (Title 기준)
     """
-    if pd.isna(title_value) or title_value == '':
-        return 'Others'
-
-    title_lower = str(title_value).lower()
-    title_words = title_lower.split()
-
-    # Sneakers
-    if any(keyword in title_words for keyword in ['sneaker', 'sneakers', 'athletic', 'sport', 'running',
-                                                   'lace-up', 'low-top', 'high-top']):
-        return 'Sneakers'
-
-    # Heels
-    if any(keyword in title_words for keyword in ['heel', 'heels', 'pump', 'pumps', 'stiletto', 'wedge', 'wedges']):
-        return 'Heels'
-
-    # Loafers
-    if any(keyword in title_words for keyword in ['loafer', 'loafers', 'moccasin', 'moccasins', 'driving', 'dress']):
-        return 'Dress'
-
-    # Boots
-    if any(keyword in title_words for keyword in ['boot', 'boots', 'ankle', 'knee', 'combat']):
-        return 'Boots'
-
-    # Others
-    return 'Others'
+    return match_title(title_value, *SUBCATEGORY_INDEX['Shoes'])
 
 def get_subcategory_watches(brand_value):
     """
@@ -105,65 +58,91 @@ def get_subcategory_watches(brand_value):
     
     brand_lower = str(brand_value).lower()
     
-    # 지정된 브랜드들
-    watch_brands = {
-        'tag heuer': 'Tag Heuer',
-        'cartier': 'Cartier',
-        'montblanc': 'Montblanc',
-        'gucci': 'Gucci',
-        'ferragamo': 'Ferragamo',
-        'salvatore ferragamo': 'Ferragamo',
-        'mido': 'Mido',
-        'omega': 'Omega',
-        'breitling': 'Breitling'
-    }
-    
-    for brand_key, brand_name in watch_brands.items():
+    for brand_key, brand_name in WATCH_BRANDS.items():
         if brand_key in brand_lower:
             return brand_name
     
+    # 오타 / 별칭 (예: 'Omegaa', 'Mont Blanc')
+    canonical, _ = BRAND_INDEX.resolve(brand_value)
+    if canonical is not None:
+        return WATCH_CANONICAL_BRANDS.get(normalize_brand(canonical), 'Others')
+    
     # Others
     return 'Others'
 
 def get_subcategory_accessaries(title_value):
     """
-    Accessaries 카테고리의 하위 카테고리 분류 (eBay category 1 name 기준)
+    Accessaries 카테고리의 하위 카테고리 분류 (Title 기준)
     """
-    if pd.isna(title_value) or title_value == '':
-        return 'Others'
+    return match_title(title_value, *SUBCATEGORY_INDEX['Accessaries'])
 
-    title_lower = str(title_value).lower()
-    title_words = title_lower.split()
+def get_watch_subcategories(brands: pd.Series) -> pd.Series:
+    """
+    brand 칼럼 전체를 한 번에 Watches 하위 카테고리로 분류 (get_subcategory_watches의 벡터화 버전)
+    """
+    subcategories = _match_watch_brands(brands.fillna('').astype(str).str.lower())
 
-    # Earrings
-    if any(keyword in title_words for keyword in ['earring', 'earrings']):
-        return 'Earrings'
+    # 부분 문자열로 찾지 못한 brand만 표준 브랜드명으로 다시 확인 (고유값 단위로 계산)
+    unmatched = (subcategories == 'Others') & brands.notna().to_numpy()
+    if unmatched.any():
+        canonical = BRAND_INDEX.canonicalize(brands[unmatched])['brand_canonical']
+        subcategories[unmatched] = canonical.map(normalize_brand).map(WATCH_CANONICAL_BRANDS).fillna('Others').to_numpy()
 
-    # Rings
-    if any(keyword in title_words for keyword in ['ring', 'rings']):
-        return 'Rings'
+    return pd.Series(subcategories, index=brands.index, dtype=object)
 
-    # Bracelets
-    if any(keyword in title_words for keyword in ['bracelet', 'bracelets']):
-        return 'Bracelets'
+def _match_watch_brands(brand_lower: pd.Series) -> np.ndarray:
+    conditions = [brand_lower.str.contains(brand_key, regex=False).to_numpy(dtype=bool)
+                  for brand_key in WATCH_BRANDS]
+    # np.select는 먼저 매칭된 조건을 선택하므로 WATCH_BRANDS 순서가 유지됨
+    return np.select(conditions, np.array(list(WATCH_BRANDS.values()), dtype=object), default='Others').astype(object)
 
-    # Necklaces
-    if any(keyword in title_words for keyword in ['necklace', 'necklaces']):
-        return 'Necklaces'
+def get_subcategories(chunk, tokens=None):
+    """
+    청크를 Category별로 묶어서 각 그룹을 하위 카테고리 규칙으로 한 번에 분류
 
-    # Others
-    return 'Others'
+    Args:
+        chunk: Category, Title, brand 칼럼이 있는 DataFrame
+        tokens: chunk 순서의 Title 토큰 행렬 (있으면 그룹별 행만 골라서 사용, 없으면 그룹별로 토큰화)
 
-def add_subcategory_column():
+    Returns:
+        chunk와 같은 인덱스의 Subcategory 칼럼 (Others 또는 기타 카테고리는 Others)
     """
-    CSV 파일에 Subcategory 칼럼 추가
+    subcategories = np.full(len(chunk), 'Others', dtype=object)
+
+    for category, positions in chunk.groupby('Category', sort=False).indices.items():
+        if category == 'Watches':
+            group_result = get_watch_subcategories(chunk['brand'].iloc[positions])
+        elif category in SUBCATEGORY_INDEX:
+            group_tokens = tokenize_titles(chunk['Title'].iloc[positions]) if tokens is None else tokens.take(positions)
+            group_result = match_tokens(group_tokens, *SUBCATEGORY_INDEX[category])
+        else:  # Others 또는 기타
+            continue
+        subcategories[positions] = np.asarray(group_result)
+
+    return pd.Series(subcategories, index=chunk.index)
+
+def add_subcategory_column(workers: int = None, compact: bool = None, force: bool = FORCE,
+                           title_cache_path: str = STAGE_CACHE_PATH):
     """
+    중간 파일에 Subcategory 칼럼 추가 (분류에 필요한 Title, Category, brand 칼럼만 읽음)
+
+    Args:
+        workers: 작업 프로세스 수 (None이면 CG_WORKERS 환경변수, 기본값 1)
+        compact: 청크를 압축 스키마(category / 정수 / Arrow 문자열)로 모으기 (None이면 CG_COMPACT 환경변수)
+        force: True인 경우 입력 / 코드가 바뀌지 않았어도 다시 실행 (기본값: CG_FORCE)
+        title_cache_path: Title 분류 결과 캐시(SQLite) 경로 - 캐시에 있는 제목은 저장된 Subcategory 사용,
+                          없던 제목은 분류 후 Category / Subcategory 저장 (None이면 사용 안 함)
+
+    Returns:
+        출력 파일을 저장했거나 이전 결과를 사용했으면 True, 오류가 나서 저장하지 못했으면 False
+    """
+    compact = COMPACT if compact is None else compact
     # 현재 스크립트가 있는 디렉토리로 이동
     script_dir = os.path.dirname(os.path.abspath(__file__))
     os.chdir(script_dir)
     
-    input_file = '04_CG_eBay_active_listing_data_categorized.csv'
-    output_file = '05_CG_eBay_active_listing_data_subcategorized.csv'  # 같은 파일에 덮어쓰기
+    input_file = '04_CG_eBay_active_listing_data_categorized'
+    output_file = '05_CG_eBay_active_listing_data_subcategorized'
     
     print(f"파일 읽기 중: {input_file}")
     
@@ -171,43 +150,54 @@ def add_subcategory_column():
     chunk_size = 10000
     chunks_processed = []
     total_rows = 0
+    metrics = StageMetrics('03_subcategorization')
+    # 입력 / 코드 / taxonomy가 바뀌지 않았으면 이전 결과 사용
+    cache = StageCache('03_subcategorization', [input_file], [output_file], force=force)
+    if cache.restore():
+        metrics.finish(cache_hit=True)
+        return True
+    metrics.read_file(input_file)
+    title_cache = open_taxonomy_cache(title_cache_path, TAXONOMY) if title_cache_path else None
     
     try:
-        for chunk_num, chunk in enumerate(pd.read_csv(input_file, chunksize=chunk_size, dtype=str), 1):
-            print(f"  청크 {chunk_num} 처리 중... ({len(chunk)}개 행)")
-            
-            # Subcategory 칼럼 생성
-            subcategories = []
-            
-            for idx, row in chunk.iterrows():
-                category = row.get('Category', '')
-                
-                if category == 'Bags':
-                    subcategory = get_subcategory_bags(row.get('Title', ''))
-                elif category == 'Clothes':
-                    subcategory = get_subcategory_clothes(row.get('Title', ''))
-                elif category == 'Shoes':
-                    subcategory = get_subcategory_shoes(row.get('Title', ''))
-                elif category == 'Watches':
-                    subcategory = get_subcategory_watches(row.get('brand', ''))
-                elif category == 'Accessaries':
-                    subcategory = get_subcategory_accessaries(row.get('Title', ''))
-                else:  # Others 또는 기타
-                    subcategory = 'Others'
-                
-                subcategories.append(subcategory)
+        # 캐시 조회는 현재 프로세스에서 청크 단위로 한 번에
+        # 캐시에 없거나 Category가 다른 제목, brand 기준인 Watches 행만 분류
+        # (CG_WORKERS > 1이면 청크를 프로세스 풀에서 병렬 처리, 결과는 순서대로)
+        def lookup(chunk):
+            cached = lookup_titles(title_cache, chunk['Title'])
+            reuse = cached['found'] & (cached['Category'] == chunk['Category']) & (chunk['Category'] != 'Watches')
+            return chunk, cached, reuse
+
+        chunks = (lookup(chunk) for chunk in
+                  iter_stage_chunks(input_file, chunk_size, columns=['Title', 'Category', 'brand'], dtype=str))
+        results = map_chunks(get_subcategories, chunks, workers, payload=lambda item: item[0][~item[2]])
+        for chunk_num, ((chunk, cached, reuse), subcategories) in enumerate(metrics.track(results), 1):
+            print(f"  청크 {chunk_num} 처리 완료 ({len(chunk)}개 행)")
             
-            chunk['Subcategory'] = subcategories
+            # Subcategory 칼럼 생성 (캐시에 있던 제목은 저장된 Subcategory)
+            chunk['Subcategory'] = cached['Subcategory'].where(reuse, subcategories)
+            if title_cache is not None:
+                # 캐시에 없던 제목 저장 (Watches 하위 카테고리는 brand 기준이므로 저장하지 않음)
+                missing = ~cached['found']
+                new = chunk.loc[missing, ['Category', 'Subcategory']].assign(key=cached.loc[missing, 'key'].to_numpy())
+                new = new.drop_duplicates('key')
+                new.loc[new['Category'] == 'Watches', 'Subcategory'] = None
+                if len(new) > 0:
+                    title_cache.put_many(new)
+            if compact:
+                chunk = compact_frame(chunk)
             chunks_processed.append(chunk)
             total_rows += len(chunk)
         
         # 모든 청크 합치기
         print(f"\n모든 청크 합치는 중... (총 {total_rows}개 행)")
-        df_result = pd.concat(chunks_processed, ignore_index=True)
+        df_result = concat_frames(chunks_processed)
+        if compact or MEMORY_BUDGET_MB is not None:
+            memory_report(df_result, input_file, MEMORY_BUDGET_MB)
         
-        # 결과 저장
+        # 결과 저장 (입력 파일 칼럼 + Subcategory)
         print(f"\n결과 저장 중: {output_file}")
-        df_result.to_csv(output_file, index=False, encoding='utf-8-sig')
+        output_path = add_stage_columns(input_file, output_file, {'Subcategory': df_result['Subcategory']}, dtype=str)
         
         print(f"\n=== 완료 ===")
         print(f"총 행 수: {len(df_result)}")
@@ -218,6 +208,8 @@ def add_subcategory_column():
             if len(category_data) > 0:
                 print(f"\n{category} ({len(category_data)}개):")
                 subcat_counts = category_data['Subcategory'].value_counts()
+                # category 칼럼은 다른 카테고리의 하위 카테고리도 0개로 나오므로 제외
+                subcat_counts = subcat_counts[subcat_counts > 0]
                 for subcat, count in subcat_counts.items():
                     percentage = (count / len(category_data)) * 100
                     print(f"  - {subcat}: {count}개 ({percentage:.2f}%)")
@@ -227,12 +219,34 @@ def add_subcategory_column():
         available_cols = [col for col in sample_cols if col in df_result.columns]
         print(df_result[available_cols].head(10).to_string())
         
-        print(f"\n파일 저장 완료: {output_file}")
+        print(f"\n파일 저장 완료: {output_path}")
+
+        cache_stats = {}
+        if title_cache is not None:
+            stats = title_cache.stats()
+            cache_stats = {'title_cache_hits': stats['hits'], 'title_cache_misses': stats['misses']}
+            print(f"Title 캐시: hit {stats['hits']:,} / miss {stats['misses']:,} (저장된 제목 {stats['entries']:,}개)")
+
+        metrics.add(rows_out=len(df_result))
+        metrics.add_distribution(df_result['Category'])
+        metrics.add_distribution(df_result['Category'].astype(str) + '/' + df_result['Subcategory'].astype(str),
+                                 'Subcategory')
+        metrics.wrote_file(output_path)
+        metrics.finish(**cache_stats)
+        # 출력 파일까지 저장한 경우에만 캐시에 저장
+        cache.save()
+        return True
         
     except Exception as e:
         print(f"오류 발생: {e}")
         import traceback
         traceback.print_exc()
+        return False
+    finally:
+        if title_cache is not None:
+            title_cache.close()
 
 if __name__ == "__main__":
-    add_subcategory_column()
\ No newline at end of file
+    args = parse_stage_args('하위 카테고리 분류 (04_ → 05_)', title_cache=True)
+    if not add_subcategory_column(force=args.force, title_cache_path=args.title_cache):
+        raise SystemExit(1)
\ No newline at end of file
@@ -1,63 +1,79 @@
 import pandas as pd
 import os
 
-script_dir = os.path.dirname(os.path.abspath(__file__))
-input_file = '05_CG_eBay_active_listing_data_subcategorized.csv'
-output_file = '06_CG_eBay_uploads_file.csv'
-
-input_path = os.path.join(script_dir, input_file)
-output_path = os.path.join(script_dir, output_file)
-
-
-df = pd.read_csv(input_path)
-
-# 시크 강남 Category_id 지정
-# Category == Accessaries
-df.loc[(df['Category'] == 'Accessaries') & (df['Subcategory'] == 'Bracelets'), 'Category_id'] = 42101761010
-df.loc[(df['Category'] == 'Accessaries') & (df['Subcategory'] == 'Earrings'), 'Category_id'] = 42103078010
-df.loc[(df['Category'] == 'Accessaries') & (df['Subcategory'] == 'Necklaces'), 'Category_id'] = 42101762010
-df.loc[(df['Category'] == 'Accessaries') & (df['Subcategory'] == 'Rings'), 'Category_id'] = 42101763010
-df.loc[(df['Category'] == 'Accessaries') & (df['Subcategory'] == 'Others'), 'Category_id'] = 42101764010
-
-# Category == Bags
-df.loc[(df['Category'] == 'Bags') & (df['Subcategory'] == 'Crossbody'), 'Category_id'] = 42101755010
-df.loc[(df['Category'] == 'Bags') & (df['Subcategory'] == 'Clutch'), 'Category_id'] = 42101756010
-df.loc[(df['Category'] == 'Bags') & (df['Subcategory'] == 'Shoulder'), 'Category_id'] = 42101757010
-df.loc[(df['Category'] == 'Bags') & (df['Subcategory'] == 'Tote'), 'Category_id'] = 42101758010
-df.loc[(df['Category'] == 'Bags') & (df['Subcategory'] == 'Others'), 'Category_id'] = 42101759010
-
-# Category == Clothes
-df.loc[(df['Category'] == 'Clothes') & (df['Subcategory'] == 'Outer'), 'Category_id'] = 42101765010
-df.loc[(df['Category'] == 'Clothes') & (df['Subcategory'] == 'Pants & Skirts'), 'Category_id'] = 42101766010
-df.loc[(df['Category'] == 'Clothes') & (df['Subcategory'] == 'Tops'), 'Category_id'] = 42101767010
-df.loc[(df['Category'] == 'Clothes') & (df['Subcategory'] == 'Dress'), 'Category_id'] = 42103319010
-df.loc[(df['Category'] == 'Clothes') & (df['Subcategory'] == 'Others'), 'Category_id'] = 42101768010
-
-# Category == Shoes
-df.loc[(df['Category'] == 'Shoes') & (df['Subcategory'] == 'Boots'), 'Category_id'] = 42101769010
-df.loc[(df['Category'] == 'Shoes') & (df['Subcategory'] == 'Heels'), 'Category_id'] = 42101770010
-df.loc[(df['Category'] == 'Shoes') & (df['Subcategory'] == 'Dress'), 'Category_id'] = 42101771010
-df.loc[(df['Category'] == 'Shoes') & (df['Subcategory'] == 'Sneakers'), 'Category_id'] = 42101772010
-df.loc[(df['Category'] == 'Shoes') & (df['Subcategory'] == 'Others'), 'Category_id'] = 42101773010
-
-# Category == Watches
-df.loc[(df['Category'] == 'Watches') & (df['Subcategory'] == 'Breitling'), 'Category_id'] = 42101774010
-df.loc[(df['Category'] == 'Watches') & (df['Subcategory'] == 'Cartier'), 'Category_id'] = 42101775010
-df.loc[(df['Category'] == 'Watches') & (df['Subcategory'] == 'Ferragamo'), 'Category_id'] = 42101776010
-df.loc[(df['Category'] == 'Watches') & (df['Subcategory'] == 'Gucci'), 'Category_id'] = 42101777010
-df.loc[(df['Category'] == 'Watches') & (df['Subcategory'] == 'Mido'), 'Category_id'] = 42101778010
-df.loc[(df['Category'] == 'Watches') & (df['Subcategory'] == 'Montblanc'), 'Category_id'] = 42101779010
-df.loc[(df['Category'] == 'Watches') & (df['Subcategory'] == 'Omega'), 'Category_id'] = 42101780010
-df.loc[(df['Category'] == 'Watches') & (df['Subcategory'] == 'Tag Heuer'), 'Category_id'] = 42101781010
-df.loc[(df['Category'] == 'Watches') & (df['Subcategory'] == 'Others'), 'Category_id'] = 42101782010
-
-df_upload = pd.DataFrame({
-    'Action': 'Revise',
-    'ItemID': df['Item number'].astype(str),
-    'StoreCategory': df['Category_id'].fillna(0).astype(int).astype(str)
-})
-
-df_upload = df_upload[df_upload['StoreCategory'] != '0']
-
-df_upload.to_csv(output_path, index=False, encoding='utf-8')
-print(f'파일 저장 완료 : {output_file}')
\ No newline at end of file
+from CG_io import read_stage
+from CG_metrics import StageMetrics
+from CG_taxonomy import load_taxonomy
+from CG_upload_state import UploadState
+from CG_schema import COMPACT, MEMORY_BUDGET_MB, compact_frame, memory_report
+
+
+# 시크 강남 Category_id (Category, Subcategory → Category_id)는 CG_taxonomy.json에서 관리
+TAXONOMY = load_taxonomy()
+CATEGORY_IDS = TAXONOMY.category_ids
+
+
+def assign_category_id(df):
+    """
+    Category / Subcategory 조합에 맞는 시크 강남 Category_id 칼럼 추가 (매칭되는 조합이 없으면 NaN)
+
+    조합별로 전체 행을 비교하지 않고 Category_id 테이블과 한 번에 merge
+    """
+    keys = df[['Category', 'Subcategory']].astype(object)
+    matched = keys.merge(CATEGORY_IDS, how='left', on=['Category', 'Subcategory'], validate='many_to_one')
+    df['Category_id'] = matched['Category_id'].astype('float64').to_numpy()
+    return df
+
+
+def build_upload_frame(df):
+    """
+    eBay 업로드용 Revise 파일 생성 (Category_id가 없는 행은 제외)
+    """
+    df_upload = pd.DataFrame({
+        'Action': 'Revise',
+        'ItemID': df['Item number'].astype(str),
+        'StoreCategory': df['Category_id'].fillna(0).astype(int).astype(str)
+    })
+
+    df_upload = df_upload[df_upload['StoreCategory'] != '0']
+
+    return df_upload
+
+
+if __name__ == "__main__":
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    input_file = '05_CG_eBay_active_listing_data_subcategorized'
+    output_file = '06_CG_eBay_uploads_file.csv'
+
+    input_path = os.path.join(script_dir, input_file)
+    output_path = os.path.join(script_dir, output_file)
+
+    metrics = StageMetrics('04_preprocessing_uploads')
+    metrics.read_file(input_path)
+
+    # 업로드 파일에 필요한 칼럼만 읽기
+    df = read_stage(input_path, columns=['Item number', 'Category', 'Subcategory'])
+    if COMPACT:
+        df = compact_frame(df)
+    df = assign_category_id(df)
+    if COMPACT:
+        # NaN이 있어 float인 Category_id를 정수(Int64)로
+        df = compact_frame(df)
+    if COMPACT or MEMORY_BUDGET_MB is not None:
+        memory_report(df, input_file, MEMORY_BUDGET_MB)
+    df_upload = build_upload_frame(df)
+
+    # 마지막으로 업로드가 확인된 이후 새로 생겼거나 StoreCategory가 바뀐 행만 업로드 (CG_FULL_UPLOAD=1이면 전체)
+    # 상태는 업로드가 성공한 뒤 저장 (CG_revise_client.py 또는 CG_upload_state.py --confirm)
+    upload_state = UploadState()
+    df_upload = upload_state.select_delta(df_upload)
+
+    df_upload.to_csv(output_path, index=False, encoding='utf-8')
+    print(f'업로드 행 수: {upload_state.summary()}')
+    upload_state.close()
+    print(f'파일 저장 완료 : {output_file}')
+
+    metrics.add(rows_in=len(df), rows_out=len(df_upload))
+    metrics.add_distribution(df_upload['StoreCategory'])
+    metrics.wrote_file(output_path)
+    metrics.finish(upload_new=upload_state.counts['new'], upload_changed=upload_state.counts['changed'])
@@ -0,0 +1,322 @@
+"""
+DB raw_data(item specifics) 속성 테이블 생성 스크립트
+00_DB 파일의 raw_data JSON을 한 번만 파싱하여 모든 item specific 키(color, material, size, model 등)를
+origin_id 기준의 칼럼형 테이블로 펼쳐 Parquet으로 저장
+이전 실행 결과가 있으면 raw_data 해시가 바뀌지 않은 행은 다시 파싱하지 않고 재사용
+
+- 중첩 객체는 경로 이름 칼럼으로 펼침 (예: {"spec": {"size": {"width": 46}}} → spec_size_width)
+- 청크별 결과를 임시 Parquet 파일에 나눠 저장한 뒤 칼럼 / dtype을 합쳐서 ParquetWriter로 한 청크씩 기록
+  (이전 테이블 / 전체 결과를 메모리에 올리지 않음, 이전 테이블은 origin_id / 해시 칼럼만 읽음)
+
+사용 예 (칼럼만 골라서 읽기):
+    load_attributes(['color', 'material'])
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DB_FILE = '00_DB_eBay_active_listing_data.csv'
+ATTRIBUTE_FILE = '01_DB_eBay_raw_data_attributes.parquet'
+
+KEY_COLUMN = 'origin_id'
+HASH_COLUMN = 'raw_data_hash'
+RESERVED_COLUMNS = {KEY_COLUMN, HASH_COLUMN}
+
+# 리스트 값은 하나의 문자열로 합쳐서 저장
+LIST_SEPARATOR = ' | '
+
+
+def hash_raw_data(raw_data: pd.Series) -> pd.Series:
+    """
+    raw_data 칼럼의 행별 해시 (변경 여부 확인용, 빈 값은 '')
+    """
+    return raw_data.fillna('').astype(str).map(
+        lambda spec_str: hashlib.blake2b(spec_str.encode('utf-8'), digest_size=16).hexdigest())
+
+
+def normalize_key(key: str) -> str:
+    """
+    item specific 키를 칼럼명으로 정규화 (예: 'Department ' → 'department', 'Sleeve Length' → 'sleeve_length')
+    """
+    column = re.sub(r'\s+', '_', str(key).strip().lower())
+    if column in RESERVED_COLUMNS:
+        column = f'spec_{column}'
+    return column
+
+
+def _flatten_items(spec_dict: dict, prefix: str, flat: Dict[str, object]):
+    """
+    딕셔너리의 값을 prefix + 정규화한 키 칼럼으로 flat에 추가 (중첩 객체는 재귀로 펼침)
+    """
+    for key, value in spec_dict.items():
+        column = normalize_key(prefix + str(key).strip())
+        if isinstance(value, dict):
+            _flatten_items(value, column + '_', flat)
+            continue
+        if isinstance(value, list):
+            value = LIST_SEPARATOR.join(str(x) for x in value)
+        elif value is None:
+            continue
+
+        if column not in flat or flat[column] == '':
+            flat[column] = value
+
+
+def flatten_spec(spec_str: str) -> Dict[str, object]:
+    """
+    raw_data JSON 하나를 {칼럼명: 값} 딕셔너리로 펼침
+
+    - 최상위가 딕셔너리가 아니거나 JSON 파싱에 실패하면 빈 딕셔너리
+    - 리스트 값은 원소를 ' | '로 합친 문자열
+    - 중첩 객체는 상위 키 경로를 붙인 칼럼으로 펼침 (spec.color → spec_color, spec.size.width → spec_size_width)
+    - 정규화 후 같은 칼럼명이 되는 키(brand / Brand 등)는 먼저 나온 비어 있지 않은 값 사용
+    """
+    if not spec_str or pd.isna(spec_str):
+        return {}
+
+    try:
+        spec_dict = json.loads(spec_str)
+    except (json.JSONDecodeError, TypeError):
+        return {}
+
+    if not isinstance(spec_dict, dict):
+        return {}
+
+    flat = {}
+    _flatten_items(spec_dict, '', flat)
+    return flat
+
+
+def _infer_dtype(values: pd.Series) -> str:
+    """
+    JSON 값 타입에 맞는 칼럼 dtype 결정 (bool → boolean, 정수 → Int64, 실수 → Float64, 그 외 → string)
+    """
+    inferred = pd.api.types.infer_dtype(values, skipna=True)
+    if inferred == 'boolean':
+        return 'boolean'
+    if inferred == 'integer':
+        return 'Int64'
+    if inferred in ('floating', 'mixed-integer-float'):
+        return 'Float64'
+    return 'string'
+
+
+def stringify_attributes(df: pd.DataFrame):
+    """
+    청크의 속성 칼럼을 문자열(str(값))로 바꾸고 칼럼별 dtype을 기록 (임시 파일 저장용, 최종 dtype 변환은 기록할 때)
+
+    Returns:
+        (모든 칼럼이 string인 DataFrame, {칼럼명: _infer_dtype 결과} - origin_id / raw_data_hash는 string)
+    """
+    dtypes = {}
+    columns = {}
+    for column in df.columns:
+        dtypes[column] = 'string' if column in RESERVED_COLUMNS else _infer_dtype(df[column])
+        columns[column] = df[column].map(lambda x: x if isinstance(x, str) or pd.isna(x) else str(x)).astype('string')
+    return pd.DataFrame(columns, index=df.index), dtypes
+
+
+def flatten_raw_data(df_db: pd.DataFrame) -> pd.DataFrame:
+    """
+    origin_id, raw_data, raw_data_hash 칼럼이 있는 DataFrame을 속성 테이블로 펼침
+    """
+    records = [flatten_spec(spec_str) for spec_str in df_db['raw_data']]
+    attributes = pd.DataFrame.from_records(records, index=df_db.index)
+    attributes.insert(0, KEY_COLUMN, df_db[KEY_COLUMN])
+    attributes.insert(1, HASH_COLUMN, df_db[HASH_COLUMN])
+    return attributes
+
+
+# 청크별 dtype을 합칠 때 둘 다 담을 수 있는 dtype (그 외 조합은 string)
+_DTYPE_MERGE = {frozenset(['Int64', 'Float64']): 'Float64'}
+_ARROW_TYPES = {'string': pa.string(), 'Int64': pa.int64(), 'Float64': pa.float64(), 'boolean': pa.bool_()}
+
+
+def merge_dtypes(dtypes: Dict[str, str], frame_dtypes: Dict[str, str]):
+    """
+    청크의 칼럼 dtype을 전체 dtype에 합침 (처음 나온 칼럼은 뒤에 추가, 다르면 Float64 또는 string)
+    """
+    for column, dtype in frame_dtypes.items():
+        previous = dtypes.setdefault(column, dtype)
+        if previous != dtype:
+            dtypes[column] = _DTYPE_MERGE.get(frozenset([previous, dtype]), 'string')
+
+
+def conform_attributes(df: pd.DataFrame, dtypes: Dict[str, str]) -> pd.DataFrame:
+    """
+    청크를 전체 칼럼 / dtype에 맞춤 (없는 칼럼은 NA)
+
+    임시 파일의 문자열 칼럼은 최종 dtype으로 변환하고,
+    이전 테이블의 칼럼(Int64 / Float64 / boolean)이 string이 되면 str(값)과 같은 문자열로 변환
+    """
+    columns = {}
+    for column, dtype in dtypes.items():
+        if column not in df.columns:
+            columns[column] = pd.Series(pd.NA, index=df.index, dtype=dtype)
+            continue
+        values = df[column]
+        if str(values.dtype) == dtype:
+            columns[column] = values
+        elif dtype == 'boolean' and str(values.dtype) == 'string':
+            columns[column] = values.map({'True': True, 'False': False}).astype('boolean')
+        elif dtype == 'string' and str(values.dtype) == 'boolean':
+            columns[column] = values.map(lambda x: x if pd.isna(x) else str(bool(x))).astype('string')
+        else:
+            columns[column] = values.astype(dtype)
+    return pd.DataFrame(columns, index=df.index)
+
+
+def build_attribute_table(db_path: str,
+                          attribute_path: str,
+                          chunk_size: int = 50000,
+                          force: bool = False) -> Dict[str, int]:
+    """
+    DB 파일을 청크 단위로 읽어서 속성 테이블(Parquet) 생성
+
+    1) 청크마다 이전 테이블과 해시가 같은 origin_id는 재사용 대상으로 표시하고, 나머지만 파싱하여 임시 파일로 저장
+    2) 이전 테이블의 재사용 행 / 임시 파일을 한 청크씩 전체 칼럼 / dtype에 맞춰 ParquetWriter로 기록
+
+    Args:
+        db_path: 00_DB 파일 경로
+        attribute_path: 속성 테이블 Parquet 경로 (이전 결과가 있으면 캐시로 사용)
+        chunk_size: 한 번에 처리할 행 수
+        force: True인 경우 캐시를 무시하고 전부 다시 파싱
+
+    Returns:
+        처리 통계 (rows, parsed, reused)
+    """
+    start_time = time.time()
+
+    cached_hash = None
+    previous_dtypes = {}
+    dtypes = {KEY_COLUMN: 'string', HASH_COLUMN: 'string'}
+    if not force and os.path.exists(attribute_path):
+        # 이전 테이블은 origin_id / 해시만 읽음 (재사용 행은 기록할 때 row group 단위로 읽음)
+        previous = pq.read_table(attribute_path, columns=[KEY_COLUMN, HASH_COLUMN]).to_pandas()
+        cached_hash = pd.Series(previous[HASH_COLUMN].to_numpy(), index=previous[KEY_COLUMN].to_numpy())
+        # 이전 테이블 행 순서의 재사용 여부 (기록할 때 row group을 순서대로 읽으면서 위치로 골라냄)
+        reuse_flags = np.zeros(len(cached_hash), dtype=bool)
+        # 재사용 행의 칼럼 / dtype (pandas 메타데이터로 Int64 / boolean / string 복원)
+        previous_dtypes = {column: str(dtype) for column, dtype in
+                           pq.read_schema(attribute_path).empty_table().to_pandas().dtypes.items()}
+        merge_dtypes(dtypes, previous_dtypes)
+        print(f"이전 속성 테이블 로드: {attribute_path} ({len(cached_hash):,}개 행)")
+        del previous
+
+    stats = {'rows': 0, 'parsed': 0, 'reused': 0}
+    reused_any = False
+    seen = set()
+    part_dir = attribute_path + '.parts'
+    shutil.rmtree(part_dir, ignore_errors=True)
+    os.makedirs(part_dir)
+    part_paths = []
+
+    try:
+        for chunk_num, chunk in enumerate(pd.read_csv(db_path, chunksize=chunk_size, dtype=str,
+                                                      usecols=[KEY_COLUMN, 'raw_data']), 1):
+            # origin_id 기준 테이블이므로 중복 origin_id는 처음 나온 행만 사용
+            # (큰 set에 Series.isin을 쓰면 청크마다 set 전체를 변환하므로 키별로 확인)
+            chunk = chunk[chunk[KEY_COLUMN].notna()]
+            chunk = chunk[np.fromiter((key not in seen for key in chunk[KEY_COLUMN]), dtype=bool, count=len(chunk))]
+            chunk = chunk.drop_duplicates(KEY_COLUMN)
+            seen.update(chunk[KEY_COLUMN])
+
+            chunk = chunk.assign(**{HASH_COLUMN: hash_raw_data(chunk['raw_data'])})
+
+            if cached_hash is not None:
+                unchanged = (chunk[KEY_COLUMN].map(cached_hash) == chunk[HASH_COLUMN]).fillna(False).astype(bool)
+                reuse_flags[cached_hash.index.get_indexer(chunk.loc[unchanged, KEY_COLUMN])] = True
+                reused_any = reused_any or bool(unchanged.any())
+            else:
+                unchanged = pd.Series(False, index=chunk.index)
+
+            parsed = flatten_raw_data(chunk[~unchanged])
+            if len(parsed) > 0:
+                # 값은 str(값)으로 저장하고 dtype은 전체 청크를 본 뒤 결정 (Float64로 저장하면 정수 54가 '54.0'이 됨)
+                parsed, parsed_dtypes = stringify_attributes(parsed.reset_index(drop=True))
+                merge_dtypes(dtypes, parsed_dtypes)
+                part_path = os.path.join(part_dir, f'{chunk_num:06d}.parquet')
+                parsed.to_parquet(part_path, index=False)
+                part_paths.append(part_path)
+
+            stats['rows'] += len(chunk)
+            stats['parsed'] += len(parsed)
+            stats['reused'] += int(unchanged.sum())
+            print(f"  청크 {chunk_num} 처리 완료 (파싱: {len(parsed)}, 재사용: {int(unchanged.sum())})")
+
+        # 이전 테이블의 Float64 칼럼이 string이 되면 원래 정수 / 실수 표기를 알 수 없으므로 전부 다시 파싱
+        if reused_any and any(dtype == 'Float64' and dtypes[column] == 'string'
+                              for column, dtype in previous_dtypes.items()):
+            print("이전 속성 테이블의 숫자 칼럼이 문자열 칼럼이 되어 전체 행을 다시 파싱합니다.")
+            return build_attribute_table(db_path, attribute_path, chunk_size, force=True)
+
+        # 같은 디렉토리에 임시 파일로 저장한 뒤 교체 (저장 중 실패해도 이전 캐시 유지)
+        empty = conform_attributes(pd.DataFrame(), dtypes)
+        schema = pa.Schema.from_pandas(empty, preserve_index=False)
+        tmp_path = attribute_path + '.tmp'
+        with pq.ParquetWriter(tmp_path, schema) as writer:
+            def write(frame: pd.DataFrame):
+                frame = conform_attributes(frame.reset_index(drop=True), dtypes)
+                writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+
+            if reused_any:
+                offset = 0
+                for batch in pq.ParquetFile(attribute_path).iter_batches(batch_size=chunk_size):
+                    frame = pa.Table.from_batches([batch]).to_pandas()
+                    frame = frame[reuse_flags[offset:offset + len(frame)]]
+                    offset += batch.num_rows
+                    if len(frame) > 0:
+                        write(frame)
+            for part_path in part_paths:
+                write(pd.read_parquet(part_path))
+        os.replace(tmp_path, attribute_path)
+    finally:
+        shutil.rmtree(part_dir, ignore_errors=True)
+
+    print(f"\n=== 완료 ===")
+    print(f"총 행 수: {stats['rows']:,} (파싱: {stats['parsed']:,}, 재사용: {stats['reused']:,})")
+    print(f"속성 칼럼 수: {len(dtypes) - len(RESERVED_COLUMNS)}")
+    print(f"소요 시간: {time.time() - start_time:.1f}초")
+    print(f"파일 저장 완료: {attribute_path}")
+
+    return stats
+
+
+def load_attributes(columns: Optional[List[str]] = None,
+                    attribute_path: str = os.path.join(SCRIPT_DIR, ATTRIBUTE_FILE)) -> pd.DataFrame:
+    """
+    속성 테이블에서 필요한 칼럼만 읽기 (origin_id는 항상 포함)
+
+    Args:
+        columns: 읽을 속성 칼럼 (None이면 전체)
+        attribute_path: 속성 테이블 Parquet 경로
+    """
+    if columns is not None:
+        columns = [KEY_COLUMN] + [c for c in columns if c != KEY_COLUMN]
+    return pd.read_parquet(attribute_path, columns=columns)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='DB raw_data 속성 테이블(Parquet) 생성')
+    parser.add_argument('--input-dir', default=SCRIPT_DIR, help='00_DB 파일 디렉토리 (기본값: 스크립트 위치)')
+    parser.add_argument('--chunk-size', type=int, default=50000, help='청크 크기')
+    parser.add_argument('--force', action='store_true', help='캐시를 무시하고 전부 다시 파싱')
+    args = parser.parse_args()
+
+    build_attribute_table(os.path.join(args.input_dir, DB_FILE),
+                          os.path.join(args.input_dir, ATTRIBUTE_FILE),
+                          chunk_size=args.chunk_size,
+                          force=args.force)
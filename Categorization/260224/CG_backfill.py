@@ -0,0 +1,230 @@
+"""
+Categorization 날짜 폴더 일괄 재처리(backfill) 스크립트
+규칙(CG_taxonomy.json / CG_brand_aliases.json)이 바뀌었을 때 여러 스냅샷 날짜 폴더(Categorization/<YYMMDD>)를
+CG_run_pipeline.py로 한 번에 다시 분류하고 결과(06_ 파일 등)를 각 날짜 폴더에 저장
+
+- 날짜는 목록(260212 260213) 또는 범위(260212-260224)로 지정, 범위는 상위 폴더에 있는 날짜 폴더 중 해당 구간
+- 단계별 모듈 / taxonomy / 브랜드 인덱스는 메인 프로세스에서 한 번 로드하고 날짜별 작업 프로세스는 fork로 물려받음
+- 날짜 폴더는 프로세스 풀에서 병렬 처리 (--jobs, 기본값: CG_BACKFILL_JOBS 또는 CPU 수)
+- 날짜마다 임시 폴더에 결과를 모두 쓰고, 성공한 경우에만 임시 폴더 이름을 커밋 폴더(.backfill-commit)로 바꾼 뒤
+  파일별로 날짜 폴더로 교체(os.replace) - 폴더 이름 바꾸기(원자적)가 날짜 하나의 커밋 지점
+  → 커밋 전에 실패하거나 중단되면 기존 결과 파일은 그대로
+  → 커밋 후 교체 도중 중단되면 다음 실행(같은 날짜 재처리 또는 --recover)에서 커밋 폴더의 남은 파일을 마저 교체
+    (이전 결과와 새 결과가 섞인 상태로 끝나지 않음)
+- 과거 날짜 재처리이므로 업로드 상태(CG_upload_state.sqlite)는 건드리지 않고 06 파일은 전체 행으로 저장
+  날짜끼리 순서 의존이 생기지 않도록 --incremental(이전 날짜 상태 재사용)은 사용하지 않음
+- 날짜별 실행 로그는 각 날짜 폴더의 CG_backfill.log
+- --title-cache를 여러 날짜(--jobs)가 함께 쓰면 SQLite 쓰기 잠금을 기다림 (CG_title_cache.BUSY_TIMEOUT_SECONDS)
+
+사용 예:
+    python CG_backfill.py 260212-260224 --jobs 4
+"""
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
+from typing import Dict, List, Optional
+
+from CG_incremental import SNAPSHOT_DIR_PATTERN
+from CG_io import STAGE_FORMATS
+from CG_run_pipeline import load_stages, run_pipeline
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(SCRIPT_DIR)
+
+JOBS = int(os.environ.get('CG_BACKFILL_JOBS', '0')) or os.cpu_count() or 1
+LOG_FILE = 'CG_backfill.log'
+TEMP_PREFIX = '.backfill-'
+# 결과를 모두 쓴 임시 폴더의 이름을 바꾸는 커밋 폴더 (있으면 날짜 폴더로 교체가 끝나지 않은 상태)
+COMMIT_DIR = '.backfill-commit'
+# 임시 폴더 안에서 날짜 폴더로 옮기지 않는 하위 폴더 (업로드 상태 등)
+SCRATCH_DIR = 'scratch'
+
+
+def resolve_dates(specs: List[str], root_dir: str = ROOT_DIR) -> List[str]:
+    """
+    날짜 목록 / 범위를 날짜 폴더 이름 리스트로 변환
+
+    Args:
+        specs: ['260212', '260219-260224'] 형식
+        root_dir: 날짜 폴더가 있는 상위 폴더
+
+    Returns:
+        정렬된 날짜 폴더 이름 리스트 (중복 제거)
+    """
+    available = sorted(name for name in os.listdir(root_dir)
+                       if SNAPSHOT_DIR_PATTERN.match(name) and os.path.isdir(os.path.join(root_dir, name)))
+    dates = set()
+    for spec in specs:
+        if '-' in spec:
+            start, end = spec.split('-', 1)
+            matched = [name for name in available if start <= name <= end]
+            if not matched:
+                raise ValueError(f"범위에 해당하는 날짜 폴더가 없습니다: {spec}")
+            dates.update(matched)
+        elif spec in available:
+            dates.add(spec)
+        else:
+            raise ValueError(f"날짜 폴더가 없습니다: {os.path.join(root_dir, spec)}")
+    return sorted(dates)
+
+
+def commit_outputs(date_dir: str) -> int:
+    """
+    커밋 폴더의 결과 파일을 날짜 폴더로 옮기고 커밋 폴더 삭제
+    (중간에 중단된 경우 다시 호출하면 남은 파일만 마저 옮김)
+
+    Returns:
+        옮긴 파일 수 (커밋 폴더가 없으면 0)
+    """
+    commit_dir = os.path.join(date_dir, COMMIT_DIR)
+    if not os.path.isdir(commit_dir):
+        return 0
+    moved = 0
+    for name in sorted(os.listdir(commit_dir)):
+        path = os.path.join(commit_dir, name)
+        if os.path.isfile(path):
+            os.replace(path, os.path.join(date_dir, name))
+            moved += 1
+    shutil.rmtree(commit_dir)
+    return moved
+
+
+def recover_dates(dates: List[str], root_dir: str = ROOT_DIR) -> List[str]:
+    """
+    커밋했지만 교체가 끝나지 않은 날짜 폴더의 결과 파일을 마저 교체
+
+    Returns:
+        교체를 마친 날짜 폴더 이름 리스트
+    """
+    return [date for date in dates if commit_outputs(os.path.join(root_dir, date))]
+
+
+def backfill_date(date: str, root_dir: str, options: Dict[str, object]) -> Dict[str, object]:
+    """
+    날짜 폴더 하나를 임시 폴더에 처리한 뒤 결과 파일을 날짜 폴더로 교체 (작업 프로세스에서 실행)
+
+    Args:
+        date: 날짜 폴더 이름
+        root_dir: 날짜 폴더가 있는 상위 폴더
+        options: run_pipeline 옵션 (chunk_size, debug, debug_format, title_cache_path, workers)
+
+    Returns:
+        처리 결과 (date, status, seconds, run_pipeline 통계 또는 error)
+    """
+    date_dir = os.path.join(root_dir, date)
+    # 이전 실행에서 커밋 후 중단된 교체를 먼저 끝냄 (새 결과 폴더를 같은 이름으로 커밋할 수 있도록)
+    commit_outputs(date_dir)
+    # 같은 파일시스템 안에서 이름을 바꿔야 원자적이므로 임시 폴더는 날짜 폴더 안에 만듦
+    temp_dir = tempfile.mkdtemp(prefix=TEMP_PREFIX, dir=date_dir)
+    scratch_dir = os.path.join(temp_dir, SCRATCH_DIR)
+    os.makedirs(scratch_dir)
+    log_path = os.path.join(temp_dir, LOG_FILE)
+    started = time.perf_counter()
+
+    try:
+        with open(log_path, 'w', encoding='utf-8') as log, redirect_stdout(log):
+            stats = run_pipeline(date_dir, temp_dir, **options,
+                                 upload_state_path=os.path.join(scratch_dir, 'CG_upload_state.sqlite'),
+                                 full_upload=True, prometheus_path=None)
+        shutil.rmtree(scratch_dir)
+        # 커밋 지점: 이후에 중단되어도 다음 실행에서 커밋 폴더의 파일을 마저 교체
+        os.rename(temp_dir, os.path.join(date_dir, COMMIT_DIR))
+        commit_outputs(date_dir)
+        return {'date': date, 'status': 'ok', 'seconds': round(time.perf_counter() - started, 3), **stats}
+    except Exception as e:
+        # 커밋 전에 실패한 경우 로그만 남기고 결과 파일은 교체하지 않음 (커밋 후 교체 중 실패하면 다음 실행에서 마저 교체)
+        if os.path.exists(log_path):
+            os.replace(log_path, os.path.join(date_dir, LOG_FILE))
+        return {'date': date, 'status': 'failed', 'seconds': round(time.perf_counter() - started, 3),
+                'error': f'{type(e).__name__}: {e}'}
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def backfill(dates: List[str], root_dir: str = ROOT_DIR, jobs: int = JOBS,
+             options: Optional[Dict[str, object]] = None) -> List[Dict[str, object]]:
+    """
+    날짜 폴더들을 프로세스 풀에서 병렬로 재처리
+
+    Args:
+        dates: 날짜 폴더 이름 리스트
+        root_dir: 날짜 폴더가 있는 상위 폴더
+        jobs: 동시에 처리할 날짜 수 (1이면 현재 프로세스에서 순서대로)
+        options: run_pipeline 옵션
+
+    Returns:
+        날짜별 처리 결과 (날짜순)
+    """
+    options = options or {}
+    # 작업 프로세스가 fork로 물려받도록 시작 전에 단계별 모듈(taxonomy / 브랜드 인덱스 포함)을 로드
+    load_stages()
+
+    results = []
+    jobs = max(1, min(jobs, len(dates)))
+    if jobs == 1:
+        for date in dates:
+            results.append(backfill_date(date, root_dir, options))
+            _print_result(results[-1])
+    else:
+        # fork를 지원하지 않는 플랫폼은 기본 방식(spawn)으로 시작하고 프로세스마다 다시 로드
+        context = multiprocessing.get_context('fork') if 'fork' in multiprocessing.get_all_start_methods() else None
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=context) as pool:
+            futures = [pool.submit(backfill_date, date, root_dir, options) for date in dates]
+            for future in as_completed(futures):
+                results.append(future.result())
+                _print_result(results[-1])
+    return sorted(results, key=lambda result: result['date'])
+
+
+def _print_result(result: Dict[str, object]):
+    if result['status'] == 'ok':
+        print(f"  {result['date']} 완료: {result['rows']:,}개 행, 업로드 {result['uploads']:,}개 행 "
+              f"({result['seconds']:.1f}초)")
+    else:
+        print(f"  {result['date']} 실패: {result['error']} ({result['seconds']:.1f}초, 로그: {LOG_FILE})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Categorization 날짜 폴더 일괄 재처리')
+    parser.add_argument('dates', nargs='+', help='날짜 폴더 (예: 260212 260213 또는 260212-260224)')
+    parser.add_argument('--root', default=ROOT_DIR, help='날짜 폴더가 있는 상위 폴더 (기본값: Categorization)')
+    parser.add_argument('--jobs', type=int, default=JOBS, help='동시에 처리할 날짜 수 (기본값: CG_BACKFILL_JOBS 또는 CPU 수)')
+    parser.add_argument('--workers', type=int, default=1, help='날짜별 01 ~ 04 단계 작업 프로세스 수')
+    parser.add_argument('--chunk-size', type=int, default=10000, help='청크 크기')
+    parser.add_argument('--debug', action='store_true', help='중간 파일(01_ ~ 05_) 저장')
+    parser.add_argument('--format', choices=STAGE_FORMATS, default=None, help='중간 파일 저장 형식 (기본값: parquet)')
+    parser.add_argument('--title-cache', default=None, help='Title 분류 결과 캐시 경로 (날짜 간 공유)')
+    parser.add_argument('--recover', action='store_true',
+                        help='다시 처리하지 않고 커밋 후 중단된 날짜 폴더의 결과 파일 교체만 마침')
+    args = parser.parse_args()
+
+    dates = resolve_dates(args.dates, args.root)
+    if args.recover:
+        recovered = recover_dates(dates, args.root)
+        print(f"교체를 마친 날짜 폴더: {', '.join(recovered) if recovered else '없음'}")
+        return
+    print(f"재처리 대상: {', '.join(dates)} (동시 처리: {min(args.jobs, len(dates))})")
+    started = time.perf_counter()
+    results = backfill(dates, args.root, args.jobs,
+                       {'chunk_size': args.chunk_size, 'debug': args.debug, 'debug_format': args.format,
+                        'title_cache_path': args.title_cache, 'workers': args.workers})
+
+    failed = [result['date'] for result in results if result['status'] != 'ok']
+    print(f"\n=== 완료 ===")
+    print(f"날짜 폴더: {len(results) - len(failed)}개 성공, {len(failed)}개 실패")
+    print(f"총 행 수: {sum(result.get('rows', 0) for result in results):,}")
+    print(f"소요 시간: {time.perf_counter() - started:.1f}초")
+    if failed:
+        print(f"실패한 날짜: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
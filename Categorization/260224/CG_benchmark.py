@@ -0,0 +1,265 @@
+"""
+Categorization 규모별 성능 측정 스크립트
+CG_synthetic_data.py로 만든 입력 파일로 단계별 스크립트(00 ~ 04)와 통합 실행(CG_run_pipeline.py)을
+각각 별도 프로세스로 실행해서 소요 시간, 초당 처리 행 수, 최대 메모리(peak RSS)를 JSON으로 기록
+
+- 단계별 측정: 작업 디렉토리에 스크립트를 복사하고 입력 파일을 링크해서 기존 순서대로 실행
+- 통합 측정: --input-dir / --output-dir로 실행 (업로드 상태 / DB 저장소도 작업 디렉토리에 새로 만듦)
+- --baseline으로 이전 결과 JSON을 주면 초당 처리 행 수가 --tolerance 이상 떨어진 항목을 표시하고 종료 코드 1
+
+사용 예:
+    python CG_benchmark.py 100k 1m --output CG_benchmark_results.json
+    python CG_benchmark.py 100k --baseline CG_benchmark_results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from CG_run_pipeline import DB_FILE, LISTING_FILE, STAGE_FILES
+from CG_synthetic_data import generate_dataset, resolve_size
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PIPELINE_SCRIPT = 'CG_run_pipeline.py'
+
+# 초당 처리 행 수가 기준보다 이만큼 이상 떨어지면 성능 저하로 표시
+REGRESSION_TOLERANCE = 0.2
+
+# 측정 대상 스크립트를 실행하고 끝날 때 자기 프로세스의 최대 메모리를 CG_BENCHMARK_RSS_FILE에 기록하는 래퍼
+# (Linux의 ru_maxrss는 fork 시점 부모 프로세스의 메모리까지 이어받으므로 exec 후 새로 시작하는 VmHWM 사용)
+MEASURE_WRAPPER = """
+import os, resource, runpy, sys
+script = sys.argv[1]
+sys.argv = sys.argv[1:]
+sys.path.insert(0, os.path.dirname(os.path.abspath(script)))
+try:
+    runpy.run_path(script, run_name='__main__')
+finally:
+    peak = None
+    if os.path.exists('/proc/self/status'):
+        with open('/proc/self/status') as f:
+            peak = next((int(line.split()[1]) * 1024 for line in f if line.startswith('VmHWM:')), None)
+    if peak is None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+    with open(os.environ['CG_BENCHMARK_RSS_FILE'], 'w') as f:
+        f.write(f'{peak} {children}')
+"""
+
+
+def run_measured(script: str, args: List[str], cwd: str, log_path: str,
+                 env: Optional[Dict[str, str]] = None) -> dict:
+    """
+    스크립트를 별도 프로세스로 실행하고 소요 시간 / 최대 메모리 측정
+
+    Args:
+        script: 실행할 스크립트 경로
+        args: 스크립트 인자
+        cwd: 작업 디렉토리
+        log_path: 표준 출력 / 오류를 저장할 파일
+        env: 추가 환경변수
+
+    Returns:
+        seconds, peak_rss_mb (메인 프로세스), worker_peak_rss_mb (작업 프로세스 중 최대), returncode
+    """
+    rss_path = log_path + '.rss'
+    if os.path.exists(rss_path):
+        os.remove(rss_path)
+    with open(log_path, 'w', encoding='utf-8') as log:
+        started = time.perf_counter()
+        returncode = subprocess.call([sys.executable, '-c', MEASURE_WRAPPER, script] + args, cwd=cwd,
+                                     stdout=log, stderr=subprocess.STDOUT,
+                                     env={**os.environ, **(env or {}), 'CG_BENCHMARK_RSS_FILE': rss_path})
+        seconds = time.perf_counter() - started
+
+    peak_rss, worker_peak_rss = None, None
+    if os.path.exists(rss_path):
+        with open(rss_path) as f:
+            peak_rss, worker_peak_rss = (int(value) / 1024 / 1024 for value in f.read().split())
+        os.remove(rss_path)
+    return {'seconds': round(seconds, 3),
+            'peak_rss_mb': round(peak_rss, 1) if peak_rss is not None else None,
+            'worker_peak_rss_mb': round(worker_peak_rss, 1) if worker_peak_rss else None,
+            'returncode': returncode}
+
+
+def prepare_stage_dir(data_dir: str, work_dir: str) -> str:
+    """
+    단계별 스크립트 실행 디렉토리 준비 (스크립트 복사, 입력 파일 링크)
+
+    스크립트는 자기 위치의 파일을 읽고 쓰므로 저장소 폴더가 아닌 작업 디렉토리에서 실행
+    업로드 상태 기본 경로(스크립트 위치의 상위 폴더)도 작업 디렉토리 안에 생김
+    공통 모듈(Categorization/common)은 스크립트 위치 기준 ../common으로 찾으므로 work_dir/common에 복사
+    """
+    stage_dir = os.path.join(work_dir, 'stages')
+    os.makedirs(stage_dir, exist_ok=True)
+    for file_name in os.listdir(SCRIPT_DIR):
+        if file_name.endswith(('.py', '.json')):
+            shutil.copy2(os.path.join(SCRIPT_DIR, file_name), stage_dir)
+    shutil.copytree(os.path.join(os.path.dirname(SCRIPT_DIR), 'common'), os.path.join(work_dir, 'common'),
+                    dirs_exist_ok=True, ignore=shutil.ignore_patterns('__pycache__'))
+    for file_name in (LISTING_FILE, DB_FILE):
+        link = os.path.join(stage_dir, file_name)
+        if not os.path.exists(link):
+            os.symlink(os.path.abspath(os.path.join(data_dir, file_name)), link)
+    return stage_dir
+
+
+def benchmark_size(size: str, work_root: str, seed: int = 0, stages: bool = True, pipeline: bool = True,
+                   workers: int = 1, chunk_size: int = 10000) -> List[dict]:
+    """
+    한 규모의 입력 파일을 생성하고 단계별 / 통합 실행 측정
+
+    Returns:
+        측정 결과 리스트 (size, rows, target, seconds, rows_per_sec, peak_rss_mb, returncode)
+    """
+    rows = resolve_size(size)
+    work_dir = os.path.join(work_root, size)
+    data_dir = os.path.join(work_dir, 'data')
+
+    print(f"\n=== {size} ({rows:,}개 행) ===")
+    generated = generate_dataset(rows, data_dir, seed)
+    results = [{'size': size, 'rows': rows, 'target': 'generate', 'seconds': generated['seconds'],
+                'rows_per_sec': round(rows / generated['seconds'], 1), 'peak_rss_mb': None, 'returncode': 0}]
+    # 초당 처리 행 수는 모두 리스팅 행 수 기준
+    env = {'CG_FULL_UPLOAD': '1', 'CG_WORKERS': str(workers)}
+
+    targets = []
+    if stages:
+        stage_dir = prepare_stage_dir(data_dir, work_dir)
+        targets += [(file_name, os.path.join(stage_dir, file_name), [], stage_dir)
+                    for file_name in STAGE_FILES.values()]
+    if pipeline:
+        output_dir = os.path.join(work_dir, 'pipeline')
+        os.makedirs(output_dir, exist_ok=True)
+        pipeline_args = ['--input-dir', data_dir, '--output-dir', output_dir, '--chunk-size', str(chunk_size),
+                         '--workers', str(workers), '--full-upload',
+                         '--db-store', os.path.join(output_dir, 'db_store.sqlite'),
+                         '--upload-state', os.path.join(output_dir, 'upload_state.sqlite')]
+        targets.append((PIPELINE_SCRIPT, os.path.join(SCRIPT_DIR, PIPELINE_SCRIPT), pipeline_args, output_dir))
+
+    stage_failed = False
+    for target, script, args, cwd in targets:
+        # 단계별 스크립트는 앞 단계 파일이 있어야 하므로 한 단계가 실패하면 뒤 단계는 측정하지 않음
+        if stage_failed and target in STAGE_FILES.values():
+            continue
+        log_path = os.path.join(cwd, f'log_{target}.txt')
+        measured = run_measured(script, args, cwd, log_path, env)
+        result = {'size': size, 'rows': rows, 'target': target, **measured,
+                  'rows_per_sec': round(rows / measured['seconds'], 1) if measured['seconds'] else None}
+        results.append(result)
+
+        peak = f"{measured['peak_rss_mb']:,.1f} MB" if measured['peak_rss_mb'] is not None else '-'
+        if measured['returncode'] == 0:
+            print(f"  {target}: {measured['seconds']:.1f}초, {result['rows_per_sec']:,.0f}행/초, peak RSS {peak}")
+        else:
+            print(f"  {target}: 실패 (종료 코드 {measured['returncode']}), 로그: {log_path}")
+            stage_failed = stage_failed or target in STAGE_FILES.values()
+
+    if stages:
+        stage_results = [r for r in results if r['target'] in STAGE_FILES.values()]
+        if len(stage_results) == len(STAGE_FILES) and all(r['returncode'] == 0 for r in stage_results):
+            seconds = sum(r['seconds'] for r in stage_results)
+            results.append({'size': size, 'rows': rows, 'target': 'stages_total', 'seconds': round(seconds, 3),
+                            'rows_per_sec': round(rows / seconds, 1),
+                            'peak_rss_mb': max((r['peak_rss_mb'] or 0) for r in stage_results), 'returncode': 0})
+    return results
+
+
+def find_regressions(results: List[dict], baseline: List[dict], tolerance: float = REGRESSION_TOLERANCE) -> List[dict]:
+    """
+    기준 결과보다 초당 처리 행 수가 tolerance 이상 떨어진 항목 (규모 / 대상이 같은 항목끼리 비교)
+    """
+    current = pd.DataFrame(results)
+    previous = pd.DataFrame(baseline)
+    if current.empty or previous.empty:
+        return []
+    merged = current.merge(previous[['size', 'target', 'rows_per_sec', 'peak_rss_mb']],
+                           on=['size', 'target'], suffixes=('', '_baseline'))
+    merged = merged[merged['rows_per_sec'].notna() & merged['rows_per_sec_baseline'].notna()]
+    slower = merged[merged['rows_per_sec'] < merged['rows_per_sec_baseline'] * (1 - tolerance)]
+    return slower[['size', 'target', 'rows_per_sec', 'rows_per_sec_baseline',
+                   'peak_rss_mb', 'peak_rss_mb_baseline']].to_dict('records')
+
+
+def environment_info() -> dict:
+    """
+    측정 환경 정보 (결과를 비교할 때 같은 환경인지 확인용)
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SCRIPT_DIR,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Categorization 규모별 성능 측정')
+    parser.add_argument('sizes', nargs='*', default=['100k'], help='리스팅 행 수 (100k / 1m / 10m 또는 숫자, 기본값: 100k)')
+    parser.add_argument('--output', default=os.path.join(SCRIPT_DIR, 'CG_benchmark_results.json'),
+                        help='결과 JSON 경로')
+    parser.add_argument('--work-dir', default=None, help='입력 / 결과 파일 작업 디렉토리 (기본값: 임시 디렉토리, 측정 후 삭제)')
+    parser.add_argument('--seed', type=int, default=0, help='입력 데이터 난수 시드')
+    parser.add_argument('--workers', type=int, default=1, help='작업 프로세스 수 (CG_WORKERS / --workers)')
+    parser.add_argument('--chunk-size', type=int, default=10000, help='통합 실행 청크 크기')
+    parser.add_argument('--skip-stages', action='store_true', help='단계별 스크립트 측정 생략')
+    parser.add_argument('--skip-pipeline', action='store_true', help='통합 실행 측정 생략')
+    parser.add_argument('--baseline', default=None, help='비교할 이전 결과 JSON')
+    parser.add_argument('--tolerance', type=float, default=REGRESSION_TOLERANCE,
+                        help='성능 저하로 볼 초당 처리 행 수 감소 비율 (기본값: 0.2)')
+    args = parser.parse_args()
+
+    work_root = args.work_dir or tempfile.mkdtemp(prefix='cg_benchmark_')
+    results = []
+    try:
+        for size in args.sizes:
+            results += benchmark_size(size, work_root, args.seed, not args.skip_stages, not args.skip_pipeline,
+                                      args.workers, args.chunk_size)
+    finally:
+        if args.work_dir is None:
+            shutil.rmtree(work_root, ignore_errors=True)
+
+    report = {'environment': environment_info(),
+              'settings': {'seed': args.seed, 'workers': args.workers, 'chunk_size': args.chunk_size},
+              'results': results}
+
+    exit_code = 0 if all(r['returncode'] == 0 for r in results) else 1
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = find_regressions(results, json.load(f)['results'], args.tolerance)
+        report['regressions'] = regressions
+        print(f"\n=== 기준 결과 비교: {args.baseline} ===")
+        for regression in regressions:
+            print(f"  ⚠ {regression['size']} {regression['target']}: {regression['rows_per_sec']:,.0f}행/초 "
+                  f"(기준 {regression['rows_per_sec_baseline']:,.0f}행/초)")
+        if regressions:
+            exit_code = 1
+        else:
+            print(f"  성능 저하 없음 (허용 범위 {args.tolerance:.0%})")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n결과 저장 완료 : {args.output}")
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
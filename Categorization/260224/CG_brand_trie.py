@@ -0,0 +1,121 @@
+"""
+Title 기반 brand 보완 모듈
+raw_data에 brand / Brand 키가 없는 행의 Title에서 브랜드명을 찾아 brand로 사용 (01_ brand 추출에서 사용)
+
+- 브랜드 목록: CG_brand_aliases.json의 표준 브랜드명 / 별칭 (일반 단어이기도 한 common_words 별칭 제외)
+  (Checktrend LUXURY_BRANDS / LUXURY_WATCH_BRANDS 포함) + DB raw_data에서 관찰된 brand 값
+- 여러 단어 브랜드명도 단어 단위 trie(CG_hot_keywords.KeywordMatcher)로 모든 Title에서 한 번에 찾음
+- 한 Title에 여러 브랜드가 있으면 단어 수가 많은 브랜드명, 같으면 앞쪽에 나온 브랜드명
+- 별칭으로 찾은 경우 표준 브랜드명, DB에서만 관찰된 brand는 DB에 가장 많이 나온 표기 그대로
+"""
+
+import os
+import sys
+from functools import lru_cache
+from typing import Dict, Iterable
+
+import numpy as np
+import pandas as pd
+
+# 브랜드 표준화 모듈은 날짜 폴더 밖의 공통 폴더(Categorization/common)에서 불러옴
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'common'))
+
+from CG_brand_index import BRAND_ALIASES_PATH, BrandIndex, load_brand_index, normalize_brand
+from CG_hot_keywords import KeywordMatcher
+
+# 브랜드가 아닌 값으로 자주 들어오는 DB brand (정규화 후 비교)
+GENERIC_BRANDS = {'unbranded', 'unknown', 'none', 'n a', 'na', 'no brand', 'does not apply', 'other', 'others',
+                  'generic', 'handmade', 'vintage', 'designer', 'custom'}
+# DB brand는 이 행 수 이상 나온 값만 사용 (오타 / 일회성 값 제외)
+MIN_OBSERVED_ROWS = 2
+# 정규화 후 이 길이보다 짧은 DB brand는 사용하지 않음 (별칭 파일의 짧은 별칭은 그대로 사용)
+MIN_OBSERVED_LENGTH = 3
+
+BRAND_SOURCES = ['raw_data', 'title']
+
+
+def normalize_titles(titles: pd.Series) -> pd.Series:
+    """
+    Title 칼럼 전체를 normalize_brand와 같은 방식으로 정규화 (악센트 제거, 소문자, 영문 / 숫자 외 문자는 공백)
+    """
+    text = titles.fillna('').astype(str).str.normalize('NFKD')
+    text = text.str.replace('[\u0300-\u036f]', '', regex=True).str.casefold()
+    return text.str.replace('[^0-9a-z]+', ' ', regex=True).str.strip()
+
+
+class BrandTrie:
+    """
+    정규화된 브랜드명 → 브랜드 표기 trie
+
+    사용 예:
+        trie = load_brand_trie()
+        trie.find(df['Title'])        # 행별 브랜드 (없으면 NaN)
+    """
+
+    def __init__(self, names: Dict[str, str]):
+        """
+        Args:
+            names: {정규화된 브랜드명 / 별칭: brand 칼럼에 넣을 표기}
+        """
+        self.names = names
+        self.matcher = KeywordMatcher(list(names))
+        self.labels = np.array(list(names.values()), dtype=object)
+        self.word_counts = np.array([len(key.split()) for key in names], dtype=np.int64)
+
+    def find(self, titles: pd.Series) -> pd.Series:
+        """
+        Title 칼럼 전체에서 브랜드 찾기
+
+        Returns:
+            titles와 같은 인덱스의 브랜드 칼럼 (찾지 못하면 NaN)
+        """
+        pairs = self.matcher.match(normalize_titles(titles))
+        # 행마다 단어 수가 많은 브랜드명 우선, 같으면 앞쪽 위치
+        pairs['words'] = self.word_counts[pairs['keyword'].to_numpy()]
+        best = pairs.sort_values(['row', 'words', 'start'], ascending=[True, False, True], kind='stable')
+        best = best.drop_duplicates('row')
+
+        brands = np.full(len(titles), np.nan, dtype=object)
+        brands[best['row'].to_numpy()] = self.labels[best['keyword'].to_numpy()]
+        return pd.Series(brands, index=titles.index, dtype=object)
+
+
+def build_brand_trie(index: BrandIndex, observed: Iterable[str] = ()) -> BrandTrie:
+    """
+    별칭 인덱스 + DB에서 관찰된 brand 값으로 trie 생성
+
+    Args:
+        index: 브랜드 별칭 인덱스
+        observed: DB brand 값 (많이 나온 순서, 같은 브랜드의 다른 표기는 앞쪽 표기 사용)
+    """
+    # 일반 단어이기도 한 별칭(common_words, 'channel' 등)은 Title에서 브랜드로 보지 않음
+    names = {key: name for key, name in index.aliases.items() if key not in index.common_words}
+    for brand in observed:
+        key = normalize_brand(brand)
+        if key in names or key in index.common_words or key in GENERIC_BRANDS or len(key) < MIN_OBSERVED_LENGTH or not any(c.isalpha() for c in key):
+            continue
+        # 별칭 파일의 브랜드로 표준화되면 표준 브랜드명, 아니면 DB 표기 그대로
+        names[key] = index.resolve(brand)[0] or brand.strip()
+    return BrandTrie(names)
+
+
+@lru_cache(maxsize=None)
+def load_brand_trie(observed: tuple = (), aliases_path: str = BRAND_ALIASES_PATH) -> BrandTrie:
+    """
+    trie 생성 (같은 DB brand 목록은 프로세스당 한 번만)
+
+    Args:
+        observed: DB brand 값 튜플 (select_observed_brands 결과)
+    """
+    return build_brand_trie(load_brand_index(aliases_path), observed)
+
+
+def select_observed_brands(counts: pd.Series, min_rows: int = MIN_OBSERVED_ROWS) -> tuple:
+    """
+    DB brand 값별 행 수에서 trie에 넣을 값만 골라 많이 나온 순으로
+
+    Args:
+        counts: brand 값 → 행 수 (SkuStore.observed_brands 결과)
+    """
+    counts = counts[counts >= min_rows].sort_values(ascending=False, kind='stable')
+    return tuple(counts.index)
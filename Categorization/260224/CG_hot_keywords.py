@@ -0,0 +1,309 @@
+"""
+eBay 인기 검색 키워드 커버리지 분석 스크립트
+Checktrend/eBay_hot_keyword_2025_4Q/의 분기별 Buyer 검색 키워드 순위(PDF)를 모든 리스팅 Title과 한 번에 매칭해서
+- 순위가 높은데 매칭되는 리스팅이 없거나 적은 키워드
+- 어떤 키워드에도 매칭되지 않는 리스팅
+을 출력 / 저장
+
+- 키워드와 Title은 같은 방식으로 정규화 (소문자, 아포스트로피 제거, 영문 / 숫자 외 문자는 공백: "Men's" → "mens")
+- phrase(기본값): 키워드 단어가 Title에 연속으로 나오는 경우 (Aho-Corasick과 같은 결과)
+  키워드 전체로 단어 단위 trie(goto 테이블)를 만들고, Title의 모든 단어 위치에서 trie를 한 단계씩 동시에 진행
+  → 단계 수는 가장 긴 키워드의 단어 수, 단계마다 진행 중인 위치만 (상태, 단어) 해시 조회 (numpy 벡터 연산)
+- words: 키워드 단어가 순서와 관계없이 모두 Title에 있는 경우 (eBay 검색과 같은 방식)
+  Title 토큰 행렬(CG_token_matrix)과 키워드 × 단어 행렬의 곱에서 키워드 단어 수와 같은 칸
+
+PDF를 읽으려면 pypdf 필요 (pip install pypdf), 다른 키워드 폴더는 CG_HOT_KEYWORDS 환경변수 또는 --keywords로 지정
+
+사용 예:
+    python CG_hot_keywords.py --top-rank 30 --few 5
+"""
+
+import argparse
+import glob
+import os
+import re
+import time
+from typing import List
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from CG_incremental import STATE_FILE
+from CG_token_matrix import LISTING_FILE, tokenize_titles
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(os.path.dirname(SCRIPT_DIR))
+KEYWORD_DIR = os.environ.get('CG_HOT_KEYWORDS', os.path.join(ROOT_DIR, 'Checktrend', 'eBay_hot_keyword_2025_4Q'))
+
+COVERAGE_FILE = 'CG_hot_keyword_coverage.csv'
+UNMATCHED_FILE = 'CG_hot_keyword_unmatched_listings.csv'
+MATCH_MODES = ['phrase', 'words']
+
+# 이 순위 이내이면서 매칭 리스팅이 FEW_MATCHES개 이하인 키워드를 출력
+TOP_RANK = 30
+FEW_MATCHES = 5
+
+# PDF 행: 순위, 지난 분기 순위(순위권 밖), 순위 변화(Stay / New), 키워드, eBay 카테고리 경로
+_KEYWORD_LINE = re.compile(r'^(\d+) (\d+|순위권 밖) (-?\d+|Stay|New) (.+?) '
+                           r'((?:Jewelry & Watches|Clothing, Shoes & Accessories) ?>.*)$')
+_CATEGORY_ID = re.compile(r'Category ID:\s*([\d &]+)')
+# 문자열 패턴은 pyarrow 문자열 칼럼에서 pyarrow 정규식으로 처리됨
+_APOSTROPHE = "['’]"
+_NON_ALNUM = '[^0-9a-z]+'
+
+
+def normalize_text(values: pd.Series) -> pd.Series:
+    """
+    매칭용 정규화 (소문자, 아포스트로피 제거, 영문 / 숫자 외 문자는 공백)
+    """
+    text = values.fillna('').astype(str).str.lower()
+    text = text.str.replace(_APOSTROPHE, '', regex=True).str.replace(_NON_ALNUM, ' ', regex=True)
+    return text.str.strip()
+
+
+def read_keyword_pdf(path: str) -> pd.DataFrame:
+    """
+    키워드 순위 PDF 하나 읽기 (PDF 안에 카테고리별 표가 여러 개일 수 있음)
+
+    Returns:
+        list_name, category_id, Rank, Last Rank, Keyword, eBay category DataFrame
+    """
+    from pypdf import PdfReader
+
+    list_name = os.path.splitext(os.path.basename(path))[0].rsplit('_', 1)[0]
+    rows = []
+    category_id = None
+    for page in PdfReader(path).pages:
+        for line in page.extract_text().splitlines():
+            header = _CATEGORY_ID.search(line)
+            if header:
+                category_id = header.group(1).strip()
+                continue
+            matched = _KEYWORD_LINE.match(line.strip())
+            if matched:
+                rank, last_rank, _, keyword, ebay_category = matched.groups()
+                rows.append((list_name, category_id, int(rank),
+                             int(last_rank) if last_rank.isdigit() else None, keyword.strip(), ebay_category))
+    df = pd.DataFrame(rows, columns=['list_name', 'category_id', 'Rank', 'Last Rank', 'Keyword', 'eBay category'])
+    df['Last Rank'] = df['Last Rank'].astype('Int64')
+    return df
+
+
+def load_hot_keywords(keyword_dir: str = KEYWORD_DIR) -> pd.DataFrame:
+    """
+    키워드 폴더의 모든 순위 PDF 읽기
+    """
+    paths = sorted(glob.glob(os.path.join(keyword_dir, '*.pdf')))
+    if not paths:
+        raise FileNotFoundError(f"키워드 PDF가 없습니다: {keyword_dir}")
+    return pd.concat([read_keyword_pdf(path) for path in paths], ignore_index=True)
+
+
+class KeywordMatcher:
+    """
+    키워드 전체를 한 번에 찾는 단어 단위 trie
+
+    사용 예:
+        matcher = KeywordMatcher(['rolex', 'rolex mens watch', 'omega seamaster'])
+        pairs = matcher.match(normalize_text(df['Title']))   # row, keyword 배열
+    """
+
+    def __init__(self, phrases: List[str]):
+        """
+        Args:
+            phrases: 정규화된 키워드 (중복 없이, 리스트 위치가 키워드 번호)
+        """
+        self.phrases = list(phrases)
+        words = [phrase.split() for phrase in self.phrases]
+        self.vocabulary = pd.Index(pd.unique(pd.Series([word for phrase in words for word in phrase], dtype=object)))
+        self.max_length = max((len(phrase) for phrase in words), default=0)
+        width = len(self.vocabulary)
+
+        # goto 테이블: (상태 * 단어 수 + 단어 번호) → 다음 상태, 상태 0은 시작
+        transitions = {}
+        terminal = [-1]
+        for number, phrase in enumerate(words):
+            state = 0
+            for code in self.vocabulary.get_indexer(phrase):
+                key = state * width + int(code)
+                if key not in transitions:
+                    transitions[key] = len(terminal)
+                    terminal.append(-1)
+                state = transitions[key]
+            if phrase:
+                terminal[state] = number
+        self.width = width
+        self.transition_keys = pd.Index(np.array(list(transitions), dtype=np.int64))
+        self.transition_states = np.array(list(transitions.values()), dtype=np.int64)
+        self.terminal = np.array(terminal, dtype=np.int64)
+
+    def match(self, texts: pd.Series) -> pd.DataFrame:
+        """
+        정규화된 Title 전체에서 키워드가 연속된 단어로 나오는 (행, 키워드) 쌍
+
+        Args:
+            texts: normalize_text 결과
+
+        Returns:
+            row(texts 위치), keyword(키워드 번호), start(행 안에서 처음 나온 단어 위치) DataFrame
+            (행마다 같은 키워드는 한 번)
+        """
+        # 단어 분리 / 단어 번호 조회는 pyarrow에서 (키워드에 없는 단어는 -1)
+        values = pa.array(texts, pa.string())
+        if isinstance(values, pa.ChunkedArray):
+            values = values.combine_chunks()
+        words = pc.utf8_split_whitespace(values)
+        lengths = np.diff(words.offsets.to_numpy()).astype(np.int64)
+        codes = pc.index_in(words.flatten(), value_set=pa.array(list(self.vocabulary), pa.string()))
+        codes = codes.fill_null(-1).to_numpy().astype(np.int64)
+        rows = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+        row_ends = np.repeat(np.cumsum(lengths), lengths)
+        row_starts = row_ends - np.repeat(lengths, lengths)
+
+        # 모든 단어 위치에서 시작 상태로 출발, 단계마다 다음 단어로 진행할 수 있는 위치만 남김
+        starts = np.flatnonzero(codes >= 0)
+        states = np.zeros(len(starts), dtype=np.int64)
+        found_rows, found_keywords, found_starts = [], [], []
+        for depth in range(self.max_length):
+            positions = starts + depth
+            valid = positions < row_ends[starts]
+            valid[valid] = codes[positions[valid]] >= 0
+            starts, states, positions = starts[valid], states[valid], positions[valid]
+            following = self.transition_keys.get_indexer(states * self.width + codes[positions])
+            moved = following >= 0
+            starts, states = starts[moved], self.transition_states[following[moved]]
+            if not len(starts):
+                break
+            hit = self.terminal[states] >= 0
+            found_rows.append(rows[starts[hit]])
+            found_keywords.append(self.terminal[states[hit]])
+            found_starts.append(starts[hit] - row_starts[starts[hit]])
+        return _unique_pairs(found_rows, found_keywords, found_starts)
+
+    def match_words(self, texts: pd.Series) -> pd.DataFrame:
+        """
+        정규화된 Title 전체에서 키워드 단어가 순서와 관계없이 모두 있는 (행, 키워드) 쌍
+
+        Args:
+            texts: normalize_text 결과
+
+        Returns:
+            row(texts 위치), keyword(키워드 번호) DataFrame
+        """
+        matrix = tokenize_titles(texts)
+        # 키워드 × 단어 행렬 (token 번호 순으로 정렬), vocabulary에 없는 단어가 있는 키워드는 매칭되지 않음
+        pairs = pd.DataFrame([(word, number) for number, phrase in enumerate(self.phrases) for word in set(phrase.split())],
+                             columns=['word', 'keyword'])
+        pairs['code'] = matrix.vocabulary.get_indexer(pairs['word'])
+        required = pairs.groupby('keyword').size().reindex(range(len(self.phrases)), fill_value=0).to_numpy()
+        pairs = pairs[pairs['code'] >= 0].sort_values('code', kind='stable')
+        per_token = np.bincount(pairs['code'], minlength=len(matrix.vocabulary))
+        token_starts = np.concatenate([[0], np.cumsum(per_token)[:-1]])
+
+        # 행렬 곱: 행의 token마다 그 token을 포함한 키워드로 펼친 뒤 (행, 키워드)별로 개수를 셈
+        repeats = per_token[matrix.indices]
+        offsets = np.concatenate([[0], np.cumsum(repeats)[:-1]])
+        gather = np.repeat(token_starts[matrix.indices] - offsets, repeats) + np.arange(repeats.sum())
+        rows = np.repeat(np.repeat(np.arange(len(matrix), dtype=np.int64), matrix.row_lengths), repeats)
+        keywords = pairs['keyword'].to_numpy(dtype=np.int64)[gather]
+
+        combined = np.sort(rows * max(len(self.phrases), 1) + keywords)
+        boundaries = np.flatnonzero(np.concatenate([[True], combined[1:] != combined[:-1]]))
+        counts = np.diff(np.append(boundaries, len(combined)))
+        rows, keywords = np.divmod(combined[boundaries], max(len(self.phrases), 1))
+        complete = counts == required[keywords]
+        return pd.DataFrame({'row': rows[complete], 'keyword': keywords[complete]})
+
+
+def _unique_pairs(rows: List[np.ndarray], keywords: List[np.ndarray], starts: List[np.ndarray]) -> pd.DataFrame:
+    # (행, 키워드, 위치) 순으로 정렬한 뒤 (행, 키워드)마다 첫 위치만 남김
+    rows, keywords, starts = (np.concatenate(values + [np.empty(0, np.int64)]) for values in (rows, keywords, starts))
+    order = np.lexsort((starts, keywords, rows))
+    rows, keywords, starts = rows[order], keywords[order], starts[order]
+    first = np.ones(len(rows), dtype=bool)
+    first[1:] = (rows[1:] != rows[:-1]) | (keywords[1:] != keywords[:-1])
+    return pd.DataFrame({'row': rows[first], 'keyword': keywords[first], 'start': starts[first]})
+
+
+def keyword_coverage(keywords: pd.DataFrame, titles: pd.Series, mode: str = 'phrase'):
+    """
+    키워드별 매칭 리스팅 수와 행별 매칭 여부
+
+    Args:
+        keywords: load_hot_keywords 결과
+        titles: Title 칼럼
+        mode: 'phrase'(연속된 단어) 또는 'words'(순서와 관계없이 모든 단어)
+
+    Returns:
+        (keywords에 Listings / Share 칼럼을 더한 DataFrame, 행별 매칭 키워드 수 배열)
+    """
+    normalized_keywords = normalize_text(keywords['Keyword'])
+    # 여러 목록에 같은 키워드가 있으면 한 번만 매칭
+    keyword_codes, phrases = pd.factorize(normalized_keywords)
+    matcher = KeywordMatcher(list(phrases))
+    texts = normalize_text(titles)
+    pairs = matcher.match(texts) if mode == 'phrase' else matcher.match_words(texts)
+
+    listings = np.bincount(pairs['keyword'], minlength=len(phrases))
+    coverage = keywords.copy()
+    coverage['Listings'] = listings[keyword_codes]
+    coverage['Share'] = (coverage['Listings'] / max(len(titles), 1) * 100).round(3)
+    return coverage, np.bincount(pairs['row'], minlength=len(titles))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='eBay 인기 검색 키워드 × 리스팅 Title 커버리지 분석')
+    parser.add_argument('--input-dir', default=SCRIPT_DIR, help='리스팅 파일 디렉토리 (기본값: 스크립트 위치)')
+    parser.add_argument('--output-dir', default=None, help='결과 파일 저장 디렉토리 (기본값: 입력 디렉토리)')
+    parser.add_argument('--keywords', default=KEYWORD_DIR, help='키워드 순위 PDF 폴더 (기본값: CG_HOT_KEYWORDS)')
+    parser.add_argument('--match', choices=MATCH_MODES, default='phrase',
+                        help='phrase: 키워드 단어가 연속으로 나오는 경우, words: 순서와 관계없이 모든 단어가 있는 경우')
+    parser.add_argument('--top-rank', type=int, default=TOP_RANK, help='확인할 키워드 순위 범위')
+    parser.add_argument('--few', type=int, default=FEW_MATCHES, help='매칭 리스팅이 이 개수 이하면 부족한 키워드로 출력')
+    args = parser.parse_args()
+    output_dir = args.output_dir or args.input_dir
+
+    started = time.perf_counter()
+    keywords = load_hot_keywords(args.keywords)
+    print(f"키워드 로드: {args.keywords} ({len(keywords):,}개, 목록 {keywords['list_name'].nunique()}개)")
+    listing_path = os.path.join(args.input_dir, LISTING_FILE)
+    df = pd.read_csv(listing_path, usecols=['Item number', 'Title'], dtype=str, encoding='utf-8-sig')
+    print(f"리스팅 파일 로드: {listing_path} ({len(df):,}개 행)")
+
+    coverage, matched_per_row = keyword_coverage(keywords, df['Title'], args.match)
+    coverage.to_csv(os.path.join(output_dir, COVERAGE_FILE), index=False, encoding='utf-8-sig')
+
+    # 카테고리별로 보기 위해 실행 결과 상태 파일이 있으면 Category를 붙임
+    unmatched = df.loc[matched_per_row == 0, ['Item number', 'Title']]
+    state_path = os.path.join(args.input_dir, STATE_FILE + '.parquet')
+    if os.path.exists(state_path):
+        state = pd.read_parquet(state_path, columns=['Item number', 'Category'])
+        state['Item number'] = state['Item number'].astype(str)
+        unmatched = unmatched.merge(state.drop_duplicates('Item number'), on='Item number', how='left')
+    unmatched.to_csv(os.path.join(output_dir, UNMATCHED_FILE), index=False, encoding='utf-8-sig')
+
+    print(f"\n=== 순위 {args.top_rank}위 이내 키워드 중 매칭 리스팅 {args.few}개 이하 ===")
+    weak = coverage[(coverage['Rank'] <= args.top_rank) & (coverage['Listings'] <= args.few)]
+    for list_name, group in weak.groupby('list_name', sort=False):
+        print(f"\n[{list_name}] {len(group)}개")
+        print(group[['Rank', 'Last Rank', 'Keyword', 'Listings']].to_string(index=False))
+
+    print(f"\n=== 목록별 요약 ===")
+    summary = coverage.groupby('list_name').agg(keywords=('Keyword', 'size'),
+                                                zero=('Listings', lambda listings: int((listings == 0).sum())),
+                                                median_listings=('Listings', 'median'))
+    print(summary.to_string())
+
+    print(f"\n=== 완료 ===")
+    print(f"매칭 방식: {args.match}")
+    print(f"리스팅: {len(df):,}개 (키워드 매칭 없음: {len(unmatched):,}개, {len(unmatched) / max(len(df), 1) * 100:.1f}%)")
+    if 'Category' in unmatched.columns:
+        print(f"매칭 없음 Category별:\n{unmatched['Category'].fillna('(없음)').value_counts().to_string()}")
+    print(f"소요 시간: {time.perf_counter() - started:.1f}초")
+    print(f"파일 저장 완료: {os.path.join(output_dir, COVERAGE_FILE)}, {os.path.join(output_dir, UNMATCHED_FILE)}")
+
+
+if __name__ == "__main__":
+    main()
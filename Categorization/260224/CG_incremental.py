@@ -0,0 +1,145 @@
+"""
+날짜별 스냅샷 폴더(260212, 260213, ...) 간 증분 처리 모듈
+리스팅을 Item number + (Title, SKU, raw_data) 해시로 식별하여
+이전 스냅샷에서 바뀌지 않은 행은 brand / brand_source / Category / Subcategory / Category_id를 그대로 재사용하고
+새로 등록되었거나 내용이 바뀐 행만 다시 분류 (CG_run_pipeline.py --incremental 에서 사용)
+
+분류 규칙(taxonomy / 브랜드 별칭 파일 / 보조 분류 모델 / Title brand 보완에 쓰는 DB brand 목록)이 바뀌면 같은 행이라도 결과가 달라지므로
+상태 파일에 규칙 버전(rules_version)을 함께 저장하고, 현재 버전과 다른 상태는 재사용하지 않음 (전체 다시 분류)
+"""
+
+import hashlib
+import json
+import os
+import re
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+# 실행 결과 상태 파일 (결과 저장 디렉토리에 Parquet으로 저장)
+STATE_FILE = '06_CG_eBay_listing_state'
+
+KEY_COLUMN = 'Item number'
+HASH_COLUMN = 'row_hash'
+# origin_id는 접두사가 제거된 SKU가 DB와 매칭된 값 (매칭되지 않으면 결과에 영향이 없으므로 빈 값)
+HASH_SOURCE_COLUMNS = ['Title', 'origin_id', 'raw_data']
+RESULT_COLUMNS = ['brand', 'brand_source', 'Category', 'Subcategory', 'Category_id']
+# 상태 파일에 함께 저장하는 재가격 산정용 칼럼 (재사용하지 않고 매번 현재 SKU 기준)
+PRICING_COLUMNS = ['source', 'margin_rate']
+# 상태를 만든 분류 규칙 버전 (rules_version 결과)
+VERSION_COLUMN = 'rules_version'
+
+SNAPSHOT_DIR_PATTERN = re.compile(r'^\d{6}$')
+
+
+def hash_listing_rows(df: pd.DataFrame) -> pd.Series:
+    """
+    행별 (Title, SKU, raw_data) 해시 (uint64, 빈 값은 ''로 통일)
+    """
+    source = df[HASH_SOURCE_COLUMNS].fillna('').astype(str)
+    return pd.util.hash_pandas_object(source, index=False)
+
+
+def file_digest(path: str) -> str:
+    """
+    파일 내용 해시 (파일이 없으면 '')
+    """
+    if not os.path.exists(path):
+        return ''
+    with open(path, 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+def rules_version(*parts: str) -> str:
+    """
+    분류 결과에 영향을 주는 값(taxonomy 버전, 브랜드 별칭 파일 / 모델 파일 해시, DB brand 목록 등)으로 규칙 버전 계산 (하나라도 바뀌면 다른 값)
+    """
+    payload = json.dumps(list(parts), ensure_ascii=False)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def find_previous_state(snapshot_dir: str, file_name: str = STATE_FILE + '.parquet') -> Optional[str]:
+    """
+    같은 상위 폴더의 날짜 폴더 중 현재 폴더보다 이전이면서 상태 파일이 있는 가장 최근 폴더의 상태 파일 경로
+
+    Args:
+        snapshot_dir: 현재 스냅샷 폴더 (예: Categorization/260224)
+        file_name: 찾을 파일 이름 (기본값: 상태 파일)
+
+    Returns:
+        상태 파일 경로 (없으면 None)
+    """
+    snapshot_dir = os.path.abspath(snapshot_dir)
+    current = os.path.basename(snapshot_dir)
+    if not SNAPSHOT_DIR_PATTERN.match(current):
+        return None
+
+    parent_dir = os.path.dirname(snapshot_dir)
+    previous_dirs = sorted((name for name in os.listdir(parent_dir)
+                            if SNAPSHOT_DIR_PATTERN.match(name) and name < current), reverse=True)
+    for name in previous_dirs:
+        path = os.path.join(parent_dir, name, file_name)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def load_state(state_path: str, version: str) -> pd.DataFrame:
+    """
+    이전 스냅샷 상태 파일 로드 (Item number 인덱스, 중복 Item number는 마지막 행 사용)
+
+    Args:
+        state_path: 상태 파일 경로
+        version: 현재 규칙 버전 (rules_version) - 다른 버전으로 만든 행은 재사용하지 않음
+                 (rules_version 칼럼이 없는 이전 형식의 상태 파일은 전체 다시 분류)
+
+    Returns:
+        재사용할 수 있는 상태 (버전이 다르면 빈 DataFrame)
+    """
+    columns = [KEY_COLUMN, HASH_COLUMN] + RESULT_COLUMNS
+    if VERSION_COLUMN not in pq.read_schema(state_path).names:
+        return pd.DataFrame(columns=columns).set_index(KEY_COLUMN)
+    state = pd.read_parquet(state_path, columns=columns + [VERSION_COLUMN])
+    state = state[state[VERSION_COLUMN] == version].drop(columns=VERSION_COLUMN)
+    state = state.drop_duplicates(KEY_COLUMN, keep='last')
+    return state.set_index(KEY_COLUMN)
+
+
+def split_unchanged(df: pd.DataFrame, row_hash: pd.Series,
+                    state: pd.DataFrame) -> Tuple[np.ndarray, pd.DataFrame]:
+    """
+    이전 상태와 Item number / 해시가 모두 같은 행 찾기
+
+    Args:
+        df: 병합까지 끝난 청크
+        row_hash: hash_listing_rows(df)
+        state: load_state의 결과
+
+    Returns:
+        (재사용 가능한 행 마스크, 재사용할 결과 칼럼 - 마스크가 True인 행과 같은 인덱스)
+    """
+    # reindex/map은 없는 키를 NaN(float)으로 바꿔 uint64 해시 비교가 틀어지므로 위치로 조회
+    positions = state.index.get_indexer(df[KEY_COLUMN])
+    found = positions >= 0
+    previous_hash = state[HASH_COLUMN].to_numpy()[positions[found]]
+
+    unchanged = np.zeros(len(df), dtype=bool)
+    unchanged[found] = previous_hash == row_hash.to_numpy()[found]
+
+    reused = state[RESULT_COLUMNS].iloc[positions[unchanged]]
+    reused.index = df.index[unchanged]
+    return unchanged, reused
+
+
+def build_state_frame(df: pd.DataFrame, row_hash: pd.Series, version: str) -> pd.DataFrame:
+    """
+    다음 스냅샷에서 재사용할 상태 (Item number, 해시, 분류 결과, source / margin_rate, 규칙 버전)
+    """
+    pricing_columns = [column for column in PRICING_COLUMNS if column in df.columns]
+    state = df[[KEY_COLUMN] + RESULT_COLUMNS + pricing_columns].copy()
+    state.insert(1, HASH_COLUMN, row_hash.to_numpy())
+    state['Category_id'] = state['Category_id'].astype('float64')
+    state[VERSION_COLUMN] = version
+    return state
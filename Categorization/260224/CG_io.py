@@ -0,0 +1,182 @@
+"""
+Categorization 중간 파일(01_ ~ 05_) 입출력 공통 모듈
+기본은 Parquet으로 저장하고, CG_STAGE_FORMAT=csv 환경변수(또는 실행 옵션)로 기존처럼 CSV로도 저장 가능
+파일 경로는 확장자 없이 넘기고(예: '02_CG_eBay_active_listing_data_filtered'), 형식에 맞는 확장자를 붙임
+
+Parquet은 칼럼 단위로 읽을 수 있으므로 필요한 칼럼만 읽으면 raw_data 같은 큰 칼럼은 건너뜀
+"""
+
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+STAGE_FORMATS = ['parquet', 'csv']
+STAGE_FORMAT = os.environ.get('CG_STAGE_FORMAT', 'parquet')
+
+
+def stage_path(base_path: str, fmt: Optional[str] = None) -> str:
+    """
+    확장자 없는 경로에 저장 형식 확장자 추가
+    """
+    return f'{base_path}.{fmt or STAGE_FORMAT}'
+
+
+def find_stage_file(base_path: str) -> Tuple[str, str]:
+    """
+    중간 파일 찾기 (설정된 형식 파일이 없으면 다른 형식 파일 사용)
+
+    Returns:
+        (파일 경로, 형식)
+    """
+    for fmt in [STAGE_FORMAT] + [f for f in STAGE_FORMATS if f != STAGE_FORMAT]:
+        path = stage_path(base_path, fmt)
+        if os.path.exists(path):
+            return path, fmt
+    raise FileNotFoundError(f"중간 파일을 찾을 수 없습니다: {base_path}.({'|'.join(STAGE_FORMATS)})")
+
+
+def stage_columns(base_path: str) -> List[str]:
+    """
+    중간 파일의 칼럼 목록 (데이터는 읽지 않음)
+    """
+    path, fmt = find_stage_file(base_path)
+    if fmt == 'parquet':
+        return pq.read_schema(path).names
+    return pd.read_csv(path, nrows=0, encoding='utf-8-sig').columns.tolist()
+
+
+def read_stage(base_path: str, columns: Optional[List[str]] = None, dtype=None) -> pd.DataFrame:
+    """
+    중간 파일 읽기
+
+    Args:
+        base_path: 확장자 없는 파일 경로
+        columns: 읽을 칼럼 (None이면 전체)
+        dtype: CSV를 읽을 때의 dtype (Parquet은 저장된 타입 그대로 읽음)
+    """
+    path, fmt = find_stage_file(base_path)
+    if fmt == 'parquet':
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_csv(path, usecols=columns, dtype=dtype, encoding='utf-8-sig')
+
+
+def iter_stage_chunks(base_path: str, chunk_size: int,
+                      columns: Optional[List[str]] = None, dtype=None) -> Iterator[pd.DataFrame]:
+    """
+    중간 파일을 청크 단위로 읽기 (read_csv의 chunksize와 같은 용도)
+    """
+    path, fmt = find_stage_file(base_path)
+    if fmt == 'parquet':
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size, usecols=columns, dtype=dtype, encoding='utf-8-sig')
+
+
+def write_stage(df: pd.DataFrame, base_path: str, encoding: str = 'utf-8-sig', fmt: Optional[str] = None) -> str:
+    """
+    중간 파일 저장
+
+    Args:
+        df: 저장할 DataFrame
+        base_path: 확장자 없는 파일 경로
+        encoding: CSV로 저장할 때의 인코딩
+        fmt: 저장 형식 (None이면 STAGE_FORMAT)
+
+    Returns:
+        저장된 파일 경로
+    """
+    fmt = fmt or STAGE_FORMAT
+    path = stage_path(base_path, fmt)
+    if fmt == 'parquet':
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False, encoding=encoding)
+    return path
+
+
+def add_stage_columns(src_base_path: str, dst_base_path: str, new_columns: Dict[str, pd.Series],
+                      encoding: str = 'utf-8-sig', dtype=None, fmt: Optional[str] = None) -> str:
+    """
+    입력 중간 파일에 새 칼럼을 추가하여 출력 중간 파일로 저장
+
+    Parquet → Parquet인 경우 pandas로 변환하지 않고 Arrow 테이블에 칼럼만 붙여서 저장
+    (raw_data 같은 큰 칼럼을 파이썬 문자열로 만들지 않음)
+
+    Args:
+        src_base_path: 입력 파일 경로 (확장자 없음)
+        dst_base_path: 출력 파일 경로 (확장자 없음)
+        new_columns: {칼럼명: 값} - 값은 입력 파일 행 순서와 같아야 함
+        encoding: CSV로 저장할 때의 인코딩
+        dtype: 입력이 CSV인 경우 읽을 때의 dtype
+        fmt: 저장 형식 (None이면 STAGE_FORMAT)
+
+    Returns:
+        저장된 파일 경로
+    """
+    fmt = fmt or STAGE_FORMAT
+    src_path, src_fmt = find_stage_file(src_base_path)
+
+    if src_fmt == 'parquet' and fmt == 'parquet':
+        table = pq.read_table(src_path)
+        for name, values in new_columns.items():
+            if len(values) != table.num_rows:
+                raise ValueError(f"칼럼 길이가 맞지 않습니다: {name} ({len(values)} != {table.num_rows})")
+            array = pa.Array.from_pandas(values.reset_index(drop=True))
+            if name in table.column_names:
+                table = table.set_column(table.column_names.index(name), name, array)
+            else:
+                table = table.append_column(name, array)
+        dst_path = stage_path(dst_base_path, fmt)
+        pq.write_table(table, dst_path)
+        return dst_path
+
+    df = read_stage(src_base_path, dtype=dtype)
+    for name, values in new_columns.items():
+        df[name] = values.to_numpy()
+    return write_stage(df, dst_base_path, encoding=encoding, fmt=fmt)
+
+
+class StageWriter:
+    """
+    청크 단위로 중간 파일에 이어서 저장 (CSV는 첫 청크만 헤더/BOM, Parquet은 row group 추가)
+    """
+
+    def __init__(self, base_path: str, encoding: str = 'utf-8-sig', fmt: Optional[str] = None):
+        self.fmt = fmt or STAGE_FORMAT
+        self.path = stage_path(base_path, self.fmt)
+        self.encoding = encoding
+        self.rows = 0
+        self._parquet_writer = None
+        self._schema = None
+
+    def write(self, df: pd.DataFrame):
+        if self.fmt == 'parquet':
+            self._write_parquet(df)
+        elif self.rows == 0:
+            df.to_csv(self.path, index=False, encoding=self.encoding, mode='w')
+        else:
+            # utf-8-sig로 append하면 청크마다 BOM이 들어가므로 이후 청크는 utf-8로 저장
+            df.to_csv(self.path, index=False, encoding='utf-8', mode='a', header=False)
+        self.rows += len(df)
+
+    def _write_parquet(self, df: pd.DataFrame):
+        if self._parquet_writer is None:
+            schema = pa.Schema.from_pandas(df, preserve_index=False)
+            # 첫 청크에서 값이 전부 비어 있는 칼럼은 null 타입이 되므로 문자열로 지정
+            for i, field in enumerate(schema):
+                if pa.types.is_null(field.type):
+                    schema = schema.set(i, pa.field(field.name, pa.string()))
+            self._schema = schema
+            self._parquet_writer = pq.ParquetWriter(self.path, schema)
+        table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+        self._parquet_writer.write_table(table)
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
@@ -0,0 +1,85 @@
+"""
+Title 키워드 분류용 공통 모듈
+(라벨, 키워드 리스트) 규칙 테이블을 token → 우선순위 해시 인덱스로 한 번만 컴파일하고
+Title 칼럼 전체를 한 번에 분류 (02_ 카테고리 / 03_ 하위 카테고리 분류에서 사용)
+규칙은 Title 토큰 행렬(CG_token_matrix) 위에서 평가하므로 같은 청크를 여러 규칙에 쓸 때는 한 번만 토큰화
+"""
+
+import numpy as np
+import pandas as pd
+
+from CG_token_matrix import TokenMatrix, tokenize_titles
+
+
+def build_keyword_index(rules):
+    """
+    키워드 규칙 테이블을 token → 우선순위 해시 인덱스로 컴파일
+
+    Args:
+        rules: (라벨, 키워드 리스트) 튜플의 리스트 (앞쪽 규칙이 우선)
+
+    Returns:
+        (token → 우선순위 dict, 우선순위 → 라벨 dict)
+    """
+    keyword_index = {}
+    priority_to_label = {}
+    for priority, (label, keywords) in enumerate(rules):
+        priority_to_label[priority] = label
+        for keyword in keywords:
+            # 여러 규칙에 있는 키워드는 우선순위가 높은(앞쪽) 규칙으로
+            keyword_index.setdefault(keyword, priority)
+    return keyword_index, priority_to_label
+
+
+def match_title(title, keyword_index, priority_to_label, default='Others'):
+    """
+    Title 하나를 분류 (제목 단어 중 가장 우선순위가 높은 키워드의 라벨)
+    """
+    if pd.isna(title) or title == '':
+        return default
+
+    title_words = str(title).lower().split()
+    priority = min((keyword_index[word] for word in title_words if word in keyword_index), default=None)
+    if priority is None:
+        return default
+    return priority_to_label[priority]
+
+
+def match_tokens(matrix: TokenMatrix, keyword_index, priority_to_label, default='Others') -> np.ndarray:
+    """
+    토큰 행렬의 행별로 포함된 키워드 중 가장 우선순위가 높은 규칙의 라벨
+
+    token별 우선순위 벡터(키워드가 아닌 token은 규칙 수)를 만들고 행마다 최소값을 구한 뒤
+    우선순위 → 라벨 배열(마지막은 default)에서 한 번에 선택
+
+    Args:
+        matrix: Title 토큰 행렬
+        keyword_index: build_keyword_index의 token → 우선순위 dict
+        priority_to_label: build_keyword_index의 우선순위 → 라벨 dict
+        default: 매칭되는 키워드가 없을 때의 라벨
+
+    Returns:
+        행별 라벨 (object 배열)
+    """
+    no_match = len(priority_to_label)
+    priorities = matrix.vocabulary.map(keyword_index).to_numpy(dtype='float64', na_value=no_match).astype(np.int64)
+    best_priority = matrix.row_min(priorities, no_match)
+    labels = np.array([priority_to_label[priority] for priority in range(no_match)] + [default], dtype=object)
+    return labels[best_priority]
+
+
+def match_titles(titles: pd.Series, keyword_index, priority_to_label, default='Others') -> pd.Series:
+    """
+    Title 칼럼 전체를 한 번에 분류 (match_title의 벡터화 버전)
+
+    Args:
+        titles: Title 칼럼
+        keyword_index: build_keyword_index의 token → 우선순위 dict
+        priority_to_label: build_keyword_index의 우선순위 → 라벨 dict
+        default: 매칭되는 키워드가 없을 때의 라벨
+
+    Returns:
+        titles와 같은 인덱스의 라벨 칼럼
+    """
+    labels = match_tokens(tokenize_titles(titles), keyword_index, priority_to_label, default)
+    return pd.Series(labels, index=titles.index)
@@ -0,0 +1,260 @@
+"""
+단계별 성능 지표 기록 모듈
+단계(00 ~ 04, 통합 실행)마다 소요 시간(wall / CPU), 입력 / 출력 행 수, 최대 메모리(peak RSS),
+읽고 쓴 파일 크기, JSON 파싱 실패 수, 카테고리 분포를 모아서 JSON lines 파일에 한 줄씩 추가
+청크 단위 소요 시간 / 행 수도 같은 파일에 chunk 레코드로 기록
+
+- CG_METRICS 환경변수(또는 실행 옵션)에 JSONL 경로를 주면 기록 (없으면 기록하지 않음)
+- CG_METRICS_PROM 환경변수(또는 실행 옵션)에 경로를 주면 Prometheus textfile 형식으로도 저장
+  (node_exporter textfile collector용, 단계별 값은 같은 파일에서 단계 라벨로 구분해서 갱신)
+- 단계별 스크립트를 따로 실행할 때 같은 실행으로 묶으려면 CG_RUN_ID 환경변수 지정
+- 최대 메모리는 Linux / macOS에서 기록, Windows는 psutil이 설치된 경우에만 기록 (없으면 null)
+"""
+
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows에는 resource 모듈이 없음
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from CG_io import find_stage_file
+
+METRICS_PATH = os.environ.get('CG_METRICS') or None
+PROMETHEUS_PATH = os.environ.get('CG_METRICS_PROM') or None
+RUN_ID = os.environ.get('CG_RUN_ID') or datetime.now().strftime('%Y%m%dT%H%M%S') + f'-{os.getpid()}'
+
+# Prometheus 지표 이름 → (단계 레코드 키, 설명)
+PROMETHEUS_METRICS = {
+    'cg_stage_wall_seconds': ('wall_seconds', '단계 소요 시간 (초)'),
+    'cg_stage_cpu_seconds': ('cpu_seconds', '단계 CPU 시간 (초, 작업 프로세스 포함)'),
+    'cg_stage_rows_in': ('rows_in', '입력 행 수'),
+    'cg_stage_rows_out': ('rows_out', '출력 행 수'),
+    'cg_stage_rows_per_second': ('rows_per_sec', '초당 처리 행 수 (입력 기준)'),
+    'cg_stage_peak_rss_bytes': ('peak_rss_bytes', '최대 메모리 (bytes)'),
+    'cg_stage_bytes_read': ('bytes_read', '읽은 파일 크기 (bytes)'),
+    'cg_stage_bytes_written': ('bytes_written', '쓴 파일 크기 (bytes)'),
+    'cg_stage_json_parse_failures': ('json_parse_failures', 'raw_data JSON 파싱 실패 행 수'),
+    'cg_stage_chunks': ('chunks', '처리한 청크 수'),
+    'cg_stage_finished_timestamp_seconds': ('finished_at', '단계 종료 시각 (unix time)'),
+}
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """
+    현재 프로세스의 최대 메모리 사용량 (bytes, 측정할 수 없으면 None)
+    """
+    # Linux는 /proc의 VmHWM (fork 이전 부모 프로세스 메모리를 포함하지 않음), 그 외 Unix는 ru_maxrss
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is not None:
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == 'darwin' else maxrss * 1024
+    # Windows는 psutil이 있으면 peak working set, 없으면 기록하지 않음
+    if psutil is not None:
+        return getattr(psutil.Process().memory_info(), 'peak_wset', None)
+    return None
+
+
+def _cpu_seconds() -> float:
+    # 현재 프로세스 + 종료된 작업 프로세스의 CPU 시간
+    if resource is None:
+        # Windows의 os.times()는 작업 프로세스 시간을 0으로 돌려주므로 현재 프로세스 시간만 반영됨
+        times = os.times()
+        return times.user + times.system + times.children_user + times.children_system
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def file_size(path: str) -> int:
+    """
+    파일 크기 (확장자가 없는 중간 파일 경로는 실제 저장된 파일 기준, 없으면 0)
+    """
+    if not os.path.exists(path):
+        try:
+            path, _ = find_stage_file(path)
+        except FileNotFoundError:
+            return 0
+    return os.path.getsize(path)
+
+
+class StageMetrics:
+    """
+    단계 하나의 성능 지표
+
+    사용 예:
+        metrics = StageMetrics('02_categorization')
+        metrics.read_file(input_path)
+        for chunk, result in metrics.track(map_chunks(func, chunks)):
+            ...
+        metrics.add(rows_out=len(df))
+        metrics.add_distribution(df['Category'])
+        metrics.wrote_file(output_path)
+        metrics.finish()
+    """
+
+    def __init__(self, stage: str, metrics_path: Optional[str] = None, prometheus_path: Optional[str] = None,
+                 run_id: str = RUN_ID):
+        self.stage = stage
+        self.run_id = run_id
+        self.metrics_path = metrics_path or METRICS_PATH
+        self.prometheus_path = prometheus_path or PROMETHEUS_PATH
+        self.counts = {'rows_in': 0, 'rows_out': 0, 'bytes_read': 0, 'bytes_written': 0,
+                       'json_parse_failures': 0, 'chunks': 0}
+        self.distributions: Dict[str, pd.Series] = {}
+        self._started_at = time.time()
+        self._wall = time.perf_counter()
+        self._cpu = _cpu_seconds()
+
+    def add(self, **counts):
+        """
+        카운터 더하기 (rows_in, rows_out, bytes_read, bytes_written, json_parse_failures 등)
+        """
+        for name, value in counts.items():
+            self.counts[name] = self.counts.get(name, 0) + int(value)
+
+    def read_file(self, path: str):
+        self.add(bytes_read=file_size(path))
+
+    def wrote_file(self, path: str):
+        self.add(bytes_written=file_size(path))
+
+    def add_distribution(self, values: pd.Series, name: Optional[str] = None):
+        """
+        값별 행 수 누적 (청크마다 호출 가능)
+
+        Args:
+            values: Category / Subcategory 등 칼럼
+            name: 분포 이름 (기본값: 칼럼 이름)
+        """
+        name = name or values.name
+        counts = values.value_counts()
+        counts = counts[counts > 0]
+        counts.index = counts.index.astype(str)
+        previous = self.distributions.get(name)
+        self.distributions[name] = counts if previous is None else previous.add(counts, fill_value=0)
+
+    def track(self, items: Iterable, rows: Callable = lambda item: len(item[0])) -> Iterator:
+        """
+        items를 그대로 넘기면서 항목(청크) 하나를 받는 데 걸린 wall / CPU 시간을 chunk 레코드로 기록
+
+        map_chunks 결과에 씌우면 청크 처리 시간이 기록됨 (병렬 처리면 결과를 기다린 시간)
+
+        Args:
+            items: 청크 이터레이터 (예: map_chunks 결과)
+            rows: 항목의 입력 행 수를 구하는 함수 (기본값: (청크, 결과) 중 청크 행 수)
+        """
+        items = iter(items)
+        while True:
+            wall, cpu = time.perf_counter(), _cpu_seconds()
+            try:
+                item = next(items)
+            except StopIteration:
+                return
+            row_count = rows(item)
+            self.counts['chunks'] += 1
+            self.add(rows_in=row_count)
+            if self.metrics_path:
+                self._append({'type': 'chunk', 'run_id': self.run_id, 'stage': self.stage,
+                              'chunk': self.counts['chunks'], 'rows': row_count,
+                              'wall_seconds': round(time.perf_counter() - wall, 6),
+                              'cpu_seconds': round(_cpu_seconds() - cpu, 6)})
+            yield item
+
+    def finish(self, **extra) -> dict:
+        """
+        단계 레코드를 만들어서 JSONL / Prometheus 파일에 기록
+
+        Args:
+            extra: 레코드에 추가할 값 (예: fallback 행 수, 재사용 행 수)
+
+        Returns:
+            단계 레코드
+        """
+        wall = time.perf_counter() - self._wall
+        record = {
+            'type': 'stage',
+            'run_id': self.run_id,
+            'stage': self.stage,
+            'started_at': datetime.fromtimestamp(self._started_at).isoformat(timespec='seconds'),
+            'finished_at': round(time.time(), 3),
+            'wall_seconds': round(wall, 6),
+            'cpu_seconds': round(_cpu_seconds() - self._cpu, 6),
+            **self.counts,
+            'rows_per_sec': round(self.counts['rows_in'] / wall, 1) if wall > 0 else None,
+            'peak_rss_bytes': peak_rss_bytes(),
+            'distributions': {name: {key: int(count) for key, count in counts.sort_values(ascending=False).items()}
+                              for name, counts in self.distributions.items()},
+            **extra,
+        }
+        if self.metrics_path:
+            self._append(record)
+        if self.prometheus_path:
+            write_prometheus(self.prometheus_path, record)
+        return record
+
+    def _append(self, record: dict):
+        with open(self.metrics_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def write_prometheus(path: str, record: dict):
+    """
+    단계 레코드를 Prometheus textfile에 반영 (같은 단계의 이전 값은 교체, 다른 단계 값은 유지)
+
+    textfile collector가 쓰는 도중의 파일을 읽지 않도록 임시 파일에 쓴 뒤 이름을 바꿈
+    """
+    stage_label = f'stage="{_escape_label(record["stage"])}"'
+    samples = {}
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                line = line.rstrip('\n')
+                if not line or line.startswith('#') or stage_label in line:
+                    continue
+                samples.setdefault(re.match(r'[a-zA-Z_:][a-zA-Z0-9_:]*', line).group(0), []).append(line)
+
+    for name, (key, _) in PROMETHEUS_METRICS.items():
+        if record.get(key) is not None:
+            samples.setdefault(name, []).append(f'{name}{{{stage_label}}} {record[key]}')
+    for distribution, counts in record.get('distributions', {}).items():
+        for value, count in counts.items():
+            samples.setdefault('cg_stage_distribution_rows', []).append(
+                f'cg_stage_distribution_rows{{{stage_label},column="{_escape_label(distribution)}",'
+                f'value="{_escape_label(value)}"}} {count}')
+
+    descriptions = {name: description for name, (_, description) in PROMETHEUS_METRICS.items()}
+    descriptions['cg_stage_distribution_rows'] = '칼럼 값별 행 수 (카테고리 분포 등)'
+    lines = []
+    for name in sorted(samples):
+        lines.append(f'# HELP {name} {descriptions.get(name, name)}')
+        lines.append(f'# TYPE {name} gauge')
+        lines.extend(samples[name])
+
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+    os.replace(temp_path, path)
@@ -0,0 +1,283 @@
+"""
+오프라인 테스트용 eBay Feed API / 내부 토큰 API 대역 서버
+CG_revise_client.py가 사용하는 엔드포인트만 흉내 내서 실제 eBay에 올리지 않고 업로드 흐름 / 처리량 확인
+
+- GET  /api/ebay/token/<user_id>            토큰 조회
+- POST /api/ebay/token/<user_id>/refresh    토큰 갱신 (새 토큰 발급)
+- POST /sell/feed/v1/task                   작업 생성 (202, Location 헤더)
+- GET  /sell/feed/v1/task?feed_type=...     작업 목록 (tasks: taskId, status, feedType, creationDate)
+- POST /sell/feed/v1/task/<id>/upload_file  배치 CSV 업로드 (multipart)
+- GET  /sell/feed/v1/task/<id>              작업 상태 / uploadSummary
+
+--latency로 요청별 지연, --failure-rate로 임의의 503, --token-ttl로 토큰 만료(401)를 흉내 냄
+--lost-create-rate이면 작업을 만든 뒤 503으로 응답 (응답을 받지 못한 작업 생성 요청)
+ItemID가 숫자가 아니거나 StoreCategory가 비어 있는 행은 실패 행으로 집계
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from typing import Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+UPLOAD_COLUMNS = ['Action', 'ItemID', 'StoreCategory']
+
+
+class MockEbayState:
+    """
+    대역 서버 상태 (발급한 토큰, 작업, 요청 통계)
+    """
+
+    def __init__(self, latency: float = 0.0, failure_rate: float = 0.0, token_ttl: Optional[float] = None,
+                 processing_time: float = 0.0, max_batch_rows: Optional[int] = None, seed: Optional[int] = None,
+                 lost_create_rate: float = 0.0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.lost_create_rate = lost_create_rate
+        self.token_ttl = token_ttl
+        self.processing_time = processing_time
+        self.max_batch_rows = max_batch_rows
+        self.random = random.Random(seed)
+        self.tokens = {}
+        self.tasks = {}
+        self.stats = {'requests': 0, 'tasks': 0, 'uploads': 0, 'rows': 0, 'failed_rows': 0,
+                      'injected_failures': 0, 'lost_creates': 0, 'unauthorized': 0}
+        self.lock = threading.Lock()
+
+    def issue_token(self) -> dict:
+        token = uuid.uuid4().hex
+        expires = time.time() + (self.token_ttl if self.token_ttl is not None else 7200)
+        with self.lock:
+            self.tokens[token] = expires
+        return {'access_token': token, 'token_type': 'User Access Token',
+                'expires_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(expires))}
+
+    def is_authorized(self, header: Optional[str]) -> bool:
+        token = (header or '').replace('Bearer ', '', 1)
+        with self.lock:
+            return self.tokens.get(token, 0) > time.time()
+
+    def inject_failure(self) -> bool:
+        with self.lock:
+            failed = self.random.random() < self.failure_rate
+            if failed:
+                self.stats['injected_failures'] += 1
+        return failed
+
+    def lose_create(self) -> bool:
+        with self.lock:
+            lost = self.random.random() < self.lost_create_rate
+            if lost:
+                self.stats['lost_creates'] += 1
+        return lost
+
+
+def parse_upload(content_type: str, body: bytes) -> bytes:
+    """
+    multipart/form-data 요청 본문에서 file 필드 내용 꺼내기
+    """
+    message = BytesParser(policy=default_policy).parsebytes(
+        b'Content-Type: ' + content_type.encode('latin-1') + b'\r\n\r\n' + body)
+    for part in message.iter_parts():
+        if part.get_param('name', header='content-disposition') == 'file':
+            return part.get_payload(decode=True)
+    raise ValueError('file 필드가 없습니다.')
+
+
+def count_upload_rows(content: bytes) -> Tuple[int, int]:
+    """
+    업로드 CSV의 (성공, 실패) 행 수
+    """
+    df = pd.read_csv(StringIO(content.decode('utf-8-sig')), dtype=str)
+    if list(df.columns) != UPLOAD_COLUMNS:
+        raise ValueError(f'칼럼이 {UPLOAD_COLUMNS}가 아닙니다: {list(df.columns)}')
+    valid = (df['Action'] == 'Revise') & df['ItemID'].str.fullmatch(r'\d+').fillna(False) \
+        & df['StoreCategory'].notna()
+    return int(valid.sum()), int((~valid).sum())
+
+
+class MockEbayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    state: MockEbayState = None
+
+    def log_message(self, format, *args):
+        # 요청마다 로그를 찍으면 처리량 측정에 방해가 되므로 출력하지 않음
+        pass
+
+    def _send(self, status: int, payload: Optional[dict] = None, headers: Optional[dict] = None):
+        body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if payload is not None:
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+    def _begin(self) -> bool:
+        """
+        공통 처리 (지연, 임의 실패) - 응답을 이미 보냈으면 False
+        """
+        state = self.state
+        with state.lock:
+            state.stats['requests'] += 1
+        if state.latency:
+            time.sleep(state.latency)
+        if self.path.startswith('/sell/') and state.inject_failure():
+            self._send(503, {'errors': [{'message': 'Service Unavailable (mock)'}]}, {'Retry-After': '0'})
+            return False
+        if self.path.startswith('/sell/') and not state.is_authorized(self.headers.get('Authorization')):
+            with state.lock:
+                state.stats['unauthorized'] += 1
+            self._send(401, {'errors': [{'message': 'Invalid access token'}]})
+            return False
+        return True
+
+    def do_GET(self):
+        self._read_body()
+        if not self._begin():
+            return
+        state = self.state
+
+        if re.fullmatch(r'/api/ebay/token/[^/]+', self.path):
+            self._send(200, {'success': True, 'source': 'mock', 'data': state.issue_token()})
+            return
+
+        url = urlsplit(self.path)
+        if url.path == '/sell/feed/v1/task':
+            feed_type = parse_qs(url.query).get('feed_type', [None])[0]
+            with state.lock:
+                tasks = [{key: task[key] for key in ('taskId', 'feedType', 'status', 'creationDate')}
+                         for task in state.tasks.values() if feed_type in (None, task['feedType'])]
+            self._send(200, {'tasks': tasks, 'total': len(tasks)})
+            return
+
+        match = re.fullmatch(r'/sell/feed/v1/task/([^/]+)', self.path)
+        if match and match.group(1) in state.tasks:
+            task = state.tasks[match.group(1)]
+            payload = {'taskId': task['taskId'], 'feedType': task['feedType'], 'status': task['status']}
+            if task['status'] == 'IN_PROCESS' and time.time() >= task['ready_at']:
+                task['status'] = 'COMPLETED_WITH_ERROR' if task['failure'] else 'COMPLETED'
+                payload['status'] = task['status']
+            if task['status'] != 'CREATED' and task['status'] != 'IN_PROCESS':
+                payload['uploadSummary'] = {'successCount': task['success'], 'failureCount': task['failure']}
+            self._send(200, payload)
+            return
+
+        self._send(404, {'errors': [{'message': f'Not found: {self.path}'}]})
+
+    def do_POST(self):
+        body = self._read_body()
+        if not self._begin():
+            return
+        state = self.state
+
+        if re.fullmatch(r'/api/ebay/token/[^/]+/refresh', self.path):
+            self._send(200, {'success': True, 'data': state.issue_token()})
+            return
+
+        if self.path == '/sell/feed/v1/task':
+            request = json.loads(body or b'{}')
+            task_id = f'task-{uuid.uuid4().hex[:12]}'
+            with state.lock:
+                state.tasks[task_id] = {'taskId': task_id, 'feedType': request.get('feedType'),
+                                        'status': 'CREATED', 'success': 0, 'failure': 0, 'ready_at': 0,
+                                        'creationDate': time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime())}
+                state.stats['tasks'] += 1
+            if state.lose_create():
+                self._send(503, {'errors': [{'message': 'Service Unavailable (mock)'}]}, {'Retry-After': '0'})
+                return
+            host = self.headers.get('Host', f'{self.server.server_address[0]}:{self.server.server_address[1]}')
+            self._send(202, headers={'Location': f'http://{host}/sell/feed/v1/task/{task_id}'})
+            return
+
+        match = re.fullmatch(r'/sell/feed/v1/task/([^/]+)/upload_file', self.path)
+        if match and match.group(1) in state.tasks:
+            try:
+                success, failure = count_upload_rows(parse_upload(self.headers.get('Content-Type', ''), body))
+            except ValueError as e:
+                self._send(400, {'errors': [{'message': str(e)}]})
+                return
+            if state.max_batch_rows is not None and success + failure > state.max_batch_rows:
+                self._send(413, {'errors': [{'message': f'최대 {state.max_batch_rows}행까지 업로드 가능'}]})
+                return
+
+            task = state.tasks[match.group(1)]
+            with state.lock:
+                task.update(status='IN_PROCESS', success=success, failure=failure,
+                            ready_at=time.time() + state.processing_time)
+                state.stats['uploads'] += 1
+                state.stats['rows'] += success + failure
+                state.stats['failed_rows'] += failure
+            self._send(200, {})
+            return
+
+        self._send(404, {'errors': [{'message': f'Not found: {self.path}'}]})
+
+
+def start_mock_server(host: str = '127.0.0.1', port: int = 0, **options) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    대역 서버를 백그라운드 스레드에서 실행
+
+    Args:
+        host: 바인딩 주소
+        port: 포트 (0이면 빈 포트 자동 선택)
+        options: MockEbayState 옵션 (latency, failure_rate, token_ttl, processing_time, max_batch_rows, seed,
+                 lost_create_rate)
+
+    Returns:
+        (서버 객체, 기본 URL) - 종료할 때 server.shutdown()
+    """
+    handler = type('BoundMockEbayHandler', (MockEbayHandler,), {'state': MockEbayState(**options)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://{host}:{server.server_address[1]}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='오프라인 테스트용 eBay Feed API / 토큰 API 대역 서버')
+    parser.add_argument('--host', default='127.0.0.1', help='바인딩 주소')
+    parser.add_argument('--port', type=int, default=8765, help='포트')
+    parser.add_argument('--latency', type=float, default=0.0, help='요청별 지연 (초)')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Feed API 요청이 503으로 실패할 확률')
+    parser.add_argument('--token-ttl', type=float, default=None, help='토큰 유효 시간 (초, 기본값: 2시간)')
+    parser.add_argument('--processing-time', type=float, default=0.0, help='업로드 후 작업 완료까지 시간 (초)')
+    parser.add_argument('--max-batch-rows', type=int, default=None, help='업로드 파일 하나의 최대 행 수 (넘으면 413)')
+    parser.add_argument('--lost-create-rate', type=float, default=0.0,
+                        help='작업을 만든 뒤 503으로 응답할 확률 (응답을 받지 못한 작업 생성)')
+    parser.add_argument('--seed', type=int, default=None, help='임의 실패 시드')
+    args = parser.parse_args()
+
+    server, base_url = start_mock_server(args.host, args.port, latency=args.latency,
+                                         failure_rate=args.failure_rate, token_ttl=args.token_ttl,
+                                         processing_time=args.processing_time,
+                                         max_batch_rows=args.max_batch_rows, seed=args.seed,
+                                         lost_create_rate=args.lost_create_rate)
+    state = server.RequestHandlerClass.state
+    print(f"Mock eBay 서버 실행 중: {base_url}")
+    print(f"  업로드: python CG_revise_client.py --feed-api-url {base_url}/sell/feed/v1 --token-api-url {base_url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(f"\n요청 통계: {state.stats}")
+
+
+if __name__ == "__main__":
+    main()
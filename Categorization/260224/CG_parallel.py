@@ -0,0 +1,56 @@
+"""
+청크 병렬 처리 공통 모듈
+청크를 프로세스 풀에 보내서 처리하고 결과는 입력 순서대로 반환
+동시에 처리 중인(in-flight) 청크 수를 제한하여 메모리 사용량이 청크 몇 개 분량을 넘지 않도록 함
+
+작업 프로세스 수는 CG_WORKERS 환경변수(또는 실행 옵션)로 지정 (기본값 1 = 병렬 처리 안 함)
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+WORKERS = int(os.environ.get('CG_WORKERS', '1'))
+
+
+def map_chunks(func: Callable, items: Iterable,
+               workers: Optional[int] = None,
+               max_in_flight: Optional[int] = None,
+               payload: Optional[Callable] = None,
+               initializer: Optional[Callable] = None,
+               initargs: tuple = ()) -> Iterator[Tuple[object, object]]:
+    """
+    items의 각 항목에 func를 적용하고 (항목, 결과)를 입력 순서대로 반환
+
+    Args:
+        func: 작업 프로세스에서 실행할 모듈 최상위 함수 (pickle 가능해야 함)
+        items: 청크 이터레이터 (필요한 만큼만 앞서서 읽음)
+        workers: 작업 프로세스 수 (None이면 CG_WORKERS, 1 이하이면 현재 프로세스에서 순서대로 처리)
+        max_in_flight: 동시에 처리 중인 청크 수 상한 (기본값: workers * 2)
+        payload: 항목에서 func에 넘길 값을 꺼내는 함수 (기본값: 항목 그대로, 현재 프로세스에서 실행)
+        initializer: 작업 프로세스 시작 시 한 번 실행할 함수 (순서 처리인 경우 현재 프로세스에서 실행)
+        initargs: initializer 인자
+    """
+    workers = WORKERS if workers is None else workers
+    payload = payload or (lambda item: item)
+
+    if workers <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        for item in items:
+            yield item, func(payload(item))
+        return
+
+    max_in_flight = max(max_in_flight or workers * 2, 1)
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+        pending = deque()
+        for item in items:
+            pending.append((item, pool.submit(func, payload(item))))
+            # 상한에 도달하면 가장 오래된 청크 결과를 기다렸다가 반환
+            if len(pending) >= max_in_flight:
+                item_done, future = pending.popleft()
+                yield item_done, future.result()
+        while pending:
+            item_done, future = pending.popleft()
+            yield item_done, future.result()
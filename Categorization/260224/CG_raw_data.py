@@ -0,0 +1,73 @@
+"""
+raw_data 사이드카 파일 모듈
+raw_data(JSON) 칼럼은 brand 추출에만 필요하므로 02_ 파일을 만들 때 (origin_id, raw_data)를
+사이드카 Parquet 파일에 한 번만 저장하고, 중간 파일(02_ ~ 05_)에는 사이드카 행 번호(raw_data_ref)만 남김
+raw_data가 필요한 단계(01_CG_parsing_brand.py)는 raw_data_ref로 필요한 청크만 조회
+"""
+
+import os
+from typing import Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+SIDECAR_FILE = '02_CG_eBay_active_listing_raw_data'
+REF_COLUMN = 'raw_data_ref'
+
+
+def sidecar_base_path(stage_path: str) -> str:
+    """
+    중간 파일과 같은 디렉토리의 사이드카 경로 (확장자 없음)
+    """
+    return os.path.join(os.path.dirname(os.path.abspath(stage_path)), SIDECAR_FILE)
+
+
+def split_raw_data(df: pd.DataFrame, offset: int = 0) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    병합 결과에서 raw_data를 사이드카 행으로 분리
+
+    같은 (origin_id, raw_data)는 사이드카에 한 번만 저장하고, raw_data가 없는 행은 raw_data_ref도 비움
+
+    Args:
+        df: origin_id, raw_data 칼럼이 있는 DataFrame
+        offset: 사이드카에 이미 저장된 행 수 (청크 단위로 이어서 저장할 때)
+
+    Returns:
+        (raw_data 대신 raw_data_ref 칼럼이 들어간 DataFrame, 사이드카에 추가할 origin_id / raw_data 행)
+    """
+    has_raw = df['raw_data'].notna()
+    pairs = df.loc[has_raw, ['origin_id', 'raw_data']]
+
+    # sort=False이면 처음 나온 순서대로 번호가 매겨지므로 drop_duplicates 순서와 같음
+    codes = pairs.groupby(['origin_id', 'raw_data'], sort=False, dropna=False).ngroup() + offset
+    refs = pd.Series(pd.NA, index=df.index, dtype='Int64')
+    refs[has_raw] = codes.to_numpy()
+
+    position = df.columns.get_loc('raw_data')
+    df_ref = df.drop(columns='raw_data')
+    df_ref.insert(position, REF_COLUMN, refs)
+    return df_ref, pairs.drop_duplicates().reset_index(drop=True)
+
+
+class RawDataSidecar:
+    """
+    raw_data 사이드카 조회 (처음 조회할 때 raw_data 칼럼만 메모리 매핑으로 읽음)
+    """
+
+    def __init__(self, base_path: str):
+        self.path = base_path + '.parquet'
+        self._raw_data: Optional[pa.ChunkedArray] = None
+
+    def resolve(self, refs: pd.Series) -> pd.Series:
+        """
+        raw_data_ref 칼럼을 raw_data 값으로 변환 (비어 있는 ref는 NaN)
+        """
+        if self._raw_data is None:
+            self._raw_data = pq.read_table(self.path, columns=['raw_data'], memory_map=True).column('raw_data')
+
+        positions = pd.to_numeric(refs).astype('Int64')
+        indices = pa.array(positions, type=pa.int64(), from_pandas=True)
+        raw_data = self._raw_data.take(indices).to_pandas()
+        raw_data.index = refs.index
+        return raw_data.astype(object).where(raw_data.notna())
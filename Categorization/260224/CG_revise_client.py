@@ -0,0 +1,536 @@
+"""
+eBay StoreCategory 일괄 Revise 업로드 클라이언트
+업로드 파일(06_CG_eBay_uploads_file.csv, Action / ItemID / StoreCategory)을 손으로 올리지 않고
+eBay Feed API(File Exchange 형식 FX_LISTING 피드)에 배치 파일로 나눠서 바로 업로드
+
+- 배치 하나 = Feed API 작업(task) 하나: 작업 생성 → 배치 CSV 업로드 → 처리 완료까지 상태 조회
+- 배치는 행 수 / 파일 크기 상한까지 최대한 크게 나누고, 여러 배치를 스레드 풀에서 동시에 업로드
+- 429 / 5xx / 연결 오류는 지수 백오프로 재시도, 401이면 토큰 갱신 후 재시도
+- 배치별 결과(작업 ID, 상태, 성공 / 실패 행 수, 시도 횟수, 소요 시간)를 JSONL 파일에 기록
+- 상태 조회 시간(poll_timeout) 안에 처리가 끝나지 않은 배치는 전체 행 실패(ERROR)로 기록하고 작업 ID를 남김
+  → --resume이면 이전 결과 파일을 읽어서 성공한 배치는 건너뛰고, 파일을 올린 배치는 같은 작업을 다시 조회
+- 작업 생성 요청이 5xx / 연결 오류로 끝나도 서버에는 작업이 만들어졌을 수 있으므로, 다시 만들기 전에
+  이 클라이언트가 아직 사용하지 않은 열린 작업(CREATED)을 찾아서 사용 (작업 생성은 한 번에 한 스레드만)
+- 모든 행이 성공한 배치만 업로드 상태(CG_upload_state.sqlite)에 저장 → 실패 / 일부 실패 배치는 다음 업로드 파일에 다시 들어감
+- 인증은 EbayPhotoExtractor.get_access_token과 같은 내부 토큰 API 사용
+
+오프라인 테스트 / 처리량 측정은 CG_mock_ebay_server.py (--mock 옵션이면 같은 프로세스에서 실행)
+"""
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+import requests
+
+from CG_upload_state import DEFAULT_STATE_PATH, UploadState
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+UPLOAD_FILE = '06_CG_eBay_uploads_file.csv'
+
+FEED_API_URL = 'https://api.ebay.com/sell/feed/v1'
+TOKEN_API_URL = os.getenv('TOKEN_API_URL', 'http://callback.codegurus.co.kr:5000')
+USER_ID = os.getenv('EBAY_USER_ID', 'chic_gangnam')
+MARKETPLACE_ID = 'EBAY_US'
+
+# File Exchange 형식 CSV 피드 (06_ 파일 칼럼 그대로 업로드)
+FEED_TYPE = 'FX_LISTING'
+SCHEMA_VERSION = '1.0'
+
+# 배치 파일 하나의 상한 (File Exchange 업로드 파일 크기 제한 15MB보다 작게)
+MAX_BATCH_ROWS = 10000
+MAX_BATCH_BYTES = 15 * 1024 * 1024 - 64 * 1024
+
+# 동시에 업로드하는 배치 수는 CG_REVISE_WORKERS 환경변수(또는 실행 옵션)로 지정
+REVISE_WORKERS = int(os.environ.get('CG_REVISE_WORKERS', '4'))
+
+MAX_RETRIES = 5
+BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 60.0
+POLL_INTERVAL_SECONDS = 5.0
+POLL_TIMEOUT_SECONDS = 30 * 60
+REQUEST_TIMEOUT_SECONDS = 60
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# 작업 상태 중 처리가 끝난 상태
+FINAL_TASK_STATUSES = {'COMPLETED', 'COMPLETED_WITH_ERROR', 'FAILED', 'PARTIALLY_PROCESSED'}
+# 파일을 아직 올리지 않은 작업 상태
+OPEN_TASK_STATUS = 'CREATED'
+# 응답을 받지 못한 작업 생성 요청의 작업을 찾을 때 서버와 시계 차이 허용 범위 (초)
+CLOCK_SKEW_SECONDS = 60
+
+
+class TokenProvider:
+    """
+    내부 토큰 API에서 access token 조회 / 갱신 (EbayPhotoExtractor.get_access_token과 같은 API)
+
+    여러 업로드 스레드가 공유하므로 토큰 조회 / 갱신은 한 번에 한 스레드만 실행
+    """
+
+    def __init__(self, user_id: str = USER_ID, token_api_url: str = TOKEN_API_URL):
+        self.user_id = user_id
+        self.token_api_url = token_api_url.rstrip('/')
+        self.access_token = None
+        self.token_expiry = None
+        self._lock = threading.Lock()
+
+    def get(self, force_refresh: bool = False, stale_token: Optional[str] = None) -> str:
+        """
+        access token 반환 (없거나 force_refresh이면 토큰 API 호출)
+
+        Args:
+            force_refresh: True인 경우 토큰 갱신 시도 (실패하면 기존 토큰 조회)
+            stale_token: 401을 받은 토큰 (다른 스레드가 이미 갱신했으면 다시 갱신하지 않음)
+
+        Returns:
+            access_token 문자열
+        """
+        with self._lock:
+            if self.access_token and not force_refresh:
+                return self.access_token
+            if force_refresh and self.access_token and self.access_token != stale_token:
+                return self.access_token
+
+            if force_refresh:
+                print(f"토큰 갱신 시도 중... (user_id: {self.user_id})")
+                response = requests.post(f"{self.token_api_url}/api/ebay/token/{self.user_id}/refresh",
+                                         timeout=REQUEST_TIMEOUT_SECONDS)
+                if response.status_code == 200 and response.json().get('success'):
+                    return self._store(response.json())
+                print(f"[WARN] 토큰 갱신 실패 (HTTP {response.status_code}), 기존 토큰 조회 시도")
+
+            response = requests.get(f"{self.token_api_url}/api/ebay/token/{self.user_id}",
+                                    timeout=REQUEST_TIMEOUT_SECONDS)
+            response.raise_for_status()
+            result = response.json()
+            if not result.get('success'):
+                raise Exception(f"Token not found: {result.get('error', 'Unknown error')}")
+            return self._store(result)
+
+    def _store(self, result: dict) -> str:
+        token_data = result.get('data', {})
+        self.access_token = token_data.get('access_token')
+        self.token_expiry = token_data.get('expires_at')
+        print(f"[OK] Access token 조회 성공 (만료 시간: {self.token_expiry})")
+        return self.access_token
+
+
+class RetryableError(Exception):
+    """
+    재시도하면 성공할 수 있는 오류 (429 / 5xx / 연결 오류 / 작업 상태 조회 시간 초과 전)
+    """
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def split_batches(df_upload: pd.DataFrame,
+                  max_rows: int = MAX_BATCH_ROWS,
+                  max_bytes: int = MAX_BATCH_BYTES) -> Iterator[pd.DataFrame]:
+    """
+    업로드 행을 행 수 / CSV 크기 상한을 넘지 않는 가장 큰 배치로 나눔
+
+    Args:
+        df_upload: Action, ItemID, StoreCategory 칼럼이 있는 업로드 DataFrame
+        max_rows: 배치 하나의 최대 행 수
+        max_bytes: 배치 CSV 하나의 최대 크기 (헤더 포함, bytes)
+
+    Returns:
+        배치 DataFrame 이터레이터
+    """
+    columns = ['Action', 'ItemID', 'StoreCategory']
+    header_bytes = len(','.join(columns)) + 1
+    # 행별 CSV 크기 (값 + 구분자 + 줄바꿈)
+    row_bytes = sum(df_upload[column].astype(str).str.len() for column in columns) + len(columns)
+    ends = row_bytes.cumsum().to_numpy()
+
+    start = 0
+    while start < len(df_upload):
+        base = ends[start - 1] if start else 0
+        fit = int((ends[start:start + max_rows] - base <= max_bytes - header_bytes).sum())
+        end = start + max(fit, 1)
+        yield df_upload.iloc[start:end]
+        start = end
+
+
+class ReviseClient:
+    """
+    Feed API 배치 업로드 클라이언트
+
+    사용 예:
+        client = ReviseClient(TokenProvider())
+        results = client.upload(df_upload, results_path)
+        print(summarize_results(results, seconds))
+    """
+
+    def __init__(self, token_provider: TokenProvider,
+                 feed_api_url: str = FEED_API_URL,
+                 marketplace_id: str = MARKETPLACE_ID,
+                 workers: int = REVISE_WORKERS,
+                 max_retries: int = MAX_RETRIES,
+                 backoff: float = BACKOFF_SECONDS,
+                 poll_interval: float = POLL_INTERVAL_SECONDS,
+                 poll_timeout: float = POLL_TIMEOUT_SECONDS):
+        self.token_provider = token_provider
+        self.feed_api_url = feed_api_url.rstrip('/')
+        self.marketplace_id = marketplace_id
+        self.workers = max(workers, 1)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.poll_interval = poll_interval
+        self.poll_timeout = poll_timeout
+        # requests.Session은 스레드 간 공유하지 않음
+        self._local = threading.local()
+        # 작업 생성은 한 번에 한 스레드만 (응답 없이 만들어진 작업을 다른 스레드와 나눠 갖지 않도록)
+        self._create_lock = threading.Lock()
+        self._claimed_tasks = set()
+
+    def _session(self) -> requests.Session:
+        if not hasattr(self._local, 'session'):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        인증 헤더를 붙여서 한 번 요청 (401이면 토큰 갱신 후 한 번 더 요청)
+        """
+        headers = kwargs.pop('headers', {})
+        token = self.token_provider.get()
+        for _ in range(2):
+            headers.update({'Authorization': f'Bearer {token}', 'X-EBAY-C-MARKETPLACE-ID': self.marketplace_id})
+            try:
+                response = self._session().request(method, url, headers=headers,
+                                                   timeout=REQUEST_TIMEOUT_SECONDS, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                raise RetryableError(f'{method} {url}: {e}')
+            if response.status_code != 401:
+                break
+            token = self.token_provider.get(force_refresh=True, stale_token=token)
+
+        if response.status_code in RETRY_STATUS_CODES:
+            retry_after = response.headers.get('Retry-After')
+            raise RetryableError(f'{method} {url}: HTTP {response.status_code}',
+                                 float(retry_after) if retry_after else None)
+        response.raise_for_status()
+        return response
+
+    def _with_retry(self, func, *args):
+        """
+        RetryableError이면 지수 백오프(+ 지터)로 재시도
+
+        Returns:
+            (func 반환값, 시도 횟수)
+        """
+        for attempt in range(1, self.max_retries + 2):
+            try:
+                return func(*args), attempt
+            except RetryableError as e:
+                if attempt > self.max_retries:
+                    raise
+                delay = min(self.backoff * 2 ** (attempt - 1), MAX_BACKOFF_SECONDS)
+                delay = max(delay * random.uniform(0.5, 1.0), e.retry_after or 0)
+                print(f"  [WARN] {e} → {delay:.1f}초 후 재시도 ({attempt}/{self.max_retries})")
+                time.sleep(delay)
+
+    def create_task(self) -> Tuple[str, int]:
+        """
+        FX_LISTING 업로드 작업 생성 (재시도 포함)
+
+        5xx / 연결 오류로 끝난 요청도 서버에서 작업을 만들었을 수 있으므로, 두 번째 시도부터는 새로 만들기 전에
+        첫 시도 이후 만들어진 열린 작업 중 이 클라이언트가 사용하지 않은 작업이 있으면 그 작업을 사용
+
+        Returns:
+            (작업 ID, 시도 횟수)
+        """
+        with self._create_lock:
+            since = time.time() - CLOCK_SKEW_SECONDS
+            attempts = []
+
+            def attempt():
+                attempts.append(len(attempts) + 1)
+                if len(attempts) > 1:
+                    task_id = self._find_open_task(since)
+                    if task_id is not None:
+                        print(f"  [WARN] 응답을 받지 못한 작업 생성 요청의 작업 사용: {task_id} (시도 {len(attempts)})")
+                        return task_id
+                response = self._request('POST', f'{self.feed_api_url}/task',
+                                         json={'feedType': FEED_TYPE, 'schemaVersion': SCHEMA_VERSION})
+                return response.headers['Location'].rstrip('/').rsplit('/', 1)[-1]
+
+            task_id, count = self._with_retry(attempt)
+            self._claimed_tasks.add(task_id)
+            if count > 1:
+                print(f"  작업 생성: {task_id} (시도 {count}회)")
+            return task_id, count
+
+    def list_open_tasks(self) -> List[dict]:
+        """
+        최근 하루 동안 만든 FX_LISTING 작업 중 파일을 아직 올리지 않은 작업 (creationDate 순)
+        """
+        response = self._request('GET', f'{self.feed_api_url}/task',
+                                 params={'feed_type': FEED_TYPE, 'look_back_days': 1, 'limit': 500})
+        tasks = [task for task in response.json().get('tasks', []) if task.get('status') == OPEN_TASK_STATUS]
+        return sorted(tasks, key=lambda task: task.get('creationDate', ''))
+
+    def _find_open_task(self, since: float) -> Optional[str]:
+        # since 이후 만들어졌고 다른 배치가 사용하지 않은 열린 작업 (여러 개면 가장 먼저 만든 작업, 나머지는 기록만)
+        candidates = [task['taskId'] for task in self.list_open_tasks()
+                      if task['taskId'] not in self._claimed_tasks and _parse_time(task.get('creationDate')) >= since]
+        if len(candidates) > 1:
+            print(f"  [WARN] 사용하지 않은 열린 작업 {len(candidates) - 1}개: {', '.join(candidates[1:])}")
+        return candidates[0] if candidates else None
+
+    def upload_file(self, task_id: str, file_name: str, content: bytes):
+        """
+        작업에 배치 CSV 업로드
+        """
+        self._request('POST', f'{self.feed_api_url}/task/{task_id}/upload_file',
+                      data={'fileName': file_name, 'name': 'file', 'type': 'form-data'},
+                      files={'file': (file_name, content, 'text/csv')})
+
+    def get_task(self, task_id: str) -> dict:
+        return self._request('GET', f'{self.feed_api_url}/task/{task_id}').json()
+
+    def wait_task(self, task_id: str) -> dict:
+        """
+        작업 처리가 끝날 때까지 상태 조회 (poll_timeout을 넘으면 마지막 상태 반환, 처리가 끝나지 않은 상태일 수 있음)
+        """
+        deadline = time.monotonic() + self.poll_timeout
+        while True:
+            task, _ = self._with_retry(self.get_task, task_id)
+            if task.get('status') in FINAL_TASK_STATUSES or time.monotonic() >= deadline:
+                return task
+            time.sleep(self.poll_interval)
+
+    def upload_batch(self, batch_no: int, df_batch: pd.DataFrame,
+                     previous: Optional[Dict[str, object]] = None) -> Dict[str, object]:
+        """
+        배치 하나 업로드 (작업 생성 → 파일 업로드 → 처리 완료 대기)
+
+        Args:
+            batch_no: 배치 번호
+            df_batch: 배치 DataFrame
+            previous: 같은 배치의 이전 결과 (--resume, 성공한 배치면 그대로 반환하고
+                      파일을 올렸지만 처리 결과를 받지 못한 배치면 같은 작업을 다시 조회)
+
+        Returns:
+            배치 결과 (batch, rows, first_item, task_id, uploaded, status, task_status, success, failure,
+            attempts, seconds, error)
+        """
+        started = time.monotonic()
+        result = {'batch': batch_no, 'rows': len(df_batch), 'first_item': str(df_batch['ItemID'].iloc[0]),
+                  'task_id': None, 'uploaded': False, 'status': None, 'task_status': None,
+                  'success': 0, 'failure': 0, 'attempts': 0, 'error': None}
+        file_name = f'CG_revise_{batch_no:05d}.csv'
+        content = df_batch.to_csv(index=False, encoding='utf-8').encode('utf-8')
+
+        # 이전 결과는 배치 경계(행 수, 첫 ItemID)가 같을 때만 사용
+        if previous is not None and (previous['rows'], previous['first_item']) != (result['rows'], result['first_item']):
+            previous = None
+        if previous is not None and is_confirmed(previous):
+            return previous
+        if previous is not None and previous.get('uploaded') and previous['status'] == 'ERROR':
+            result.update(task_id=previous['task_id'], uploaded=True)
+
+        try:
+            if not result['uploaded']:
+                result['task_id'], attempts = self.create_task()
+                result['attempts'] += attempts
+                _, attempts = self._with_retry(self.upload_file, result['task_id'], file_name, content)
+                result['attempts'] += attempts
+                result['uploaded'] = True
+
+            task = self.wait_task(result['task_id'])
+            result['task_status'] = task.get('status')
+            if result['task_status'] in FINAL_TASK_STATUSES:
+                summary = task.get('uploadSummary', {})
+                result['status'] = result['task_status']
+                result['success'] = int(summary.get('successCount', 0))
+                result['failure'] = int(summary.get('failureCount', 0))
+            else:
+                # 처리 결과를 모르므로 전체 행 실패로 기록 (작업 ID는 남겨서 --resume으로 다시 조회)
+                result['status'] = 'ERROR'
+                result['failure'] = len(df_batch)
+                result['error'] = (f"작업 처리 대기 시간 초과 ({self.poll_timeout:g}초, 마지막 상태 "
+                                   f"{result['task_status']}, 작업 ID {result['task_id']})")
+        except (RetryableError, requests.RequestException) as e:
+            result['status'] = 'ERROR'
+            result['failure'] = len(df_batch)
+            result['error'] = str(e)
+
+        result['seconds'] = round(time.monotonic() - started, 3)
+        return result
+
+    def upload(self, df_upload: pd.DataFrame, results_path: Optional[str] = None,
+               max_rows: int = MAX_BATCH_ROWS,
+               on_confirmed: Optional[Callable[[pd.DataFrame], None]] = None,
+               previous_results: Optional[List[Dict[str, object]]] = None) -> List[Dict[str, object]]:
+        """
+        업로드 행을 배치로 나눠서 동시에 업로드하고 배치별 결과를 JSONL 파일에 기록
+
+        동시에 업로드 중인 배치 수는 workers * 2를 넘지 않도록 제한 (CG_parallel.map_chunks와 같은 방식)
+
+        Args:
+            df_upload: Action, ItemID, StoreCategory 칼럼이 있는 업로드 DataFrame
+            results_path: 배치별 결과 JSONL 경로 (None이면 저장하지 않음)
+            max_rows: 배치 하나의 최대 행 수
+            on_confirmed: 모든 행이 성공한 배치의 DataFrame을 받는 함수 (메인 스레드에서 배치 순서대로 호출,
+                          예: UploadState.confirm)
+            previous_results: 같은 업로드 파일 / 배치 크기로 실행한 이전 결과 (load_results, 이어서 업로드)
+
+        Returns:
+            배치별 결과 리스트 (배치 순서)
+        """
+        results = []
+        previous = {result['batch']: result for result in previous_results or []}
+        results_file = open(results_path, 'w', encoding='utf-8') if results_path else None
+
+        def record(df_batch, result):
+            if on_confirmed is not None and is_confirmed(result):
+                on_confirmed(df_batch)
+            results.append(result)
+            if results_file:
+                results_file.write(json.dumps(result, ensure_ascii=False) + '\n')
+                results_file.flush()
+            print(f"  배치 {result['batch']}: {result['rows']:,}행 → {result['status']} "
+                  f"(성공 {result['success']:,}, 실패 {result['failure']:,}, {result['seconds']:.1f}초)")
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                pending = deque()
+                for batch_no, df_batch in enumerate(split_batches(df_upload, max_rows)):
+                    pending.append((df_batch, pool.submit(self.upload_batch, batch_no, df_batch,
+                                                            previous.get(batch_no))))
+                    if len(pending) >= self.workers * 2:
+                        df_done, future = pending.popleft()
+                        record(df_done, future.result())
+                while pending:
+                    df_done, future = pending.popleft()
+                    record(df_done, future.result())
+        finally:
+            if results_file:
+                results_file.close()
+        return results
+
+
+def _parse_time(value: Optional[str]) -> float:
+    # Feed API 시각 문자열 (예: 2026-10-17T01:02:03.000Z) → epoch 초 (없으면 0)
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp() if value else 0.0
+
+
+def load_results(results_path: str) -> List[Dict[str, object]]:
+    """
+    이전 실행의 배치별 결과 JSONL 읽기 (없으면 빈 리스트)
+    """
+    if not os.path.exists(results_path):
+        return []
+    with open(results_path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def is_confirmed(result: Dict[str, object]) -> bool:
+    """
+    배치의 모든 행이 업로드에 성공했는지 (일부만 실패한 배치는 어느 행인지 알 수 없으므로 확인되지 않은 것으로 처리)
+    """
+    return result['status'] == 'COMPLETED' and result['failure'] == 0 and result['success'] == result['rows']
+
+
+def summarize_results(results: List[Dict[str, object]], seconds: float) -> str:
+    """
+    배치 결과 요약 문자열 (처리량 포함)
+    """
+    rows = sum(result['rows'] for result in results)
+    success = sum(result['success'] for result in results)
+    failure = sum(result['failure'] for result in results)
+    failed_batches = sum(result['status'] != 'COMPLETED' for result in results)
+    rate = rows / seconds if seconds > 0 else 0.0
+    return (f"배치 {len(results):,}개 ({failed_batches:,}개 오류 / 일부 실패), {rows:,}행 중 성공 {success:,}, "
+            f"실패 {failure:,} / {seconds:.1f}초 ({rate:,.0f}행/초)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='06_ 업로드 파일을 eBay Feed API로 일괄 Revise 업로드')
+    parser.add_argument('upload_file', nargs='?', default=os.path.join(SCRIPT_DIR, UPLOAD_FILE),
+                        help=f'업로드 파일 경로 (기본값: 스크립트 위치의 {UPLOAD_FILE})')
+    parser.add_argument('--feed-api-url', default=FEED_API_URL, help=f'Feed API URL (기본값: {FEED_API_URL})')
+    parser.add_argument('--token-api-url', default=TOKEN_API_URL, help='내부 토큰 API 서버 URL')
+    parser.add_argument('--user-id', default=USER_ID, help='토큰 API 사용자 ID')
+    parser.add_argument('--marketplace', default=MARKETPLACE_ID, help='X-EBAY-C-MARKETPLACE-ID')
+    parser.add_argument('--workers', type=int, default=REVISE_WORKERS,
+                        help='동시에 업로드하는 배치 수 (기본값: CG_REVISE_WORKERS 또는 4)')
+    parser.add_argument('--batch-rows', type=int, default=MAX_BATCH_ROWS, help='배치 하나의 최대 행 수')
+    parser.add_argument('--retries', type=int, default=MAX_RETRIES, help='요청별 최대 재시도 횟수')
+    parser.add_argument('--poll-interval', type=float, default=POLL_INTERVAL_SECONDS, help='작업 상태 조회 간격 (초)')
+    parser.add_argument('--poll-timeout', type=float, default=POLL_TIMEOUT_SECONDS,
+                        help='배치별 작업 처리 대기 시간 (초, 넘으면 오류로 기록하고 --resume으로 다시 조회)')
+    parser.add_argument('--resume', action='store_true',
+                        help='이전 결과 파일(--results)을 읽어서 성공한 배치는 건너뛰고 처리 중이던 작업은 다시 조회')
+    parser.add_argument('--results', default=None, help='배치별 결과 JSONL 경로 (기본값: 업로드 파일 이름 + _results.jsonl)')
+    parser.add_argument('--upload-state', default=None,
+                        help=f'성공한 배치를 저장할 업로드 상태 경로 (기본값: {DEFAULT_STATE_PATH}, --mock이면 저장 안 함)')
+    parser.add_argument('--mock', action='store_true',
+                        help='CG_mock_ebay_server를 같은 프로세스에서 띄워서 오프라인으로 업로드 (처리량 측정용)')
+    args = parser.parse_args()
+
+    results_path = args.results or os.path.splitext(args.upload_file)[0] + '_results.jsonl'
+    previous_results = load_results(results_path) if args.resume else None
+    df_upload = pd.read_csv(args.upload_file, dtype=str)
+    print(f"업로드 파일: {args.upload_file} ({len(df_upload):,}행)")
+    if previous_results is not None:
+        confirmed = sum(is_confirmed(result) for result in previous_results)
+        print(f"이전 결과: 배치 {len(previous_results):,}개 중 {confirmed:,}개 성공 → 나머지 배치만 다시 업로드 / 조회")
+    if df_upload.empty:
+        print("업로드할 행이 없습니다.")
+        return
+
+    server = None
+    if args.mock:
+        from CG_mock_ebay_server import start_mock_server
+        server, base_url = start_mock_server()
+        args.feed_api_url = base_url + '/sell/feed/v1'
+        args.token_api_url = base_url
+        args.poll_interval = min(args.poll_interval, 0.05)
+        print(f"Mock 서버: {base_url}")
+
+    client = ReviseClient(TokenProvider(args.user_id, args.token_api_url),
+                          feed_api_url=args.feed_api_url,
+                          marketplace_id=args.marketplace,
+                          workers=args.workers,
+                          max_retries=args.retries,
+                          poll_interval=args.poll_interval,
+                          poll_timeout=args.poll_timeout)
+
+    # 오프라인(--mock) 업로드는 실제 업로드가 아니므로 경로를 직접 준 경우에만 상태 저장
+    upload_state_path = args.upload_state or (None if args.mock else DEFAULT_STATE_PATH)
+    upload_state = UploadState(upload_state_path) if upload_state_path else None
+
+    started = time.perf_counter()
+    try:
+        results = client.upload(df_upload, results_path, max_rows=args.batch_rows,
+                                on_confirmed=upload_state.confirm if upload_state else None,
+                                previous_results=previous_results)
+    finally:
+        if server is not None:
+            server.shutdown()
+        if upload_state is not None:
+            upload_state.close()
+    elapsed = time.perf_counter() - started
+
+    print(f"\n업로드 결과: {summarize_results(results, elapsed)}")
+    print(f"배치별 결과 저장 완료 : {results_path}")
+    if upload_state_path:
+        confirmed = sum(result['rows'] for result in results if is_confirmed(result))
+        print(f"업로드 상태 저장: {confirmed:,}행 → {upload_state_path} (나머지는 다음 업로드 파일에 다시 포함)")
+
+
+if __name__ == "__main__":
+    main()
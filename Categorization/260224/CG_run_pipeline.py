@@ -0,0 +1,571 @@
+"""
+Categorization 00 ~ 04 단계 통합 실행 스크립트
+리스팅 파일을 청크 단위로 읽어서 접두사 제거 → DB 병합 → brand 추출 → 카테고리 분류
+→ 하위 카테고리 분류 → Category_id 지정을 메모리에서 한 번에 처리하고
+최종 업로드 파일(06_CG_eBay_uploads_file.csv)만 저장
+중간 파일(01_ ~ 05_)은 --debug 옵션을 줄 때만 저장
+--incremental 옵션을 주면 이전 날짜 폴더의 상태 파일을 읽어서 바뀌지 않은 행은 분류 결과를 재사용
+--workers 옵션을 주면 brand 추출 / 분류(01 ~ 04)를 프로세스 풀에서 청크 단위로 병렬 처리
+--title-model 옵션을 주면 키워드 규칙으로 Others인 행만 보조 분류 모델(CG_title_model.py)로 다시 분류
+Title 토큰 행렬(06_CG_title_tokens)은 청크마다 한 번만 만들어 분류에 사용하고 저장
+(--incremental이면 이전 상태와 같은 행은 이전 날짜 폴더의 토큰 파일에서 가져오고 나머지 행만 토큰화)
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+import time
+from functools import lru_cache
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+import CG_incremental as incremental
+from CG_brand_trie import BRAND_ALIASES_PATH, select_observed_brands
+from CG_io import STAGE_FORMATS, StageWriter
+from CG_metrics import METRICS_PATH, PROMETHEUS_PATH, StageMetrics
+from CG_parallel import WORKERS, map_chunks
+from CG_raw_data import SIDECAR_FILE, split_raw_data
+from CG_schema import COMPACT, MEMORY_BUDGET_MB, compact_frame, memory_report
+from CG_sku_store import SkuStore, default_store_path
+from CG_upload_state import DEFAULT_STATE_PATH, FULL_UPLOAD, UploadState
+from CG_title_cache import DEFAULT_CACHE_PATH, TitleClassificationCache, taxonomy_version, title_keys
+from CG_token_matrix import (TOKEN_FILE, TokenMatrix, TokenMatrixWriter, TokenSnapshot, load_token_matrix,
+                             tokenize_titles)
+from CG_title_model import (CATEGORY_TARGET, DEFAULT_MODEL_PATH, EXTRA_FIELD, MIN_TARGET_ACCURACY, MODEL_THRESHOLD,
+                            SUBCATEGORY_PREFIX, TITLE_MODEL_PATH, TitleModel, load_title_model)
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+LISTING_FILE = '00_CG_eBay_active_listing_data.csv'
+DB_FILE = '00_DB_eBay_active_listing_data.csv'
+# 업로드 파일은 항상 CSV
+UPLOAD_FILE = '06_CG_eBay_uploads_file'
+
+# --debug 옵션일 때 저장하는 중간 파일 (기존 단계별 스크립트와 같은 이름, CSV로 저장할 때의 인코딩)
+DEBUG_FILES = {
+    'cleaned': ('01_CG_eBay_active_listing_data_cleaned', 'utf-8-sig'),
+    'filtered': ('02_CG_eBay_active_listing_data_filtered', 'utf-8'),
+    'brand': ('03_CG_eBay_active_listing_data_filtered_with_brand', 'utf-8-sig'),
+    'categorized': ('04_CG_eBay_active_listing_data_categorized', 'utf-8-sig'),
+    'subcategorized': ('05_CG_eBay_active_listing_data_subcategorized', 'utf-8-sig'),
+}
+
+# 통합 실행에서 사용하는 단계별 스크립트
+STAGE_FILES = {
+    'prefix': '00_CG_delete_prefix.py',
+    'filtering': '00_CG_filtering.py',
+    'brand': '01_CG_parsing_brand.py',
+    'category': '02_CG_categorization.py',
+    'subcategory': '03_CG_subcategorization.py',
+    'upload': '04_CG_preprocessing_uploads_eBay.py',
+}
+
+
+def load_stage(file_name: str, stage_dir: str = SCRIPT_DIR):
+    """
+    숫자로 시작하는 단계별 스크립트(예: 02_CG_categorization.py)를 모듈로 로드
+
+    Args:
+        file_name: 스크립트 파일명
+        stage_dir: 스크립트가 있는 디렉토리
+
+    Returns:
+        로드된 모듈 객체
+    """
+    # 단계별 스크립트가 같은 폴더의 CG_ 공통 모듈을 import할 수 있도록
+    if stage_dir not in sys.path:
+        sys.path.insert(0, stage_dir)
+
+    module_name = 'cg_stage_' + os.path.splitext(file_name)[0]
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(stage_dir, file_name))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@lru_cache(maxsize=None)
+def load_stages() -> Dict[str, object]:
+    """
+    STAGE_FILES의 단계별 스크립트를 모두 로드 (프로세스당 한 번만, fork한 작업 프로세스는 그대로 사용)
+
+    Returns:
+        STAGE_FILES 이름 → 로드된 단계별 모듈
+    """
+    return {name: load_stage(file_name) for name, file_name in STAGE_FILES.items()}
+
+
+def classify_listings(df: pd.DataFrame, stages: Dict[str, object],
+                      title_cache: TitleClassificationCache = None, tokens: TokenMatrix = None):
+    """
+    병합까지 끝난 행에 brand / Category / Subcategory / Category_id 칼럼 추가 (01 ~ 04 단계)
+
+    Args:
+        df: filter_listings 결과
+        stages: STAGE_FILES 이름 → 로드된 단계별 모듈
+        title_cache: Title 분류 결과 캐시 (None이면 사용하지 않음)
+        tokens: df 순서의 Title 토큰 행렬 (None이면 토큰화)
+
+    Returns:
+        (칼럼이 추가된 DataFrame, brand 파싱 통계 - fallback / json_errors 행 수)
+    """
+    df, parse_stats = stages['brand'].add_brand_column(df)
+    df = classify_titles(df, stages, title_cache, tokens)
+    df = stages['upload'].assign_category_id(df)
+    return df, parse_stats
+
+
+def classify_titles(df: pd.DataFrame, stages: Dict[str, object],
+                    title_cache: TitleClassificationCache = None, tokens: TokenMatrix = None) -> pd.DataFrame:
+    """
+    Category / Subcategory 칼럼 추가 (02 ~ 03 단계)
+    title_cache가 있으면 캐시에 없는 제목만 분류하고 결과를 캐시에 저장
+
+    Args:
+        df: Title, brand 칼럼이 있는 DataFrame
+        stages: STAGE_FILES 이름 → 로드된 단계별 모듈
+        title_cache: Title 분류 결과 캐시 (None이면 전체 분류)
+        tokens: df 순서의 Title 토큰 행렬 (None이면 토큰화)
+    """
+    if title_cache is None:
+        # 청크의 Title은 한 번만 토큰화하고 카테고리 / 하위 카테고리 규칙에 함께 사용
+        tokens = tokenize_titles(df['Title']) if tokens is None else tokens
+        df['Category'] = stages['category'].categorize_titles(df['Title'], tokens)
+        df['Subcategory'] = stages['subcategory'].get_subcategories(df, tokens)
+        return df
+
+    keys = title_keys(df['Title'])
+    cached = title_cache.get_many(keys)
+
+    missing = ~keys.isin(cached.index)
+    if missing.any():
+        # 캐시에 없는 제목은 같은 제목끼리 한 번만 분류
+        new = df.loc[missing, ['Title', 'brand']].assign(key=keys[missing]).drop_duplicates('key')
+        if tokens is None:
+            tokens = tokenize_titles(new['Title'])
+        else:
+            # drop_duplicates와 같이 같은 제목의 첫 행
+            tokens = tokens.take(np.flatnonzero(missing.to_numpy())[~keys[missing].duplicated().to_numpy()])
+        new['Category'] = stages['category'].categorize_titles(new['Title'], tokens)
+        new['Subcategory'] = stages['subcategory'].get_subcategories(new, tokens)
+        # Watches 하위 카테고리는 brand 기준이므로 저장하지 않음
+        new.loc[new['Category'] == 'Watches', 'Subcategory'] = None
+        title_cache.put_many(new)
+        cached = pd.concat([cached, new.set_index('key')[['Category', 'Subcategory']]])
+
+    df['Category'] = keys.map(cached['Category']).to_numpy()
+    df['Subcategory'] = keys.map(cached['Subcategory']).to_numpy()
+    watches = (df['Category'] == 'Watches').to_numpy()
+    if watches.any():
+        df.loc[watches, 'Subcategory'] = stages['subcategory'].get_watch_subcategories(df.loc[watches, 'brand']).to_numpy()
+    return df
+
+
+def apply_title_model(df: pd.DataFrame, stages: Dict[str, object], model: TitleModel,
+                      threshold: float = MODEL_THRESHOLD) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """
+    키워드 규칙으로 Others인 행만 보조 분류 모델로 다시 분류 (확률이 threshold 이상인 경우만 변경)
+    Category가 바뀐 행은 하위 카테고리 규칙을 다시 적용하고, 그래도 Subcategory가 Others인 행은 모델로 분류
+
+    Args:
+        df: Title, brand, Category, Subcategory 칼럼이 있는 DataFrame
+        stages: STAGE_FILES 이름 → 로드된 단계별 모듈
+        model: load_title_model 결과
+
+    Returns:
+        (라벨이 바뀐 DataFrame, 모델로 바꾼 행 수 - category / subcategory)
+    """
+    default = stages['category'].TAXONOMY.default
+    extra = df[EXTRA_FIELD] if EXTRA_FIELD in df.columns else None
+    counts = {'category': 0, 'subcategory': 0}
+
+    def predict(target, mask):
+        labels, confidence = model.predict(target, df.loc[mask, 'Title'], None if extra is None else extra[mask])
+        accepted = np.zeros(len(df), dtype=bool)
+        accepted[np.flatnonzero(mask)[confidence >= threshold]] = True
+        return accepted, labels[confidence >= threshold]
+
+    others = (df['Category'] == default).to_numpy()
+    if CATEGORY_TARGET in model.targets and others.any():
+        accepted, labels = predict(CATEGORY_TARGET, others)
+        if accepted.any():
+            df.loc[accepted, 'Category'] = labels
+            df.loc[accepted, 'Subcategory'] = stages['subcategory'].get_subcategories(df[accepted]).to_numpy()
+            counts['category'] = int(accepted.sum())
+
+    for category in model.subcategory_targets:
+        others = ((df['Category'] == category) & (df['Subcategory'] == default)).to_numpy()
+        if others.any():
+            accepted, labels = predict(SUBCATEGORY_PREFIX + category, others)
+            df.loc[accepted, 'Subcategory'] = labels
+            counts['subcategory'] += int(accepted.sum())
+    return df, counts
+
+
+# 작업 프로세스마다 한 번 로드하는 단계별 모듈 (init_worker에서 설정)
+_worker_stages = None
+
+
+def init_worker(observed_brands: tuple = ()):
+    """
+    작업 프로세스 초기화 (단계별 모듈은 pickle할 수 없으므로 프로세스마다 로드)
+
+    Args:
+        observed_brands: Title 기반 brand 보완에 추가할 DB brand 값
+    """
+    global _worker_stages
+    _worker_stages = load_stages()
+    _worker_stages['brand'].set_observed_brands(observed_brands)
+
+
+def classify_worker(task):
+    """
+    작업 프로세스에서 실행하는 01 ~ 04 단계
+
+    Args:
+        task: (분류할 행, Title 분류 여부, 분류할 행의 Title 토큰 행렬) - Title 캐시를 쓰는 경우에는 brand만 추출하고
+              Title 분류는 캐시가 있는 메인 프로세스에서 처리
+
+    Returns:
+        (칼럼이 추가된 DataFrame, brand 파싱 통계 - fallback / json_errors / title_brands 행 수)
+    """
+    df, with_titles, tokens = task
+    if df.empty:
+        return df, {'fallback': 0, 'json_errors': 0, 'title_brands': 0}
+    if with_titles:
+        return classify_listings(df, _worker_stages, tokens=tokens)
+    return _worker_stages['brand'].add_brand_column(df)
+
+
+def prepare_chunk(chunk: pd.DataFrame, db_store: SkuStore, stages: Dict[str, object],
+                  previous_state: pd.DataFrame = None, token_snapshot: TokenSnapshot = None) -> Dict[str, object]:
+    """
+    메인 프로세스에서 처리하는 00 단계 (SKU 접두사 제거 + DB 병합)와 이전 상태 비교, Title 토큰 행렬 생성
+
+    Returns:
+        cleaned(접두사 제거 결과), merged(병합 결과), row_hash, unchanged(재사용 행 마스크), reused(재사용 결과),
+        tokens / title_keys(merged 순서의 토큰 행렬 / 제목 키), changed_tokens(다시 분류할 행의 토큰 행렬)
+    """
+    # 접두사는 source / margin_rate 칼럼으로 남기고 SKU에서 제거
+    chunk = stages['prefix'].add_source_columns(chunk)
+    # 청크에 있는 SKU의 DB 행만 조회해서 병합
+    df_db = db_store.fetch(chunk['Custom label (SKU)'])
+    df = stages['filtering'].filter_listings(chunk, df_db)
+    row_hash = incremental.hash_listing_rows(df)
+
+    if previous_state is None:
+        unchanged, reused = np.zeros(len(df), dtype=bool), None
+    else:
+        unchanged, reused = incremental.split_unchanged(df, row_hash, previous_state)
+
+    task = {'cleaned': chunk, 'merged': df, 'row_hash': row_hash, 'unchanged': unchanged, 'reused': reused,
+            'tokens': None, 'title_keys': None, 'changed_tokens': None}
+    if token_snapshot is not None:
+        # 이전 상태와 같은 행은 이전 토큰 파일에서 가져오고, 다시 분류할 행의 토큰은 분류에 그대로 사용
+        # (작업 프로세스로 보내는 행렬은 청크에 나온 token만 남긴 vocabulary로 줄임)
+        task['tokens'], task['title_keys'] = token_snapshot.update(df['Title'], df[incremental.KEY_COLUMN], unchanged)
+        task['changed_tokens'] = task['tokens'].take(np.flatnonzero(~unchanged)).compact()
+    return task
+
+
+def open_title_cache(cache_path: str, stages: Dict[str, object]) -> TitleClassificationCache:
+    """
+    현재 키워드 규칙의 taxonomy 버전으로 Title 캐시 열기
+    """
+    version = taxonomy_version(stages['category'].CATEGORY_KEYWORDS, stages['subcategory'].SUBCATEGORY_INDEX)
+    return TitleClassificationCache(cache_path, version)
+
+
+def run_pipeline(input_dir: str = SCRIPT_DIR,
+                 output_dir: str = None,
+                 chunk_size: int = 10000,
+                 debug: bool = False,
+                 debug_format: str = None,
+                 incremental_mode: bool = False,
+                 previous_state_path: str = None,
+                 title_cache_path: str = None,
+                 workers: int = None,
+                 max_in_flight: int = None,
+                 db_store_path: str = None,
+                 compact: bool = COMPACT,
+                 memory_budget_mb: float = MEMORY_BUDGET_MB,
+                 upload_state_path: str = DEFAULT_STATE_PATH,
+                 full_upload: bool = FULL_UPLOAD,
+                 metrics_path: str = METRICS_PATH,
+                 prometheus_path: str = PROMETHEUS_PATH,
+                 title_model_path: str = TITLE_MODEL_PATH,
+                 model_threshold: float = MODEL_THRESHOLD,
+                 model_min_accuracy: float = MIN_TARGET_ACCURACY) -> Dict[str, int]:
+    """
+    리스팅 파일을 청크 단위로 스트리밍하며 00 ~ 04 단계를 한 번에 처리
+
+    Args:
+        input_dir: 00_CG_ / 00_DB_ 입력 파일이 있는 디렉토리
+        output_dir: 결과 저장 디렉토리 (기본값: input_dir)
+        chunk_size: 한 번에 처리할 행 수
+        debug: True인 경우 중간 파일(01_ ~ 05_)도 저장
+        debug_format: 중간 파일 저장 형식 ('parquet' / 'csv', 기본값: CG_STAGE_FORMAT)
+        incremental_mode: True인 경우 이전 스냅샷 상태 파일로 바뀌지 않은 행의 분류 결과 재사용
+        previous_state_path: 이전 상태 파일 경로 (기본값: output_dir 이전 날짜 폴더에서 탐색)
+        title_cache_path: Title 분류 결과 캐시(SQLite) 경로 (None이면 캐시 사용 안 함)
+        workers: 01 ~ 04 단계 작업 프로세스 수 (None이면 CG_WORKERS, 1이면 병렬 처리 안 함)
+        max_in_flight: 동시에 처리 중인 청크 수 상한 (기본값: workers * 2)
+        db_store_path: DB 저장소(SQLite) 경로 (기본값: 00_DB 파일과 같은 위치의 .sqlite)
+        compact: 이전 상태를 압축 스키마(category / 정수)로 메모리에 올리기 (기본값: CG_COMPACT)
+        memory_budget_mb: 메모리 예산 (MB, 주면 칼럼별 메모리 사용량 보고, 기본값: CG_MEMORY_BUDGET_MB)
+        upload_state_path: 업로드 상태(SQLite) 경로 - 마지막으로 업로드가 확인된 이후 바뀐 행만 업로드 파일에 저장
+        full_upload: True인 경우 바뀌지 않은 행도 모두 업로드 파일에 저장 (기본값: CG_FULL_UPLOAD)
+        metrics_path: 성능 지표 JSONL 경로 (기본값: CG_METRICS, 없으면 기록 안 함)
+        prometheus_path: 성능 지표 Prometheus textfile 경로 (기본값: CG_METRICS_PROM)
+        title_model_path: 보조 분류 모델 경로 (None이면 키워드 규칙만 사용, 기본값: CG_TITLE_MODEL)
+        model_threshold: 보조 분류 모델 예측을 사용할 최소 확률 (기본값: CG_MODEL_THRESHOLD)
+        model_min_accuracy: 보조 분류 모델에서 사용할 타깃의 최소 holdout 정확도 (기본값: CG_MODEL_MIN_ACCURACY)
+
+    Returns:
+        처리 통계 (rows, uploads, chunks, brand_fallback, json_errors, title_brands, reused, model_category, model_subcategory)
+    """
+    output_dir = output_dir or input_dir
+
+    stages = load_stages()
+
+    listing_path = os.path.join(input_dir, LISTING_FILE)
+    db_path = os.path.join(input_dir, DB_FILE)
+
+    start_time = time.time()
+    metrics = StageMetrics('run_pipeline', metrics_path, prometheus_path)
+    metrics.read_file(listing_path)
+
+    db_store = SkuStore(db_store_path or default_store_path(db_path))
+    print(f"DB 저장소 적재 중: {db_path} → {db_store.path}")
+    sync_stats = db_store.sync(db_path)
+    if sync_stats['skipped']:
+        print(f"  변경 없음 (DB 행 수: {sync_stats['rows']:,})")
+    else:
+        print(f"  DB 행 수: {sync_stats['rows']:,} (저장: {sync_stats['written']:,}, 삭제: {sync_stats['deleted']:,})")
+        metrics.read_file(db_path)
+
+    # raw_data에 brand가 없는 행은 Title에서 브랜드명을 찾음 (별칭 파일 + DB에서 관찰된 brand 값)
+    observed_brands = select_observed_brands(db_store.observed_brands(stages['brand'].extract_brands))
+    stages['brand'].set_observed_brands(observed_brands)
+    print(f"Title 기반 brand 보완: DB brand {len(observed_brands):,}개")
+
+    title_model = None
+    model_version = ''
+    if title_model_path:
+        title_model = load_title_model(title_model_path)
+        used_model = title_model.select_targets(model_min_accuracy)
+        skipped = [name for name in title_model.targets if name not in used_model.targets]
+        print(f"보조 분류 모델 로드: {title_model_path} (타깃 {len(used_model.targets)}개, 임계값 {model_threshold})")
+        if skipped:
+            print(f"  holdout 정확도 {model_min_accuracy} 미만으로 사용하지 않는 타깃: {', '.join(skipped)}")
+        title_model = used_model
+        model_version = f"{incremental.file_digest(title_model_path)}/{model_threshold}/{model_min_accuracy}"
+
+    # 분류 규칙 버전: 이전 상태가 다른 규칙(보조 분류 모델, Title brand 보완용 DB brand 목록 포함)으로 만들어졌으면 재사용하지 않음
+    state_version = incremental.rules_version(stages['category'].TAXONOMY.version,
+                                              incremental.file_digest(BRAND_ALIASES_PATH), model_version,
+                                              incremental.rules_version(*observed_brands))
+
+    previous_state = None
+    if incremental_mode:
+        previous_state_path = previous_state_path or incremental.find_previous_state(output_dir)
+        if previous_state_path:
+            previous_state = incremental.load_state(previous_state_path, state_version)
+            print(f"이전 상태 로드: {previous_state_path} ({len(previous_state):,}개 행)")
+            if previous_state.empty:
+                print("  분류 규칙 버전이 달라(taxonomy / 브랜드 별칭 / 보조 분류 모델 / DB brand 목록) 전체 행을 다시 분류합니다.")
+            # 상태는 전체 카탈로그 크기이므로 압축 스키마로 메모리에 올림
+            if compact:
+                previous_state = compact_frame(previous_state)
+            if compact or memory_budget_mb is not None:
+                memory_report(previous_state, '이전 상태', memory_budget_mb)
+        else:
+            print("이전 상태 파일이 없어 전체 행을 분류합니다.")
+
+    # 토큰 파일도 항상 저장해 두어 다음 날짜 폴더에서 --incremental로 재사용
+    previous_tokens = None
+    if previous_state is not None and not previous_state.empty:
+        # 이전 상태와 같은 폴더의 토큰 파일 (이전 상태와 같은 행은 그 스냅샷과 Title도 같음)
+        previous_tokens_path = os.path.join(os.path.dirname(previous_state_path), TOKEN_FILE + '.parquet')
+        if os.path.exists(previous_tokens_path):
+            previous_tokens = load_token_matrix(previous_tokens_path)
+            print(f"이전 토큰 파일 로드: {previous_tokens_path} ({len(previous_tokens[0]):,}개 행, "
+                  f"token {len(previous_tokens[0].vocabulary):,}개)")
+    token_snapshot = TokenSnapshot(previous_tokens)
+    token_writer = TokenMatrixWriter(os.path.join(output_dir, TOKEN_FILE))
+
+    title_cache = open_title_cache(title_cache_path, stages) if title_cache_path else None
+    upload_writer = StageWriter(os.path.join(output_dir, UPLOAD_FILE), encoding='utf-8', fmt='csv')
+    upload_state = UploadState(upload_state_path, full_upload)
+    # 상태 파일은 항상 저장해 두어 다음 날짜 폴더에서 --incremental로 재사용
+    state_writer = StageWriter(os.path.join(output_dir, incremental.STATE_FILE), fmt='parquet')
+    debug_writers = {}
+    if debug:
+        for key, (file_name, encoding) in DEBUG_FILES.items():
+            debug_writers[key] = StageWriter(os.path.join(output_dir, file_name), encoding, debug_format)
+        # 중간 파일에는 raw_data 대신 raw_data_ref만 저장하고 raw_data는 사이드카(Parquet)에 저장
+        debug_writers['raw_data'] = StageWriter(os.path.join(output_dir, SIDECAR_FILE), fmt='parquet')
+
+    def save_debug(key, frame):
+        # 중간 파일은 debug 모드에서만 저장
+        if key in debug_writers:
+            debug_writers[key].write(frame)
+
+    stats = {'rows': 0, 'uploads': 0, 'chunks': 0, 'brand_fallback': 0, 'json_errors': 0, 'title_brands': 0,
+             'reused': 0, 'model_category': 0, 'model_subcategory': 0}
+    category_counts = pd.Series(dtype='int64')
+
+    try:
+        print(f"리스팅 파일 처리 시작: {listing_path}")
+        chunks = pd.read_csv(listing_path, chunksize=chunk_size, dtype=str, encoding='utf-8-sig')
+        tasks = (prepare_chunk(chunk, db_store, stages, previous_state, token_snapshot) for chunk in chunks)
+        # 바뀐 행만 작업 프로세스로 보내고, 결과는 청크 순서대로 받음
+        results = map_chunks(classify_worker, tasks, workers, max_in_flight,
+                             payload=lambda task: (task['merged'][~task['unchanged']].reset_index(drop=True),
+                                                   title_cache is None, task['changed_tokens']),
+                             initializer=init_worker, initargs=(observed_brands,))
+        results = metrics.track(results, rows=lambda result: len(result[0]['merged']))
+        for chunk_num, (task, (changed, parse_stats)) in enumerate(results, 1):
+            save_debug('cleaned', task['cleaned'])
+            df = task['merged']
+            if debug:
+                debug_df, raw_data_rows = split_raw_data(df, offset=debug_writers['raw_data'].rows)
+                save_debug('raw_data', raw_data_rows)
+                save_debug('filtered', debug_df)
+            row_hash = task['row_hash']
+            unchanged = task['unchanged']
+            reused_count = int(unchanged.sum())
+
+            # Title 캐시를 쓰는 경우 02 ~ 04 단계는 메인 프로세스에서 처리
+            if title_cache is not None and len(changed) > 0:
+                changed = classify_titles(changed, stages, title_cache, task['changed_tokens'])
+                changed = stages['upload'].assign_category_id(changed)
+
+            # 키워드 규칙으로 Others인 행은 보조 분류 모델로 다시 분류하고 Category_id도 다시 지정
+            if title_model is not None and len(changed) > 0:
+                changed, model_counts = apply_title_model(changed, stages, title_model, model_threshold)
+                if model_counts['category'] or model_counts['subcategory']:
+                    changed = stages['upload'].assign_category_id(changed)
+                stats['model_category'] += model_counts['category']
+                stats['model_subcategory'] += model_counts['subcategory']
+
+            # 새로 분류한 행과 이전 상태에서 재사용한 행을 원래 순서로 합치기
+            if reused_count == 0:
+                changed.index = df.index
+                df = changed
+            else:
+                parts = [df[unchanged].join(task['reused'])]
+                if reused_count < len(df):
+                    changed.index = df.index[~unchanged]
+                    parts.append(changed)
+                df = pd.concat(parts).loc[df.index]
+
+            if debug:
+                for key, columns in [('brand', ['brand', 'brand_source']), ('categorized', ['Category']),
+                                     ('subcategorized', ['Subcategory'])]:
+                    for column in columns:
+                        debug_df[column] = df[column].to_numpy()
+                    save_debug(key, debug_df)
+
+            # 업로드 파일 생성 + 상태 저장
+            df_upload = upload_state.select_delta(stages['upload'].build_upload_frame(df))
+            upload_writer.write(df_upload)
+            state_writer.write(incremental.build_state_frame(df, row_hash, state_version))
+            token_writer.write(task['tokens'], df[incremental.KEY_COLUMN], task['title_keys'])
+
+            stats['chunks'] = chunk_num
+            stats['rows'] += len(df)
+            stats['uploads'] += len(df_upload)
+            stats['brand_fallback'] += parse_stats['fallback']
+            stats['json_errors'] += parse_stats['json_errors']
+            stats['title_brands'] += parse_stats['title_brands']
+            stats['reused'] += reused_count
+            category_counts = category_counts.add(df['Category'].value_counts(), fill_value=0)
+            metrics.add_distribution(df['Category'])
+            metrics.add_distribution(df['Category'].astype(str) + '/' + df['Subcategory'].astype(str), 'Subcategory')
+
+            print(f"  청크 {chunk_num} 처리 완료 (행 수: {len(df)}, 재사용: {reused_count}, 누적: {stats['rows']})")
+    finally:
+        upload_writer.close()
+        upload_state.close()
+        state_writer.close()
+        token_writer.close(token_snapshot.vocabulary)
+        db_store.close()
+        if title_cache is not None:
+            cache_stats = title_cache.stats()
+            title_cache.close()
+        for writer in debug_writers.values():
+            writer.close()
+
+    elapsed = time.time() - start_time
+
+    for writer in [upload_writer, state_writer, token_writer] + list(debug_writers.values()):
+        metrics.wrote_file(writer.path)
+    metrics.add(rows_out=stats['uploads'], json_parse_failures=stats['json_errors'])
+    metrics.finish(brand_fallback=stats['brand_fallback'], brand_from_title=stats['title_brands'], reused=stats['reused'],
+                   tokens_reused=token_snapshot.reused, tokens_tokenized=token_snapshot.tokenized,
+                   model_category=stats['model_category'], model_subcategory=stats['model_subcategory'],
+                   upload_new=upload_state.counts['new'], upload_changed=upload_state.counts['changed'])
+
+    print(f"\n=== 완료 ===")
+    print(f"총 행 수: {stats['rows']:,}")
+    if incremental_mode:
+        print(f"재사용 행 수: {stats['reused']:,} (다시 분류: {stats['rows'] - stats['reused']:,})")
+    print(f"Title 토큰 행렬: 토큰화 {token_snapshot.tokenized:,}행, 이전 토큰 파일에서 재사용 {token_snapshot.reused:,}행 "
+          f"(token {len(token_snapshot.vocabulary):,}개)")
+    if title_cache is not None:
+        print(f"Title 캐시: hit {cache_stats['hits']:,} / miss {cache_stats['misses']:,} (저장된 제목 {cache_stats['entries']:,}개)")
+    if title_model is not None:
+        print(f"보조 분류 모델로 바꾼 행 수: Category {stats['model_category']:,}, Subcategory {stats['model_subcategory']:,}")
+    print(f"업로드 행 수: {stats['uploads']:,} ({upload_state.summary()})")
+    print(f"brand 느린 경로(json.loads) 행 수: {stats['brand_fallback']:,} (JSON 파싱 실패: {stats['json_errors']:,})")
+    print(f"Title에서 찾은 brand 행 수: {stats['title_brands']:,}")
+    print(f"소요 시간: {elapsed:.1f}초")
+    print(f"\n=== 카테고리 분포 ===")
+    for category, count in category_counts.sort_values(ascending=False).items():
+        percentage = (count / stats['rows']) * 100 if stats['rows'] else 0
+        print(f"  {category}: {int(count)}개 ({percentage:.2f}%)")
+    print(f"\n파일 저장 완료: {upload_writer.path}")
+
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Categorization 00 ~ 04 단계 통합 실행')
+    parser.add_argument('--input-dir', default=SCRIPT_DIR, help='입력 파일 디렉토리 (기본값: 스크립트 위치)')
+    parser.add_argument('--output-dir', default=None, help='결과 저장 디렉토리 (기본값: 입력 디렉토리)')
+    parser.add_argument('--chunk-size', type=int, default=10000, help='청크 크기')
+    parser.add_argument('--debug', action='store_true', help='중간 파일(01_ ~ 05_) 저장')
+    parser.add_argument('--format', choices=STAGE_FORMATS, default=None, help='중간 파일 저장 형식 (기본값: parquet)')
+    parser.add_argument('--incremental', action='store_true', help='이전 날짜 폴더의 상태 파일로 바뀌지 않은 행 재사용')
+    parser.add_argument('--previous-state', default=None, help='이전 상태 파일 경로 (기본값: 이전 날짜 폴더에서 탐색)')
+    parser.add_argument('--title-cache', nargs='?', const=DEFAULT_CACHE_PATH, default=None,
+                        help=f'Title 분류 결과 캐시 사용 (경로 생략 시 {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--workers', type=int, default=WORKERS, help='01 ~ 04 단계 작업 프로세스 수 (기본값: CG_WORKERS 또는 1)')
+    parser.add_argument('--max-in-flight', type=int, default=None, help='동시에 처리 중인 청크 수 상한 (기본값: workers * 2)')
+    parser.add_argument('--db-store', default=None, help='DB 저장소(SQLite) 경로 (기본값: 00_DB 파일과 같은 위치의 .sqlite)')
+    parser.add_argument('--compact', action='store_true', default=COMPACT,
+                        help='압축 스키마(category / 정수) 사용 (기본값: CG_COMPACT)')
+    parser.add_argument('--memory-budget', type=float, default=MEMORY_BUDGET_MB,
+                        help='메모리 예산 MB, 칼럼별 메모리 사용량 보고 (기본값: CG_MEMORY_BUDGET_MB)')
+    parser.add_argument('--upload-state', default=DEFAULT_STATE_PATH, help=f'업로드 상태 경로 (기본값: {DEFAULT_STATE_PATH})')
+    parser.add_argument('--full-upload', action='store_true', default=FULL_UPLOAD,
+                        help='바뀌지 않은 행도 모두 업로드 파일에 저장 (기본값: CG_FULL_UPLOAD)')
+    parser.add_argument('--metrics', default=METRICS_PATH, help='성능 지표 JSONL 경로 (기본값: CG_METRICS)')
+    parser.add_argument('--metrics-prom', default=PROMETHEUS_PATH,
+                        help='성능 지표 Prometheus textfile 경로 (기본값: CG_METRICS_PROM)')
+    parser.add_argument('--title-model', nargs='?', const=DEFAULT_MODEL_PATH, default=TITLE_MODEL_PATH,
+                        help=f'Others 행 보조 분류 모델 사용 (경로 생략 시 {DEFAULT_MODEL_PATH}, 기본값: CG_TITLE_MODEL)')
+    parser.add_argument('--model-threshold', type=float, default=MODEL_THRESHOLD,
+                        help='보조 분류 모델 예측을 사용할 최소 확률 (기본값: CG_MODEL_THRESHOLD 또는 0.8)')
+    parser.add_argument('--model-min-accuracy', type=float, default=MIN_TARGET_ACCURACY,
+                        help='보조 분류 모델에서 사용할 타깃의 최소 holdout 정확도 (기본값: CG_MODEL_MIN_ACCURACY 또는 0.8)')
+    args = parser.parse_args()
+
+    run_pipeline(args.input_dir, args.output_dir, args.chunk_size, args.debug, args.format,
+                 args.incremental, args.previous_state, args.title_cache, args.workers, args.max_in_flight,
+                 args.db_store, args.compact, args.memory_budget, args.upload_state, args.full_upload,
+                 args.metrics, args.metrics_prom, args.title_model, args.model_threshold,
+                 args.model_min_accuracy)
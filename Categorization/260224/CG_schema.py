@@ -0,0 +1,98 @@
+"""
+리스팅 DataFrame 압축 스키마 / 메모리 사용량 보고 모듈
+Category / Subcategory / brand처럼 같은 문자열이 반복되는 칼럼은 category(사전 인코딩),
+Item number / Category_id는 정수, Title은 Arrow 문자열로 바꿔서 날짜별 전체 스냅샷을 메모리에 올릴 수 있게 함
+
+CG_COMPACT=1 환경변수(또는 실행 옵션)로 압축 스키마 사용,
+CG_MEMORY_BUDGET_MB 환경변수(또는 실행 옵션)로 메모리 예산을 주면 칼럼별 메모리 사용량 보고
+"""
+
+import os
+from typing import List, Optional
+
+import pandas as pd
+
+COMPACT = os.environ.get('CG_COMPACT', '0') == '1'
+MEMORY_BUDGET_MB = float(os.environ['CG_MEMORY_BUDGET_MB']) if os.environ.get('CG_MEMORY_BUDGET_MB') else None
+
+CATEGORY_COLUMNS = ['Category', 'Subcategory', 'brand']
+INTEGER_COLUMNS = ['Item number', 'Category_id']
+ARROW_STRING_COLUMNS = ['Title']
+
+
+def _to_integer(values: pd.Series) -> pd.Series:
+    """
+    정수 칼럼으로 변환 (빈 값이 있으면 Int64, 숫자가 아닌 값이 있으면 그대로 둠)
+    """
+    numbers = pd.to_numeric(values, errors='coerce')
+    if numbers.isna().sum() != values.isna().sum():
+        return values
+    if numbers.isna().any():
+        return numbers.astype('Int64')
+    return numbers.astype('int64')
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    리스팅 DataFrame을 압축 스키마로 변환 (있는 칼럼만 변환)
+    """
+    df = df.copy()
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    for column in INTEGER_COLUMNS:
+        if column in df.columns:
+            df[column] = _to_integer(df[column])
+    for column in ARROW_STRING_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('string[pyarrow]')
+    return df
+
+
+def concat_frames(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    청크 DataFrame 합치기 (청크마다 category 값 목록이 달라도 category 칼럼 유지)
+
+    pd.concat은 category 값 목록이 다르면 object로 바꾸므로 값 목록을 합친 뒤 concat
+    """
+    if not frames:
+        return pd.DataFrame()
+
+    frames = list(frames)
+    for column in frames[0].columns:
+        if not isinstance(frames[0][column].dtype, pd.CategoricalDtype):
+            continue
+        categories = pd.Index([])
+        for frame in frames:
+            categories = categories.union(frame[column].cat.categories, sort=False)
+        frames = [frame.assign(**{column: frame[column].cat.set_categories(categories)}) for frame in frames]
+    return pd.concat(frames, ignore_index=True)
+
+
+def memory_report(df: pd.DataFrame, name: str = 'DataFrame', budget_mb: Optional[float] = None) -> int:
+    """
+    칼럼별 메모리 사용량 출력
+
+    Args:
+        df: 확인할 DataFrame
+        name: 출력에 표시할 이름
+        budget_mb: 메모리 예산 (MB, 넘으면 경고 출력)
+
+    Returns:
+        전체 메모리 사용량 (bytes)
+    """
+    usage = df.memory_usage(deep=True, index=True)
+    total = int(usage.sum())
+
+    print(f"\n=== 메모리 사용량: {name} ({len(df):,}개 행) ===")
+    for column, size in usage.items():
+        dtype = df[column].dtype if column in df.columns else 'index'
+        print(f"  {column} ({dtype}): {size:,} bytes")
+    print(f"  합계: {total:,} bytes ({total / 1024 / 1024:.1f} MB)")
+
+    if budget_mb is not None:
+        if total > budget_mb * 1024 * 1024:
+            print(f"  ⚠ 메모리 예산 {budget_mb:,.1f} MB 초과")
+        else:
+            print(f"  메모리 예산 {budget_mb:,.1f} MB 이내")
+    return total
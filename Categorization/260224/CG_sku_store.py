@@ -0,0 +1,205 @@
+"""
+DB 덤프(00_DB_eBay_active_listing_data.csv) 인덱스 저장소 (SQLite)
+DB 덤프는 활성 리스팅보다 훨씬 크므로 전체를 pandas로 읽지 않고 origin_id 인덱스가 있는 SQLite에 저장한 뒤,
+리스팅에 있는 SKU의 행만 조회해서 병합 (00_CG_filtering.py / CG_run_pipeline.py에서 사용)
+
+- 덤프 파일 크기 / 수정 시각이 같으면 다시 적재하지 않음
+- 덤프가 바뀌면 청크 단위로 읽으면서 raw_data 해시가 바뀐 행만 저장하고, 덤프에서 사라진 행은 삭제
+- 같은 origin_id가 여러 번 나오면 모두 저장 (기존 pd.merge와 같은 결과)
+- DB raw_data의 brand 값별 행 수는 덤프가 바뀌었을 때만 다시 집계해서 meta에 저장 (Title 기반 brand 보완에서 사용)
+"""
+
+import json
+import os
+import sqlite3
+from typing import Callable, Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+# SQLite 한 쿼리의 바인딩 변수 수 제한보다 작게
+QUERY_BATCH_SIZE = 900
+
+
+def default_store_path(db_path: str) -> str:
+    """
+    DB 덤프와 같은 위치의 저장소 경로 (예: 00_DB_eBay_active_listing_data.sqlite)
+    """
+    return os.path.splitext(db_path)[0] + '.sqlite'
+
+
+def hash_raw_data(raw_data: pd.Series) -> np.ndarray:
+    """
+    raw_data 행별 64비트 해시 (SQLite INTEGER에 저장하도록 int64로 변환)
+    """
+    return pd.util.hash_pandas_object(raw_data.fillna(''), index=False).to_numpy().view('int64')
+
+
+class SkuStore:
+    """
+    origin_id 인덱스가 있는 DB 덤프 저장소
+
+    사용 예:
+        store = SkuStore(default_store_path(db_path))
+        store.sync(db_path)
+        df_db = store.fetch(df_cg['Custom label (SKU)'])
+        store.close()
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)')
+        # occurrence: 덤프 안에서 같은 origin_id가 몇 번째로 나온 행인지 (0부터)
+        self._conn.execute('CREATE TABLE IF NOT EXISTS db_rows ('
+                           'origin_id TEXT NOT NULL, occurrence INTEGER NOT NULL, '
+                           'raw_data TEXT, row_hash INTEGER NOT NULL, '
+                           'PRIMARY KEY (origin_id, occurrence))')
+        self._conn.commit()
+
+    def _get_meta(self, name: str):
+        row = self._conn.execute('SELECT value FROM meta WHERE name = ?', (name,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, name: str, value):
+        self._conn.execute('INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)', (name, str(value)))
+
+    @staticmethod
+    def _batches(values: List[str]) -> Iterable[List[str]]:
+        for start in range(0, len(values), QUERY_BATCH_SIZE):
+            yield values[start:start + QUERY_BATCH_SIZE]
+
+    def row_count(self) -> int:
+        return self._conn.execute('SELECT COUNT(*) FROM db_rows').fetchone()[0]
+
+    def sync(self, db_path: str, chunk_size: int = 50000, force: bool = False) -> Dict[str, int]:
+        """
+        DB 덤프를 저장소에 반영 (바뀐 행만 저장)
+
+        Args:
+            db_path: 00_DB 파일 경로
+            chunk_size: 한 번에 읽을 행 수
+            force: True인 경우 덤프가 바뀌지 않았어도 다시 비교
+
+        Returns:
+            적재 통계 (rows, written, deleted, skipped)
+        """
+        stat = os.stat(db_path)
+        fingerprint = f'{os.path.abspath(db_path)}:{stat.st_size}:{stat.st_mtime_ns}'
+        if not force and self._get_meta('fingerprint') == fingerprint:
+            return {'rows': self.row_count(), 'written': 0, 'deleted': 0, 'skipped': 1}
+
+        stats = {'rows': 0, 'written': 0, 'deleted': 0, 'skipped': 0}
+        occurrences = {}
+
+        self._conn.execute('CREATE TEMP TABLE IF NOT EXISTS seen (origin_id TEXT, occurrence INTEGER, '
+                           'PRIMARY KEY (origin_id, occurrence))')
+        self._conn.execute('DELETE FROM seen')
+
+        for chunk in pd.read_csv(db_path, chunksize=chunk_size, dtype=str, usecols=['origin_id', 'raw_data']):
+            # origin_id가 비어 있는 행은 병합되지 않으므로 저장하지 않음
+            chunk = chunk[chunk['origin_id'].notna()]
+            if chunk.empty:
+                continue
+
+            origin_ids = chunk['origin_id'].tolist()
+            occurrence = (chunk.groupby('origin_id', sort=False).cumcount()
+                          + chunk['origin_id'].map(occurrences).fillna(0).astype('int64')).tolist()
+            for origin_id, count in chunk['origin_id'].value_counts().items():
+                occurrences[origin_id] = occurrences.get(origin_id, 0) + count
+            row_hash = hash_raw_data(chunk['raw_data']).tolist()
+            raw_data = chunk['raw_data'].astype(object).where(chunk['raw_data'].notna(), None).tolist()
+
+            # 이미 저장된 해시와 비교해서 바뀐 행만 저장
+            stored = {}
+            for batch in self._batches(list(dict.fromkeys(origin_ids))):
+                placeholders = ','.join('?' * len(batch))
+                for origin_id, occ, stored_hash in self._conn.execute(
+                        f'SELECT origin_id, occurrence, row_hash FROM db_rows WHERE origin_id IN ({placeholders})',
+                        batch):
+                    stored[(origin_id, occ)] = stored_hash
+
+            changed = [(origin_id, occ, raw, h)
+                       for origin_id, occ, raw, h in zip(origin_ids, occurrence, raw_data, row_hash)
+                       if stored.get((origin_id, occ)) != h]
+            self._conn.executemany('INSERT OR REPLACE INTO db_rows (origin_id, occurrence, raw_data, row_hash) '
+                                   'VALUES (?, ?, ?, ?)', changed)
+            self._conn.executemany('INSERT INTO seen (origin_id, occurrence) VALUES (?, ?)',
+                                   zip(origin_ids, occurrence))
+
+            stats['rows'] += len(chunk)
+            stats['written'] += len(changed)
+
+        # 덤프에서 사라진 행 삭제
+        cursor = self._conn.execute('DELETE FROM db_rows WHERE NOT EXISTS (SELECT 1 FROM seen '
+                                    'WHERE seen.origin_id = db_rows.origin_id '
+                                    'AND seen.occurrence = db_rows.occurrence)')
+        stats['deleted'] = cursor.rowcount
+        self._conn.execute('DELETE FROM seen')
+
+        self._set_meta('fingerprint', fingerprint)
+        self._conn.commit()
+        return stats
+
+    def fetch(self, skus: pd.Series) -> pd.DataFrame:
+        """
+        SKU 칼럼에 있는 origin_id의 행만 조회 (같은 origin_id는 덤프에 나온 순서대로)
+
+        Args:
+            skus: 접두사가 제거된 'Custom label (SKU)' 칼럼
+
+        Returns:
+            origin_id, raw_data 칼럼 DataFrame (빈 raw_data는 NaN)
+        """
+        unique_skus = [sku for sku in skus.dropna().unique().tolist() if sku != '']
+
+        rows = []
+        for batch in self._batches(unique_skus):
+            placeholders = ','.join('?' * len(batch))
+            rows.extend(self._conn.execute(
+                f'SELECT origin_id, occurrence, raw_data FROM db_rows WHERE origin_id IN ({placeholders})',
+                batch).fetchall())
+
+        df_db = pd.DataFrame(rows, columns=['origin_id', 'occurrence', 'raw_data'])
+        df_db = df_db.sort_values(['origin_id', 'occurrence'], kind='stable').drop(columns='occurrence')
+        df_db['raw_data'] = df_db['raw_data'].astype(object).where(df_db['raw_data'].notna())
+        return df_db.reset_index(drop=True)
+
+    def observed_brands(self, extract_brands: Callable, chunk_size: int = 50000) -> pd.Series:
+        """
+        저장된 raw_data 전체의 brand 값별 행 수 (같은 덤프는 한 번만 집계)
+
+        Args:
+            extract_brands: raw_data 칼럼 → (brand 칼럼, 파싱 통계) 함수 (01_CG_parsing_brand.extract_brands)
+            chunk_size: 한 번에 읽을 행 수
+
+        Returns:
+            brand 값 → 행 수 (빈 brand 제외)
+        """
+        fingerprint = self._get_meta('fingerprint')
+        cached = self._get_meta('observed_brands')
+        if cached is not None:
+            cached = json.loads(cached)
+            if cached['fingerprint'] == fingerprint:
+                return pd.Series(cached['brands'], dtype='int64')
+
+        counts = pd.Series(dtype='int64')
+        cursor = self._conn.execute('SELECT raw_data FROM db_rows')
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            brands, _ = extract_brands(pd.Series([row[0] for row in rows], dtype=object))
+            brands = brands.str.strip()
+            counts = counts.add(brands[brands != ''].value_counts(), fill_value=0)
+
+        counts = counts.astype('int64')
+        self._set_meta('observed_brands', json.dumps({'fingerprint': fingerprint, 'brands': counts.to_dict()},
+                                                     ensure_ascii=False))
+        self._conn.commit()
+        return counts
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,56 @@
+"""
+소싱 채널(source)별 마진율 모듈
+SKU 접두사('koibito:123'의 koibito)로 구한 source 칼럼을 마진율 표(CG_source_margins.json)와 한 번에 매칭
+(Promotion/EBAY_가격계산_공식.md의 pricing.yml > automizer.source-margin-map과 같은 값)
+
+- 표에 없는 source / 접두사가 없는 SKU는 기본 마진율(default_margin_rate)
+- source는 category 칼럼이므로 마진율은 category별로 한 번만 찾고 행에는 코드로 펼침
+
+다른 마진율 파일을 쓰려면 CG_SOURCE_MARGINS 환경변수에 경로 지정
+"""
+
+import json
+import os
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_MARGINS_PATH = os.environ.get('CG_SOURCE_MARGINS', os.path.join(SCRIPT_DIR, 'CG_source_margins.json'))
+
+SourceMargins = namedtuple('SourceMargins', [
+    'default',      # 기본 마진율
+    'rates',        # source → 마진율 Series
+])
+
+
+@lru_cache(maxsize=None)
+def load_source_margins(path: str = SOURCE_MARGINS_PATH) -> SourceMargins:
+    """
+    마진율 파일 읽기 (같은 경로는 프로세스당 한 번만)
+    """
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+    rates = pd.Series(config['source_margin_map'], dtype='float64')
+    rates.index = rates.index.str.lower()
+    return SourceMargins(default=float(config['default_margin_rate']), rates=rates)
+
+
+def margin_rates(source: pd.Series, margins: SourceMargins = None) -> np.ndarray:
+    """
+    source 칼럼 전체의 마진율
+
+    Args:
+        source: 소싱 채널 칼럼 (category, 빈 값은 NaN)
+        margins: 마진율 표 (기본값: load_source_margins())
+
+    Returns:
+        행별 마진율 (float64)
+    """
+    margins = margins or load_source_margins()
+    source = source.astype('category')
+    # category별 마진율을 먼저 구하고, 코드 -1(NaN)은 마지막에 붙인 기본 마진율
+    category_rates = margins.rates.reindex(source.cat.categories).fillna(margins.default).to_numpy()
+    return np.append(category_rates, margins.default)[source.cat.codes.to_numpy()]
@@ -0,0 +1,349 @@
+"""
+단계별 스크립트 결과 캐시 모듈
+입력 파일 내용, 코드(단계 스크립트 + 불러온 CG_ 모듈), 설정 파일(taxonomy / 브랜드 별칭 / 마진율), 저장 형식이
+이전 실행과 같으면 단계를 다시 실행하지 않고 저장해 둔 결과 파일을 그대로 사용
+
+- 매니페스트: 위 값들의 해시(키) → 출력 파일별 내용 해시 (manifests/<키>.json)
+- 출력 파일은 내용 해시 이름으로 한 번만 저장 (objects/<해시>, 날짜 폴더가 달라도 같은 내용이면 공유)
+  같은 파일 시스템이면 하드 링크로 저장 / 복원 (복사 없음, 안 되면 복사)
+- 재실행 시 키가 같은 매니페스트가 있으면 출력 파일을 확인해서 다르거나 없으면 저장된 내용으로 교체하고 건너뜀
+- 단계를 실행할 때는 캐시와 하드 링크된 출력 파일의 링크를 먼저 끊음 (같은 파일에 덮어써서 캐시가 바뀌지 않도록)
+- 저장할 때마다 단계별로 최근에 저장 / 사용한 매니페스트 CG_STAGE_CACHE_KEEP개(기본값 3)만 남기고,
+  남은 매니페스트가 참조하지 않는 출력 파일은 삭제
+- 파일 해시는 (경로, 크기, 수정 시각)이 같으면 다시 계산하지 않음 (hashes.json)
+- 04_ 단계는 업로드 상태(CG_upload_state.sqlite)에 따라 결과가 달라지므로 캐시하지 않음
+
+캐시 위치는 CG_STAGE_CACHE 환경변수로 지정 ('off'이면 사용 안 함, 디렉토리는 지워도 다음 실행에서 다시 만듦)
+캐시를 무시하고 다시 실행하려면 --force 옵션 또는 CG_FORCE=1
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from CG_io import STAGE_FORMAT, find_stage_file
+from CG_title_cache import DEFAULT_CACHE_PATH, STAGE_CACHE_PATH
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+# 날짜 폴더 밖에서 공유하는 모듈 / 설정 파일 (CG_brand_index.py, CG_brand_aliases.json)
+COMMON_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), 'common')
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), '.cg_stage_cache')
+CACHE_DIR = os.environ.get('CG_STAGE_CACHE') or DEFAULT_CACHE_DIR
+FORCE = os.environ.get('CG_FORCE', '0') == '1'
+# 단계별로 남겨 둘 매니페스트 수 (최근에 저장 / 사용한 순)
+KEEP_MANIFESTS = int(os.environ.get('CG_STAGE_CACHE_KEEP', '3'))
+
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def parse_stage_args(description: str, title_cache: bool = False) -> argparse.Namespace:
+    """
+    단계별 스크립트 공통 실행 옵션 (--force, title_cache=True이면 --title-cache)
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--force', action='store_true', default=FORCE,
+                        help='입력 / 코드가 바뀌지 않았어도 다시 실행 (기본값: CG_FORCE)')
+    if title_cache:
+        parser.add_argument('--title-cache', nargs='?', const=DEFAULT_CACHE_PATH, default=STAGE_CACHE_PATH,
+                            help=f'Title 분류 결과 캐시 사용 (기본값: CG_TITLE_CACHE, 경로 생략 시 {DEFAULT_CACHE_PATH})')
+    return parser.parse_args()
+
+
+def _replace_file(src_path: str, dst_path: str):
+    # 복사 도중의 파일이 보이지 않도록 임시 경로에 만든 뒤 이름을 바꿈
+    # 같은 파일 시스템이면 하드 링크, 안 되면(다른 드라이브, 하드 링크를 지원하지 않는 파일 시스템) 복사
+    if os.path.exists(dst_path) and os.path.samefile(src_path, dst_path):
+        return
+    temp_path = f'{dst_path}.{os.getpid()}.tmp'
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+    try:
+        os.link(src_path, temp_path)
+    except OSError:
+        shutil.copyfile(src_path, temp_path)
+    os.replace(temp_path, dst_path)
+
+
+def _remove_quietly(path: str) -> bool:
+    try:
+        os.remove(path)
+        return True
+    except OSError:
+        return False
+
+
+def _write_json(path: str, data: dict):
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+
+
+class StageCache:
+    """
+    단계 하나의 결과 캐시
+
+    사용 예:
+        cache = StageCache('02_categorization', inputs=[input_file], outputs=[output_file], force=args.force)
+        if cache.restore():
+            return
+        ... 단계 실행 ...
+        cache.save()
+    """
+
+    def __init__(self, stage: str, inputs: List[str], outputs: List[str], force: bool = FORCE,
+                 cache_dir: Optional[str] = CACHE_DIR, optional_inputs: List[str] = ()):
+        """
+        Args:
+            stage: 단계 이름
+            inputs: 입력 파일 경로 (중간 파일은 확장자 없는 경로 가능, 없으면 캐시를 사용하지 않음)
+            outputs: 출력 파일 경로 (확장자 없는 경로면 현재 저장 형식의 파일)
+            force: True인 경우 캐시를 사용하지 않고 실행 (실행 결과는 저장)
+            cache_dir: 캐시 디렉토리 (None 또는 'off'이면 캐시 사용 안 함)
+            optional_inputs: 없을 수도 있는 입력 파일 경로 (예: raw_data 사이드카, 있고 없음도 키에 포함)
+        """
+        self.stage = stage
+        self.inputs = inputs
+        self.optional_inputs = optional_inputs
+        self.outputs = outputs
+        self.force = force
+        self.enabled = bool(cache_dir) and cache_dir != 'off'
+        self.cache_dir = cache_dir
+        self.key = None
+        if not self.enabled:
+            return
+
+        os.makedirs(os.path.join(cache_dir, 'objects'), exist_ok=True)
+        os.makedirs(os.path.join(cache_dir, 'manifests'), exist_ok=True)
+        self._hashes_path = os.path.join(cache_dir, 'hashes.json')
+        self._hashes = self._load_hashes()
+
+    def _load_hashes(self) -> Dict[str, str]:
+        try:
+            with open(self._hashes_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _fingerprint(path: str) -> str:
+        stat = os.stat(path)
+        return f'{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}'
+
+    def _remember(self, path: str, digest: str):
+        self._hashes[self._fingerprint(path)] = digest
+
+    def file_hash(self, path: str) -> str:
+        """
+        파일 내용 해시 (경로 / 크기 / 수정 시각이 같으면 저장해 둔 값 사용)
+        """
+        fingerprint = self._fingerprint(path)
+        if fingerprint not in self._hashes:
+            digest = hashlib.blake2b(digest_size=16)
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+                    digest.update(block)
+            self._hashes[fingerprint] = digest.hexdigest()
+        return self._hashes[fingerprint]
+
+    @staticmethod
+    def _resolve(path: str) -> str:
+        # 확장자 없는 중간 파일 경로는 실제 저장된 파일로
+        return path if os.path.exists(path) else find_stage_file(path)[0]
+
+    @staticmethod
+    def _code_files() -> List[str]:
+        """
+        실행 중인 단계 스크립트와 불러온 CG_ 모듈(공통 폴더 포함) / 설정 파일
+        """
+        paths = []
+        for name, module in list(sys.modules.items()):
+            path = getattr(module, '__file__', None)
+            if path and (name == '__main__' or name.startswith('CG_') or name.startswith('cg_stage_')) \
+                    and os.path.dirname(os.path.abspath(path)) in (SCRIPT_DIR, COMMON_DIR):
+                paths.append(os.path.abspath(path))
+        # 코드와 함께 결과를 정하는 규칙 파일 (환경변수로 다른 파일을 지정한 경우 포함)
+        for module_name, attribute in [('CG_taxonomy', 'TAXONOMY_PATH'), ('CG_brand_index', 'BRAND_ALIASES_PATH'),
+                                       ('CG_source_margin', 'SOURCE_MARGINS_PATH')]:
+            if module_name in sys.modules:
+                paths.append(os.path.abspath(getattr(sys.modules[module_name], attribute)))
+        return sorted(set(paths))
+
+    def _input_hashes(self) -> Dict[str, str]:
+        hashes = {}
+        for path in list(self.inputs) + list(self.optional_inputs):
+            try:
+                path = self._resolve(path)
+            except FileNotFoundError:
+                if path in self.optional_inputs:
+                    hashes[os.path.basename(path)] = None
+                    continue
+                raise
+            hashes[os.path.basename(path)] = self.file_hash(path)
+        return hashes
+
+    def _compute_key(self) -> str:
+        inputs = self._input_hashes()
+        code = [os.path.basename(path) + ':' + self.file_hash(path) for path in self._code_files()]
+        payload = json.dumps({'stage': self.stage, 'inputs': inputs, 'code': code, 'format': STAGE_FORMAT},
+                             sort_keys=True)
+        return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.cache_dir, 'manifests', f'{self.key}.json')
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, 'objects', digest)
+
+    def restore(self) -> bool:
+        """
+        같은 입력 / 코드의 결과가 캐시에 있으면 출력 파일을 맞춰 두고 True (단계 건너뜀)
+        False면 단계가 출력 파일을 새로 쓰도록 캐시와 하드 링크된 출력 파일을 지워 둠
+
+        Returns:
+            True면 단계를 실행하지 않아도 됨
+        """
+        if self._restore():
+            return True
+        self._detach_outputs()
+        return False
+
+    def _detach_outputs(self):
+        # 단계는 출력 파일을 그 자리에서 덮어쓰므로, 하드 링크된 파일이면 캐시 객체까지 바뀌지 않게 링크만 지움
+        # (캐시를 끈 실행에서도 이전에 링크된 출력 파일이 있을 수 있으므로 항상 확인)
+        for output in self.outputs:
+            try:
+                output_path = self._resolve(output)
+            except FileNotFoundError:
+                continue
+            if os.stat(output_path).st_nlink > 1:
+                os.remove(output_path)
+
+    def _restore(self) -> bool:
+        if not self.enabled:
+            return False
+        try:
+            self.key = self._compute_key()
+        except FileNotFoundError:
+            # 입력 파일이 없으면 단계에서 원래대로 오류를 내도록 실행
+            return False
+        if self.force or not os.path.exists(self._manifest_path()):
+            return False
+
+        with open(self._manifest_path(), encoding='utf-8') as f:
+            manifest = json.load(f)
+        objects = {name: self._object_path(digest) for name, digest in manifest['outputs'].items()}
+        if not all(os.path.exists(path) for path in objects.values()):
+            return False
+
+        restored = 0
+        for (name, object_path), output in zip(objects.items(), self.outputs):
+            output_path = os.path.join(os.path.dirname(output), name)
+            if not os.path.exists(output_path) or self.file_hash(output_path) != manifest['outputs'][name]:
+                try:
+                    _replace_file(object_path, output_path)
+                except FileNotFoundError:
+                    # 다른 프로세스의 정리에서 그 사이 지워진 경우
+                    return False
+                self._remember(output_path, manifest['outputs'][name])
+                restored += 1
+        # 사용한 매니페스트는 정리 순서에서 최근 것으로
+        os.utime(self._manifest_path())
+        self._save_hashes()
+        print(f"[캐시] {self.stage}: 입력 / 코드가 바뀌지 않아 건너뜀 "
+              f"(출력 {len(objects)}개 중 {restored}개 복원, 다시 실행하려면 --force)")
+        return True
+
+    def save(self):
+        """
+        단계 실행이 끝난 뒤 출력 파일을 캐시에 저장하고 매니페스트 기록
+        """
+        if not self.enabled or self.key is None:
+            # 입력 파일이 없어서 키를 만들지 못한 경우
+            return
+        outputs = {}
+        for output in self.outputs:
+            try:
+                output_path = self._resolve(output)
+            except FileNotFoundError:
+                # 단계가 출력 파일을 만들지 못하고 끝난 경우 (칼럼 누락 등)
+                return
+            digest = self.file_hash(output_path)
+            if not os.path.exists(self._object_path(digest)):
+                _replace_file(output_path, self._object_path(digest))
+            outputs[os.path.basename(output_path)] = digest
+
+        _write_json(self._manifest_path(), {
+            'stage': self.stage,
+            'key': self.key,
+            'inputs': self._input_hashes(),
+            'code': {os.path.basename(path): self.file_hash(path) for path in self._code_files()},
+            'format': STAGE_FORMAT,
+            'outputs': outputs,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+        })
+        self._save_hashes()
+        self.collect_garbage()
+
+    def collect_garbage(self, keep: int = KEEP_MANIFESTS):
+        """
+        단계별로 최근에 저장 / 사용한 매니페스트 keep개만 남기고, 남은 매니페스트가 참조하지 않는 출력 파일 삭제
+
+        Args:
+            keep: 단계별로 남겨 둘 매니페스트 수 (기본값: CG_STAGE_CACHE_KEEP)
+        """
+        manifest_dir = os.path.join(self.cache_dir, 'manifests')
+        object_dir = os.path.join(self.cache_dir, 'objects')
+        stages = {}
+        for name in os.listdir(manifest_dir):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(manifest_dir, name)
+            try:
+                with open(path, encoding='utf-8') as f:
+                    manifest = json.load(f)
+                stages.setdefault(manifest.get('stage'), []).append((os.stat(path).st_mtime, path, manifest))
+            except (OSError, ValueError):
+                continue
+
+        removed_manifests = 0
+        referenced = set()
+        for entries in stages.values():
+            entries.sort(key=lambda entry: entry[0], reverse=True)
+            for _, _, manifest in entries[:keep]:
+                referenced.update(manifest['outputs'].values())
+            for _, path, _ in entries[keep:]:
+                _remove_quietly(path)
+                removed_manifests += 1
+
+        removed_objects = 0
+        freed_bytes = 0
+        for name in os.listdir(object_dir):
+            # 다른 프로세스가 저장 중인 임시 파일은 제외
+            if name in referenced or name.endswith('.tmp'):
+                continue
+            path = os.path.join(object_dir, name)
+            size = os.path.getsize(path)
+            if _remove_quietly(path):
+                removed_objects += 1
+                freed_bytes += size
+
+        if removed_manifests or removed_objects:
+            print(f"[캐시] 정리: 매니페스트 {removed_manifests}개, 출력 파일 {removed_objects}개 삭제 "
+                  f"({freed_bytes / 1024 / 1024:.1f}MB)")
+
+    def _save_hashes(self):
+        # 다른 단계가 그 사이 저장한 값과 합치고, 지워졌거나 바뀐 파일의 값은 버림
+        hashes = self._load_hashes()
+        hashes.update(self._hashes)
+        current = {}
+        for fingerprint, digest in hashes.items():
+            path = fingerprint.rsplit(':', 2)[0]
+            if os.path.exists(path) and self._fingerprint(path) == fingerprint:
+                current[fingerprint] = digest
+        _write_json(self._hashes_path, current)
@@ -0,0 +1,230 @@
+"""
+Categorization 합성 입력 데이터 생성 스크립트
+규모별 성능 측정(CG_benchmark.py)용으로 실제 파일과 같은 형식의 리스팅 파일 / DB 덤프를 생성
+
+- 00_CG_eBay_active_listing_data.csv: Item number, Title, Custom label (SKU) ('접두사:id'), eBay category 1 name
+- 00_DB_eBay_active_listing_data.csv: id, origin_id, raw_data (중첩 JSON), source
+- Title은 CG_taxonomy.json의 카테고리 / 하위 카테고리 키워드와 브랜드로 조합 (일부는 매칭 키워드 없음)
+- raw_data는 brand / Brand / brand 리스트 / brand 없음 / 깨진 JSON / 빈 값이 섞이도록 생성
+- 규모: 100k / 1m / 10m 또는 행 수, 청크 단위로 생성해서 10m 행도 메모리를 적게 사용
+
+사용 예:
+    python CG_synthetic_data.py 1m --output-dir /tmp/cg_bench
+"""
+
+import argparse
+import os
+import time
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from CG_taxonomy import load_taxonomy
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+LISTING_FILE = '00_CG_eBay_active_listing_data.csv'
+DB_FILE = '00_DB_eBay_active_listing_data.csv'
+
+SIZES = {'100k': 100_000, '1m': 1_000_000, '10m': 10_000_000}
+CHUNK_SIZE = 500_000
+
+# 리스팅 중 DB 덤프에 행이 있는 비율 (260212 스냅샷: 4,064개 중 1,053개)
+MATCH_RATE = 0.26
+# 리스팅 행 수 대비 DB 덤프 행 수
+DB_ROWS_PER_LISTING = 1.5
+# SKU가 비어 있는 리스팅 비율
+EMPTY_SKU_RATE = 0.01
+# 카테고리 키워드가 없는 Title 비율 (Others)
+UNMATCHED_TITLE_RATE = 0.12
+
+ITEM_NUMBER_START = 300_000_000_000
+SKU_PREFIXES = ['koibito', 'kream', 'gugus', 'bunjang', 'chic']
+DB_SOURCES = ['koibito', 'kream', 'gugus', 'bunjang']
+
+BRANDS = ['Gucci', 'Prada', 'Louis Vuitton', 'Chanel', 'Hermes', 'Dior', 'Celine', 'Bottega Veneta',
+          'Saint Laurent', 'Balenciaga', 'Fendi', 'Burberry', 'Cartier', 'Omega', 'Rolex', 'TAG Heuer',
+          'Montblanc', 'Salvatore Ferragamo', 'Mido', 'Tiffany & Co.', 'Miu Miu', 'Loewe', 'Goyard', 'Coach']
+FILLER_WORDS = ['Authentic', 'Vintage', 'Used', 'Black', 'Brown', 'Beige', 'White', 'Leather', 'Canvas',
+                'Gold', 'Silver', 'Logo', 'Monogram', 'Women', 'Men', 'Auth', 'Rare', 'Japan', 'Italy', 'Good']
+NEUTRAL_WORDS = ['Box', 'Case', 'Pouch', 'Card', 'Set', 'Keychain', 'Charm', 'Pin', 'Sticker', 'Book']
+EBAY_CATEGORIES = {
+    'Bags': 'Handbags & Purses',
+    'Watches': 'Wristwatches',
+    'Shoes': "Women's Shoes",
+    'Clothes': "Women's Clothing",
+    'Accessaries': 'Fine Jewelry',
+}
+SPEC_COLORS = ['Black', 'Brown', 'Beige', 'White', 'Red', 'Navy', 'Gold', 'Silver']
+SPEC_MATERIALS = ['Leather', 'Canvas', 'Stainless Steel', 'Cotton', 'Wool', 'Silk', 'Gold', 'Nylon']
+
+
+def resolve_size(size: str) -> int:
+    """
+    '100k' / '1m' / '10m' 또는 숫자 문자열을 행 수로 변환
+    """
+    return SIZES[size.lower()] if size.lower() in SIZES else int(size.replace('_', ''))
+
+
+def _title_vocabulary() -> Tuple[list, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    카테고리별 Title 키워드를 한 배열로 펼치기
+
+    Returns:
+        (카테고리 이름 리스트, 키워드 배열, 카테고리별 시작 위치, 카테고리별 키워드 수)
+    """
+    taxonomy = load_taxonomy()
+    names, words, offsets, lengths = [], [], [], []
+    for name, keywords in taxonomy.category_rules:
+        subcategory_keywords = [keyword for _, rule in taxonomy.subcategory_rules.get(name, []) for keyword in rule]
+        # 키워드는 모두 소문자이므로 실제 Title처럼 첫 글자를 대문자로
+        pool = [keyword.title() for keyword in keywords + subcategory_keywords]
+        names.append(name)
+        offsets.append(len(words))
+        lengths.append(len(pool))
+        words.extend(pool)
+    return names, np.array(words, dtype=object), np.array(offsets), np.array(lengths)
+
+
+def _pick(rng: np.random.Generator, values, size: int) -> np.ndarray:
+    return np.asarray(values, dtype=object)[rng.integers(0, len(values), size)]
+
+
+def generate_listing_chunk(rng: np.random.Generator, start: int, size: int, db_rows: int) -> pd.DataFrame:
+    """
+    리스팅 파일 청크 생성
+
+    Args:
+        rng: 난수 생성기
+        start: 청크의 첫 행 번호
+        size: 청크 행 수
+        db_rows: DB 덤프 행 수 (origin_id 1 ~ db_rows가 DB에 있음)
+
+    Returns:
+        Item number, Title, Custom label (SKU), eBay category 1 name DataFrame
+    """
+    names, words, offsets, lengths = _title_vocabulary()
+
+    category = rng.integers(0, len(names), size)
+    keyword = words[offsets[category] + (rng.random(size) * lengths[category]).astype(np.int64)]
+    second = words[offsets[category] + (rng.random(size) * lengths[category]).astype(np.int64)]
+    unmatched = rng.random(size) < UNMATCHED_TITLE_RATE
+    keyword = np.where(unmatched, _pick(rng, NEUTRAL_WORDS, size), keyword)
+    second = np.where(unmatched | (rng.random(size) < 0.5), '', ' ' + second)
+
+    title = (pd.Series(_pick(rng, BRANDS, size)) + ' ' + _pick(rng, FILLER_WORDS, size) + ' '
+             + _pick(rng, FILLER_WORDS, size) + ' ' + keyword + second)
+
+    # DB에 있는 SKU는 1 ~ db_rows, 없는 SKU는 db_rows 뒤의 번호
+    matched = rng.random(size) < MATCH_RATE
+    origin_id = np.where(matched, rng.integers(1, db_rows + 1, size), db_rows + start + np.arange(1, size + 1))
+    sku = pd.Series(_pick(rng, SKU_PREFIXES, size)) + ':' + origin_id.astype(str).astype(object)
+    sku[rng.random(size) < EMPTY_SKU_RATE] = np.nan
+
+    ebay_category = pd.Series(np.array([EBAY_CATEGORIES[name] for name in names], dtype=object)[category])
+    ebay_category[unmatched] = 'Other'
+
+    return pd.DataFrame({
+        'Item number': ITEM_NUMBER_START + start + np.arange(size, dtype=np.int64),
+        'Title': title,
+        'Custom label (SKU)': sku,
+        'eBay category 1 name': ebay_category,
+    })
+
+
+def generate_db_chunk(rng: np.random.Generator, start: int, size: int) -> pd.DataFrame:
+    """
+    DB 덤프 청크 생성 (raw_data는 중첩 JSON 문자열)
+
+    Args:
+        rng: 난수 생성기
+        start: 청크의 첫 행 번호
+        size: 청크 행 수
+
+    Returns:
+        id, origin_id, raw_data, source DataFrame
+    """
+    ids = start + np.arange(1, size + 1)
+    brand = pd.Series(_pick(rng, BRANDS, size))
+    spec = ('{"color": "' + pd.Series(_pick(rng, SPEC_COLORS, size)) + '", "material": "'
+            + _pick(rng, SPEC_MATERIALS, size) + '", "size": {"width": '
+            + rng.integers(10, 60, size).astype(str).astype(object) + ', "unit": "cm"}}')
+    images = ', "images": ["https://img.example.com/' + ids.astype(str).astype(object) + '/1.jpg"]'
+
+    # brand 표기 / 누락 / 깨진 JSON 비율
+    variant = rng.choice(6, size, p=[0.60, 0.10, 0.10, 0.10, 0.05, 0.05])
+    raw_data = pd.Series(np.select(
+        [variant == 0, variant == 1, variant == 2, variant == 3, variant == 4],
+        ['{"brand": "' + brand + '", "spec": ' + spec + images + '}',
+         '{"Brand": "' + brand + '", "spec": ' + spec + '}',
+         '{"brand": ["' + brand + '", "' + _pick(rng, BRANDS, size) + '"], "spec": ' + spec + '}',
+         '{"spec": ' + spec + images + '}',
+         '{"brand": "' + brand + '", "spec": {'],
+        default=''), dtype=object)
+    raw_data[variant == 5] = np.nan
+
+    return pd.DataFrame({
+        'id': ids,
+        'origin_id': ids,
+        'raw_data': raw_data,
+        'source': _pick(rng, DB_SOURCES, size),
+    })
+
+
+def generate_dataset(rows: int, output_dir: str, seed: int = 0, chunk_size: int = CHUNK_SIZE,
+                     db_rows_per_listing: float = DB_ROWS_PER_LISTING) -> dict:
+    """
+    리스팅 파일 / DB 덤프 생성
+
+    Args:
+        rows: 리스팅 행 수
+        output_dir: 저장 디렉토리
+        seed: 난수 시드 (같은 시드 / 행 수면 같은 파일)
+        chunk_size: 한 번에 생성할 행 수
+        db_rows_per_listing: 리스팅 행 수 대비 DB 덤프 행 수
+
+    Returns:
+        생성 통계 (rows, db_rows, listing_path, db_path, seconds)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    db_rows = int(rows * db_rows_per_listing)
+    listing_path = os.path.join(output_dir, LISTING_FILE)
+    db_path = os.path.join(output_dir, DB_FILE)
+    started = time.perf_counter()
+
+    # 파일을 한 번만 열어야 utf-8-sig BOM이 청크마다 반복되지 않음
+    with open(listing_path, 'w', encoding='utf-8-sig', newline='') as f:
+        for chunk_no, start in enumerate(range(0, rows, chunk_size)):
+            rng = np.random.default_rng([seed, 0, chunk_no])
+            chunk = generate_listing_chunk(rng, start, min(chunk_size, rows - start), db_rows)
+            chunk.to_csv(f, index=False, header=chunk_no == 0)
+    print(f"리스팅 파일 생성 완료: {listing_path} ({rows:,}개 행)")
+
+    with open(db_path, 'w', encoding='utf-8', newline='') as f:
+        for chunk_no, start in enumerate(range(0, db_rows, chunk_size)):
+            rng = np.random.default_rng([seed, 1, chunk_no])
+            chunk = generate_db_chunk(rng, start, min(chunk_size, db_rows - start))
+            chunk.to_csv(f, index=False, header=chunk_no == 0)
+    print(f"DB 덤프 생성 완료: {db_path} ({db_rows:,}개 행)")
+
+    return {'rows': rows, 'db_rows': db_rows, 'listing_path': listing_path, 'db_path': db_path,
+            'seconds': round(time.perf_counter() - started, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Categorization 합성 입력 데이터 생성')
+    parser.add_argument('size', help=f'리스팅 행 수 ({" / ".join(SIZES)} 또는 숫자)')
+    parser.add_argument('--output-dir', default=None, help='저장 디렉토리 (기본값: 스크립트 위치의 synthetic_<size>)')
+    parser.add_argument('--seed', type=int, default=0, help='난수 시드')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='한 번에 생성할 행 수')
+    parser.add_argument('--db-ratio', type=float, default=DB_ROWS_PER_LISTING, help='리스팅 행 수 대비 DB 덤프 행 수')
+    args = parser.parse_args()
+
+    output_dir = args.output_dir or os.path.join(SCRIPT_DIR, f'synthetic_{args.size}')
+    stats = generate_dataset(resolve_size(args.size), output_dir, args.seed, args.chunk_size, args.db_ratio)
+    print(f"생성 시간: {stats['seconds']:.1f}초")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Categorization taxonomy 설정 모듈
+카테고리 키워드 / 우선순위, 하위 카테고리 규칙, Watches 브랜드, 시크 강남 Category_id를
+CG_taxonomy.json 한 파일에서 읽어서 한 번만 컴파일 (02_ / 03_ / 04_ 단계에서 공유)
+
+- categories 리스트 순서가 카테고리 우선순위, 각 subcategories 리스트 순서가 하위 카테고리 우선순위
+- subcategory_by가 'brand'인 카테고리(Watches)는 watch_brands 순서대로 brand 부분 문자열 매칭
+- store_category_ids: 하위 카테고리 → 시크 강남 Category_id (Category_id 지정은 한 번의 merge)
+
+다른 taxonomy 파일을 쓰려면 CG_TAXONOMY 환경변수에 경로 지정
+"""
+
+import hashlib
+import json
+import os
+from collections import namedtuple
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+from CG_keyword_index import build_keyword_index
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+TAXONOMY_PATH = os.environ.get('CG_TAXONOMY', os.path.join(SCRIPT_DIR, 'CG_taxonomy.json'))
+
+Taxonomy = namedtuple('Taxonomy', [
+    'version',              # 파일 내용 해시 (Title 캐시 무효화 등에 사용)
+    'default',              # 매칭되는 키워드가 없을 때의 라벨
+    'category_rules',       # [(카테고리, 키워드 리스트)] 우선순위 순
+    'category_index',       # build_keyword_index(category_rules)
+    'subcategory_rules',    # {카테고리: [(하위 카테고리, 키워드 리스트)]} (Title 기준 카테고리만)
+    'subcategory_index',    # {카테고리: build_keyword_index(규칙)}
+    'watch_brands',         # {brand 부분 문자열: 하위 카테고리} 순서대로 확인
+    'category_ids',         # Category, Subcategory, Category_id DataFrame
+])
+
+
+def _parse_categories(config: dict) -> Tuple[List, Dict, Dict, List]:
+    """
+    taxonomy 설정의 categories 리스트를 규칙 테이블로 변환
+    """
+    category_rules = []
+    subcategory_rules = {}
+    watch_brands = {}
+    category_ids = []
+
+    for category in config['categories']:
+        name = category['name']
+        category_rules.append((name, category['keywords']))
+
+        if category.get('subcategory_by', 'title') == 'brand':
+            for brand_key, subcategory in category['watch_brands']:
+                watch_brands[brand_key] = subcategory
+        else:
+            subcategory_rules[name] = [(rule['name'], rule['keywords']) for rule in category.get('subcategories', [])]
+
+        for subcategory, category_id in category.get('store_category_ids', {}).items():
+            category_ids.append((name, subcategory, int(category_id)))
+
+    names = [name for name, _ in category_rules]
+    if len(names) != len(set(names)):
+        raise ValueError(f"taxonomy에 중복된 카테고리가 있습니다: {names}")
+
+    return category_rules, subcategory_rules, watch_brands, category_ids
+
+
+def compile_taxonomy(config: dict, version: str = '') -> Taxonomy:
+    """
+    taxonomy 설정(dict)을 조회용 구조로 컴파일
+    """
+    category_rules, subcategory_rules, watch_brands, category_ids = _parse_categories(config)
+    return Taxonomy(
+        version=version,
+        default=config.get('default', 'Others'),
+        category_rules=category_rules,
+        category_index=build_keyword_index(category_rules),
+        subcategory_rules=subcategory_rules,
+        subcategory_index={name: build_keyword_index(rules) for name, rules in subcategory_rules.items()},
+        watch_brands=watch_brands,
+        category_ids=pd.DataFrame(category_ids, columns=['Category', 'Subcategory', 'Category_id']),
+    )
+
+
+@lru_cache(maxsize=None)
+def load_taxonomy(path: str = TAXONOMY_PATH) -> Taxonomy:
+    """
+    taxonomy 파일을 읽어서 컴파일 (같은 경로는 프로세스당 한 번만)
+    """
+    with open(path, 'rb') as f:
+        content = f.read()
+    version = hashlib.blake2b(content, digest_size=16).hexdigest()
+    return compile_taxonomy(json.loads(content.decode('utf-8')), version)
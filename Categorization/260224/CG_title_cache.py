@@ -0,0 +1,242 @@
+"""
+Title → (Category, Subcategory) 분류 결과 영구 캐시 (SQLite)
+같은 제목이 청크 / 날짜 / 재등록 리스팅마다 반복해서 분류되므로,
+정규화한 제목의 해시를 키로 분류 결과를 저장해 두고 청크 단위로 한 번에 조회
+
+- 키워드 규칙이 바뀌면 taxonomy 버전이 달라지고, 캐시를 열 때 이전 버전 결과를 모두 삭제
+- max_entries를 넘으면 가장 오래 사용하지 않은 항목부터 삭제 (LRU)
+- Watches 하위 카테고리는 Title이 아닌 brand 기준이므로 Subcategory를 저장하지 않음 (NULL)
+- 여러 프로세스(CG_backfill --jobs)가 같은 캐시 파일을 쓰면 다른 프로세스의 쓰기가 끝날 때까지 기다림
+  (최대 CG_TITLE_CACHE_TIMEOUT초, 기본값 300)
+- 단계별 스크립트(02_ / 03_)도 --title-cache 또는 CG_TITLE_CACHE 환경변수로 같은 캐시 사용
+  (02_는 Category 조회만, 03_는 조회 + 캐시에 없던 제목의 Category / Subcategory 저장)
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+from typing import Dict, Iterable, List
+
+import pandas as pd
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 날짜 폴더끼리 공유하도록 Categorization 폴더에 저장
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(SCRIPT_DIR), 'CG_title_cache.sqlite')
+DEFAULT_MAX_ENTRIES = 1000000
+
+# 정규화 / 키 생성 방식이 바뀌면 올려서 기존 캐시 무효화
+CACHE_FORMAT_VERSION = 1
+
+# SQLite 한 쿼리의 바인딩 변수 수 제한보다 작게
+QUERY_BATCH_SIZE = 900
+
+# 다른 프로세스가 쓰는 중이면 기다리는 최대 시간 (초, 넘으면 database is locked 오류)
+BUSY_TIMEOUT_SECONDS = float(os.environ.get('CG_TITLE_CACHE_TIMEOUT', '300'))
+
+# 단계별 스크립트(02_ / 03_)의 Title 캐시 경로 (빈 값이면 캐시 사용 안 함)
+STAGE_CACHE_PATH = os.environ.get('CG_TITLE_CACHE') or None
+
+
+def normalize_title(title) -> str:
+    """
+    분류 결과가 같은 제목끼리 같은 값이 되도록 정규화 (소문자 + 공백 정리, 빈 값은 '')
+    """
+    if pd.isna(title):
+        return ''
+    return ' '.join(str(title).lower().split())
+
+
+def title_key(normalized_title: str) -> int:
+    """
+    정규화한 제목의 62비트 해시 (SQLite INTEGER 키)
+    """
+    digest = hashlib.blake2b(normalized_title.encode('utf-8'), digest_size=8).digest()
+    # 양수 62비트로 제한 (pandas Index에서 키끼리 뺄셈할 때 int64 overflow 방지)
+    return int.from_bytes(digest, 'big') >> 2
+
+
+def title_keys(titles: pd.Series) -> pd.Series:
+    """
+    Title 칼럼의 캐시 키 (같은 제목은 한 번만 해시)
+    """
+    normalized = titles.map(normalize_title)
+    unique_keys = {title: title_key(title) for title in normalized.unique()}
+    return normalized.map(unique_keys).astype('int64')
+
+
+def taxonomy_version(*rule_tables) -> str:
+    """
+    키워드 규칙 테이블로 taxonomy 버전 계산 (규칙이 하나라도 바뀌면 다른 값)
+    """
+    payload = json.dumps([CACHE_FORMAT_VERSION, rule_tables], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def open_taxonomy_cache(path: str, taxonomy) -> 'TitleClassificationCache':
+    """
+    taxonomy(load_taxonomy 결과)의 키워드 규칙 버전으로 Title 캐시 열기 (CG_run_pipeline.open_title_cache와 같은 버전)
+    """
+    return TitleClassificationCache(path, taxonomy_version(taxonomy.category_rules, taxonomy.subcategory_index))
+
+
+def lookup_titles(title_cache: 'TitleClassificationCache', titles: pd.Series) -> pd.DataFrame:
+    """
+    청크의 Title을 캐시에서 한 번에 조회
+
+    Args:
+        title_cache: Title 캐시 (None이면 모든 행을 캐시에 없는 것으로 처리)
+        titles: Title 칼럼
+
+    Returns:
+        titles와 같은 인덱스의 key, found(캐시에 있는지), Category, Subcategory DataFrame
+    """
+    if title_cache is None:
+        return pd.DataFrame({'key': 0, 'found': False, 'Category': None, 'Subcategory': None}, index=titles.index)
+    keys = title_keys(titles)
+    cached = title_cache.get_many(keys)
+    return pd.DataFrame({
+        'key': keys.to_numpy(),
+        'found': keys.isin(cached.index).to_numpy(),
+        'Category': keys.map(cached['Category']).to_numpy(),
+        'Subcategory': keys.map(cached['Subcategory']).to_numpy(),
+    }, index=titles.index)
+
+
+class TitleClassificationCache:
+    """
+    SQLite 기반 Title 분류 결과 캐시
+
+    사용 예:
+        cache = TitleClassificationCache(path, version)
+        cached = cache.get_many(keys)       # 키 → (Category, Subcategory) DataFrame
+        cache.put_many(new_results)         # key, Category, Subcategory 칼럼
+        cache.close()                       # LRU 정리 후 닫기
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, version: str = '',
+                 max_entries: int = DEFAULT_MAX_ENTRIES, busy_timeout: float = BUSY_TIMEOUT_SECONDS):
+        self.path = path
+        self.version = version
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._conn = sqlite3.connect(path, timeout=busy_timeout)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS titles ('
+                           'title_key INTEGER PRIMARY KEY, category TEXT NOT NULL, '
+                           'subcategory TEXT, last_used INTEGER NOT NULL)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS titles_last_used ON titles (last_used)')
+
+        # taxonomy 버전이 다르면 이전 결과 전부 삭제
+        # (버전 확인부터 쓰기 잠금을 잡아서, 동시에 연 다른 프로세스가 이미 새 버전으로 저장한 결과는 지우지 않음)
+        self._conn.commit()
+        self._conn.execute('BEGIN IMMEDIATE')
+        stored_version = self._get_meta('taxonomy_version')
+        if stored_version != version:
+            if stored_version is not None:
+                print(f"키워드 규칙이 변경되어 Title 캐시를 초기화합니다: {path}")
+            self._conn.execute('DELETE FROM titles')
+            self._set_meta('taxonomy_version', version)
+
+        # 조회 / 저장할 때마다 1씩 증가하는 LRU 시각
+        self._tick = int(self._get_meta('tick') or 0)
+        self._conn.commit()
+
+    def _get_meta(self, name: str):
+        row = self._conn.execute('SELECT value FROM meta WHERE name = ?', (name,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, name: str, value):
+        self._conn.execute('INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)', (name, str(value)))
+
+    def _next_tick(self) -> int:
+        self._tick += 1
+        return self._tick
+
+    @staticmethod
+    def _batches(values: List[int]) -> Iterable[List[int]]:
+        for start in range(0, len(values), QUERY_BATCH_SIZE):
+            yield values[start:start + QUERY_BATCH_SIZE]
+
+    def get_many(self, keys: pd.Series) -> pd.DataFrame:
+        """
+        캐시 키 칼럼을 한 번에 조회 (조회된 항목은 LRU 시각 갱신)
+
+        Args:
+            keys: title_keys 결과 (중복 가능)
+
+        Returns:
+            키 인덱스의 Category, Subcategory DataFrame (캐시에 있는 키만)
+        """
+        unique_keys = [int(key) for key in keys.unique()]
+        tick = self._next_tick()
+
+        rows = []
+        for batch in self._batches(unique_keys):
+            placeholders = ','.join('?' * len(batch))
+            rows.extend(self._conn.execute(
+                f'SELECT title_key, category, subcategory FROM titles WHERE title_key IN ({placeholders})',
+                batch).fetchall())
+            self._conn.execute(f'UPDATE titles SET last_used = ? WHERE title_key IN ({placeholders})',
+                               [tick] + batch)
+        self._conn.commit()
+
+        cached = pd.DataFrame(rows, columns=['key', 'Category', 'Subcategory']).set_index('key')
+        found = keys.isin(cached.index)
+        self.hits += int(found.sum())
+        self.misses += int((~found).sum())
+        return cached
+
+    def put_many(self, results: pd.DataFrame):
+        """
+        새로 분류한 결과 저장
+
+        Args:
+            results: key, Category, Subcategory 칼럼이 있는 DataFrame (Subcategory가 NaN이면 NULL)
+        """
+        tick = self._next_tick()
+        subcategories = results['Subcategory'].astype(object).where(results['Subcategory'].notna(), None)
+        self._conn.executemany(
+            'INSERT OR REPLACE INTO titles (title_key, category, subcategory, last_used) VALUES (?, ?, ?, ?)',
+            zip(results['key'].astype('int64').tolist(), results['Category'].tolist(),
+                subcategories.tolist(), [tick] * len(results)))
+        self._conn.commit()
+
+    def evict(self) -> int:
+        """
+        max_entries를 넘는 항목을 가장 오래 사용하지 않은 순서로 삭제
+
+        Returns:
+            삭제한 항목 수
+        """
+        count = self._conn.execute('SELECT COUNT(*) FROM titles').fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow <= 0:
+            return 0
+        self._conn.execute('DELETE FROM titles WHERE title_key IN '
+                           '(SELECT title_key FROM titles ORDER BY last_used LIMIT ?)', (overflow,))
+        self._conn.commit()
+        return overflow
+
+    def stats(self) -> Dict[str, int]:
+        """
+        이번 실행의 조회 통계 (hits / misses는 행 단위)
+        """
+        entries = self._conn.execute('SELECT COUNT(*) FROM titles').fetchone()[0]
+        return {'hits': self.hits, 'misses': self.misses, 'entries': entries}
+
+    def close(self):
+        """
+        LRU 정리 후 LRU 시각 저장하고 닫기
+        """
+        evicted = self.evict()
+        if evicted:
+            print(f"Title 캐시 정리: {evicted:,}개 항목 삭제 (최대 {self.max_entries:,}개)")
+        self._set_meta('tick', self._tick)
+        self._conn.commit()
+        self._conn.close()
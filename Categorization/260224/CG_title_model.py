@@ -0,0 +1,374 @@
+"""
+Others 행 보조 분류 모델 (해시 n-gram + 로지스틱 회귀)
+키워드 규칙으로 찾지 못해 Category / Subcategory가 Others인 행만 선형 모델로 다시 분류
+
+- 특징: Title 단어(소문자, 공백 분리)의 unigram / bigram을 2^bits 칸에 해시 (crc32, 프로세스 / 실행이 달라도 같은 값)
+  + eBay category 1 name 값 (있는 경우)
+- 학습 데이터: 규칙이 확실하게 라벨을 정한 행 (키워드가 한 규칙에만 있는 행)
+  규칙 키워드 자체는 특징에서 제외 → Others 행에도 있는 브랜드 / 모델명 / 소재 등 나머지 단어로 학습
+- 모델: 타깃(Category, 카테고리별 Subcategory)마다 softmax 로지스틱 회귀 (numpy, 미니배치 Adagrad)
+- 예측: 청크 단위로 한 번에, 확률이 임계값(CG_MODEL_THRESHOLD, 기본값 0.8) 이상인 경우만 라벨 변경
+- holdout 정확도가 최소 정확도(CG_MODEL_MIN_ACCURACY, 기본값 0.8) 미만인 타깃은 사용하지 않음
+- 저장: 가중치 / 라벨 / 설정을 .npz 하나로 저장 (pickle 없이 np.load로 바로 읽음)
+
+학습:
+    python CG_title_model.py --input-dir ../260224
+사용:
+    python CG_run_pipeline.py --title-model
+"""
+
+import argparse
+import json
+import os
+import time
+import zlib
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from CG_keyword_index import match_tokens
+from CG_taxonomy import load_taxonomy
+from CG_token_matrix import LISTING_FILE, tokenize_titles
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 날짜 폴더끼리 공유하도록 Categorization 폴더에 저장
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(SCRIPT_DIR), 'CG_title_model.npz')
+# 지정하면 CG_run_pipeline.py에서 기본으로 사용
+TITLE_MODEL_PATH = os.environ.get('CG_TITLE_MODEL') or None
+MODEL_THRESHOLD = float(os.environ.get('CG_MODEL_THRESHOLD', '0.8'))
+# holdout 정확도가 이보다 낮은 타깃은 예측에 사용하지 않음 (라벨 수가 적으면 우연 수준도 0.25 ~ 0.5)
+MIN_TARGET_ACCURACY = float(os.environ.get('CG_MODEL_MIN_ACCURACY', '0.8'))
+
+CATEGORY_TARGET = 'Category'
+SUBCATEGORY_PREFIX = 'Subcategory/'
+EXTRA_FIELD = 'eBay category 1 name'
+
+FEATURE_BITS = 18
+EPOCHS = 5
+BATCH_SIZE = 4096
+LEARNING_RATE = 0.5
+L2 = 1e-6
+# 학습 행이 이보다 적거나 라벨이 하나뿐인 타깃은 학습하지 않음
+MIN_TRAIN_ROWS = 50
+HOLDOUT = 0.1
+
+_BIGRAM_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _token_hashes(values: List[str], prefix: str = '') -> np.ndarray:
+    return np.array([zlib.crc32((prefix + value).encode('utf-8')) for value in values], dtype=np.uint64)
+
+
+def hashed_features(titles: pd.Series, bits: int = FEATURE_BITS, masked=(),
+                    extra: Optional[pd.Series] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Title 칼럼 전체를 해시 특징 행렬(CSR, 값은 모두 1)로 변환
+
+    Args:
+        titles: Title 칼럼
+        bits: 특징 칸 수 (2^bits)
+        masked: 특징에서 제외할 단어 (이 단어가 들어간 bigram도 제외)
+        extra: 행마다 특징 하나로 더할 칼럼 (예: eBay category 1 name)
+
+    Returns:
+        (indptr, indices) - 행별 특징 번호 (중복 없이 정렬)
+    """
+    size = 1 << bits
+    values = pa.array(titles.fillna('').astype(str).to_numpy(dtype=object), pa.string())
+    words = pc.utf8_split_whitespace(pc.utf8_lower(values))
+    lengths = np.diff(words.offsets.to_numpy()).astype(np.int64)
+    # 고유 단어만 해시하고 단어 위치로 펼침
+    encoded = pc.dictionary_encode(words.flatten())
+    uniques = encoded.dictionary.to_pylist()
+    codes = encoded.indices.to_numpy(zero_copy_only=False).astype(np.int64)
+    hashes = _token_hashes(uniques)[codes]
+    keep = ~pd.Index(uniques, dtype=object).isin(list(masked))[codes]
+    rows = np.repeat(np.arange(len(titles), dtype=np.int64), lengths)
+
+    # bigram: 같은 행의 이웃한 단어 쌍 (둘 다 제외 단어가 아닌 경우)
+    pair = (rows[1:] == rows[:-1]) & keep[1:] & keep[:-1]
+    with np.errstate(over='ignore'):
+        bigrams = hashes[:-1][pair] * _BIGRAM_MULTIPLIER + hashes[1:][pair] + np.uint64(1)
+    feature_rows = [rows[keep], rows[1:][pair]]
+    feature_hashes = [hashes[keep], bigrams]
+
+    if extra is not None:
+        extra_codes, extra_uniques = pd.factorize(extra.fillna('').astype(str))
+        present = extra_codes >= 0
+        feature_rows.append(np.flatnonzero(present))
+        feature_hashes.append(_token_hashes(list(extra_uniques), EXTRA_FIELD + '=')[extra_codes[present]])
+
+    features = (np.concatenate(feature_hashes) % np.uint64(size)).astype(np.int64)
+    combined = np.sort(np.concatenate(feature_rows) * size + features)
+    unique = np.ones(len(combined), dtype=bool)
+    np.not_equal(combined[1:], combined[:-1], out=unique[1:])
+    feature_rows, indices = np.divmod(combined[unique], size)
+    indptr = np.zeros(len(titles) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(feature_rows, minlength=len(titles)), out=indptr[1:])
+    return indptr, indices
+
+
+def _scores(weights: np.ndarray, bias: np.ndarray, indptr: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    # 행별 특징 가중치 합 + bias (특징이 없는 행은 bias만)
+    scores = np.tile(bias, (len(indptr) - 1, 1))
+    nonempty = np.diff(indptr) > 0
+    if nonempty.any():
+        scores[nonempty] += np.add.reduceat(weights[indices], indptr[:-1][nonempty], axis=0)
+    return scores
+
+
+def _softmax(scores: np.ndarray) -> np.ndarray:
+    scores = np.exp(scores - scores.max(axis=1, keepdims=True))
+    return scores / scores.sum(axis=1, keepdims=True)
+
+
+def _rows(indptr: np.ndarray, indices: np.ndarray, positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # positions 행만 골라낸 CSR
+    starts = indptr[positions]
+    lengths = indptr[positions + 1] - starts
+    sub_indptr = np.zeros(len(positions) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=sub_indptr[1:])
+    gather = np.repeat(starts - sub_indptr[:-1], lengths) + np.arange(sub_indptr[-1])
+    return sub_indptr, indices[gather]
+
+
+def train_softmax(indptr: np.ndarray, indices: np.ndarray, labels: np.ndarray, classes: int, bits: int = FEATURE_BITS,
+                  epochs: int = EPOCHS, batch_size: int = BATCH_SIZE, learning_rate: float = LEARNING_RATE,
+                  l2: float = L2, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    softmax 로지스틱 회귀 학습 (미니배치 Adagrad, 배치마다 사용된 특징 칸만 갱신)
+
+    Args:
+        indptr, indices: hashed_features 결과
+        labels: 행별 라벨 번호 (0 ~ classes - 1)
+
+    Returns:
+        (weights: 2^bits × classes, bias: classes)
+    """
+    rng = np.random.default_rng(seed)
+    weights = np.zeros((1 << bits, classes), dtype=np.float32)
+    bias = np.zeros(classes, dtype=np.float32)
+    weight_norms = np.zeros_like(weights)
+    bias_norms = np.zeros_like(bias)
+    targets = np.eye(classes, dtype=np.float32)
+
+    for _ in range(epochs):
+        order = rng.permutation(len(labels))
+        for start in range(0, len(order), batch_size):
+            positions = order[start:start + batch_size]
+            batch_indptr, batch_indices = _rows(indptr, indices, positions)
+            errors = (_softmax(_scores(weights, bias, batch_indptr, batch_indices))
+                      - targets[labels[positions]]) / len(positions)
+
+            # 특징 칸별 기울기 = 그 칸을 가진 행들의 오차 합 (사용된 칸만 모아서 계산)
+            used, feature_codes = np.unique(batch_indices, return_inverse=True)
+            row_of_feature = np.repeat(np.arange(len(positions)), np.diff(batch_indptr))
+            gradient = np.stack([np.bincount(feature_codes, weights=errors[row_of_feature, k], minlength=len(used))
+                                 for k in range(classes)], axis=1).astype(np.float32)
+            gradient += l2 * weights[used]
+            weight_norms[used] += gradient ** 2
+            weights[used] -= learning_rate * gradient / (np.sqrt(weight_norms[used]) + 1e-8)
+
+            bias_gradient = errors.sum(axis=0)
+            bias_norms += bias_gradient ** 2
+            bias -= learning_rate * bias_gradient / (np.sqrt(bias_norms) + 1e-8)
+    return weights, bias
+
+
+class TitleModel:
+    """
+    타깃별 해시 n-gram 선형 분류기 묶음
+
+    사용 예:
+        model = load_title_model(path)
+        labels, confidence = model.predict('Category', df['Title'], df['eBay category 1 name'])
+    """
+
+    def __init__(self, targets: Dict[str, Dict[str, object]], bits: int = FEATURE_BITS,
+                 meta: Optional[Dict[str, object]] = None):
+        """
+        Args:
+            targets: 타깃 이름 → {'weights', 'bias', 'labels', 'masked'}
+            bits: 특징 칸 수 (2^bits)
+            meta: 학습 정보 (taxonomy 버전, 학습 행 수, 타깃별 holdout 정확도 등)
+        """
+        self.targets = targets
+        self.bits = bits
+        self.meta = meta or {}
+
+    def select_targets(self, min_accuracy: float = MIN_TARGET_ACCURACY) -> 'TitleModel':
+        """
+        holdout 정확도가 min_accuracy 이상인 타깃만 남긴 모델 (정확도를 모르는 타깃은 제외)
+        """
+        accuracy = self.meta.get('holdout_accuracy', {})
+        targets = {name: model for name, model in self.targets.items()
+                   if accuracy.get(name) is not None and accuracy[name] >= min_accuracy}
+        return TitleModel(targets, self.bits, self.meta)
+
+    @property
+    def subcategory_targets(self) -> List[str]:
+        return [name[len(SUBCATEGORY_PREFIX):] for name in self.targets if name.startswith(SUBCATEGORY_PREFIX)]
+
+    def predict(self, target: str, titles: pd.Series, extra: Optional[pd.Series] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        행별 예측 라벨과 확률
+
+        Returns:
+            (라벨 object 배열, 확률 float 배열)
+        """
+        model = self.targets[target]
+        indptr, indices = hashed_features(titles, self.bits, model['masked'], extra)
+        probabilities = _softmax(_scores(model['weights'], model['bias'], indptr, indices))
+        best = probabilities.argmax(axis=1)
+        return model['labels'][best], probabilities[np.arange(len(best)), best]
+
+    def save(self, path: str):
+        """
+        .npz 하나로 저장 (라벨 / 제외 단어는 문자열 배열, 설정은 JSON 문자열)
+        """
+        arrays = {'meta': np.array(json.dumps({**self.meta, 'bits': self.bits, 'targets': list(self.targets)},
+                                              ensure_ascii=False))}
+        for number, model in enumerate(self.targets.values()):
+            arrays[f'{number}_weights'] = model['weights']
+            arrays[f'{number}_bias'] = model['bias']
+            arrays[f'{number}_labels'] = np.array(model['labels'], dtype=str)
+            arrays[f'{number}_masked'] = np.array(sorted(model['masked']), dtype=str)
+        temp_path = f'{path}.{os.getpid()}.tmp.npz'
+        np.savez(temp_path, **arrays)
+        os.replace(temp_path, path)
+
+
+@lru_cache(maxsize=None)
+def load_title_model(path: str) -> TitleModel:
+    """
+    저장된 모델 읽기 (같은 경로는 프로세스당 한 번만)
+    """
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(str(data['meta']))
+        targets = {name: {'weights': data[f'{number}_weights'], 'bias': data[f'{number}_bias'],
+                          'labels': data[f'{number}_labels'].astype(object),
+                          'masked': frozenset(data[f'{number}_masked'].tolist())}
+                   for number, name in enumerate(meta.pop('targets'))}
+    model = TitleModel(targets, meta.pop('bits'), meta)
+    if model.meta.get('taxonomy_version') != load_taxonomy().version:
+        print(f"[경고] 보조 분류 모델이 현재 CG_taxonomy.json과 다른 규칙으로 학습되었습니다: {path}")
+    return model
+
+
+def confident_labels(tokens, rules) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    규칙이 확실하게 정한 라벨 (키워드가 한 규칙에만 있는 행)
+
+    Args:
+        tokens: Title 토큰 행렬
+        rules: (라벨, 키워드 리스트) 튜플의 리스트
+
+    Returns:
+        (확실한 행 마스크, 행별 규칙 번호 - 확실하지 않은 행은 -1)
+    """
+    hits = np.stack([tokens.rows_with_any(keywords) for _, keywords in rules], axis=1)
+    confident = hits.sum(axis=1) == 1
+    return confident, np.where(confident, hits.argmax(axis=1), -1)
+
+
+def train_title_model(df: pd.DataFrame, bits: int = FEATURE_BITS, epochs: int = EPOCHS,
+                      holdout: float = HOLDOUT) -> Tuple[TitleModel, pd.DataFrame]:
+    """
+    규칙으로 라벨을 정한 행으로 Category / 카테고리별 Subcategory 모델 학습
+
+    Args:
+        df: Title 칼럼이 있는 DataFrame (eBay category 1 name 칼럼이 있으면 특징으로 사용)
+        holdout: 정확도 확인용으로 학습에서 뺄 비율
+
+    Returns:
+        (TitleModel, 타깃별 학습 행 수 / 라벨 수 / holdout 정확도 DataFrame)
+    """
+    taxonomy = load_taxonomy()
+    tokens = tokenize_titles(df['Title'])
+    extra = df[EXTRA_FIELD] if EXTRA_FIELD in df.columns else None
+    categories = match_tokens(tokens, *taxonomy.category_index, taxonomy.default)
+
+    tasks = [(CATEGORY_TARGET, np.arange(len(df)), taxonomy.category_rules)]
+    for category, rules in taxonomy.subcategory_rules.items():
+        tasks.append((SUBCATEGORY_PREFIX + category, np.flatnonzero(categories == category), rules))
+
+    rng = np.random.default_rng(0)
+    targets, report = {}, []
+    for name, positions, rules in tasks:
+        confident, rule_numbers = confident_labels(tokens.take(positions), rules)
+        positions, rule_numbers = positions[confident], rule_numbers[confident]
+        used_rules = np.unique(rule_numbers)
+        if len(positions) < MIN_TRAIN_ROWS or len(used_rules) < 2:
+            report.append({'target': name, 'rows': len(positions), 'labels': len(used_rules), 'holdout_accuracy': None})
+            continue
+
+        labels = np.searchsorted(used_rules, rule_numbers)
+        masked = frozenset(keyword for _, keywords in rules for keyword in keywords)
+        indptr, indices = hashed_features(df['Title'].iloc[positions], bits, masked,
+                                          None if extra is None else extra.iloc[positions])
+        is_holdout = rng.random(len(positions)) < holdout
+        train = np.flatnonzero(~is_holdout)
+        weights, bias = train_softmax(*_rows(indptr, indices, train), labels[train], len(used_rules), bits, epochs)
+
+        accuracy = None
+        if is_holdout.any():
+            test_indptr, test_indices = _rows(indptr, indices, np.flatnonzero(is_holdout))
+            predicted = _scores(weights, bias, test_indptr, test_indices).argmax(axis=1)
+            accuracy = round(float((predicted == labels[is_holdout]).mean()), 4)
+        targets[name] = {'weights': weights, 'bias': bias, 'masked': masked,
+                         'labels': np.array([rules[number][0] for number in used_rules], dtype=object)}
+        report.append({'target': name, 'rows': len(positions), 'labels': len(used_rules), 'holdout_accuracy': accuracy})
+
+    meta = {'taxonomy_version': taxonomy.version, 'rows': len(df), 'extra_field': extra is not None,
+            'trained_at': datetime.now().isoformat(timespec='seconds'),
+            'holdout_accuracy': {row['target']: row['holdout_accuracy'] for row in report if row['target'] in targets}}
+    return TitleModel(targets, bits, meta), pd.DataFrame(report)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Others 행 보조 분류 모델 학습')
+    parser.add_argument('--input-dir', default=SCRIPT_DIR, help='리스팅 파일 디렉토리 (기본값: 스크립트 위치)')
+    parser.add_argument('--output', default=DEFAULT_MODEL_PATH, help=f'모델 저장 경로 (기본값: {DEFAULT_MODEL_PATH})')
+    parser.add_argument('--bits', type=int, default=FEATURE_BITS, help='특징 해시 칸 수 (2^bits)')
+    parser.add_argument('--epochs', type=int, default=EPOCHS, help='학습 반복 횟수')
+    parser.add_argument('--threshold', type=float, default=MODEL_THRESHOLD, help='Others 예측 확인용 임계값')
+    parser.add_argument('--min-accuracy', type=float, default=MIN_TARGET_ACCURACY,
+                        help='예측에 사용할 타깃의 최소 holdout 정확도 (확인용)')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    listing_path = os.path.join(args.input_dir, LISTING_FILE)
+    df = pd.read_csv(listing_path, dtype=str, encoding='utf-8-sig',
+                     usecols=lambda column: column in ('Title', EXTRA_FIELD))
+    print(f"리스팅 파일 로드: {listing_path} ({len(df):,}개 행)")
+
+    model, report = train_title_model(df, args.bits, args.epochs)
+    model.save(args.output)
+    print(f"\n=== 타깃별 학습 결과 ===")
+    report['used'] = report['target'].isin(model.select_targets(args.min_accuracy).targets)
+    print(report.to_string(index=False))
+    print(f"holdout 정확도 {args.min_accuracy} 미만 / 학습하지 않은 타깃은 CG_run_pipeline.py에서 사용하지 않음")
+
+    # 규칙으로 Others인 행 중 임계값 이상으로 예측되는 비율
+    taxonomy = load_taxonomy()
+    others = match_tokens(tokenize_titles(df['Title']), *taxonomy.category_index, taxonomy.default) == taxonomy.default
+    if CATEGORY_TARGET in model.targets and others.any():
+        extra = df.loc[others, EXTRA_FIELD] if EXTRA_FIELD in df.columns else None
+        labels, confidence = model.predict(CATEGORY_TARGET, df.loc[others, 'Title'], extra)
+        accepted = confidence >= args.threshold
+        print(f"\nCategory Others {int(others.sum()):,}개 중 임계값 {args.threshold} 이상: {int(accepted.sum()):,}개")
+        print(pd.Series(labels[accepted]).value_counts().to_string())
+
+    print(f"\n=== 완료 ===")
+    print(f"소요 시간: {time.perf_counter() - started:.1f}초")
+    print(f"파일 저장 완료: {args.output} ({os.path.getsize(args.output) / 1024 / 1024:.1f}MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+"""
+Title 토큰 행렬 모듈
+Title을 한 번만 토큰화(소문자 + 공백 분리, match_title과 같은 방식)해서 리스팅 × token 희소 행렬(CSR)로 만들고
+카테고리 / 하위 카테고리 규칙, 키워드 빈도 집계를 행렬 연산으로 처리
+
+- CSR: indptr(행별 시작 위치), indices(token id, 행마다 중복 없이 정렬), vocabulary(token id → token)
+  (scipy.sparse.csr_matrix((np.ones(len(indices)), indices, indptr))와 같은 배치, scipy 없이 numpy로 계산)
+- 규칙 매칭(CG_keyword_index.match_tokens): token별 우선순위 벡터를 행마다 최소값으로 모음 (np.minimum.reduceat)
+- 스냅샷 저장: 06_CG_title_tokens.parquet (Item number, title_key, tokens 리스트 = CSR 그대로) + _vocab.parquet
+- 새 스냅샷은 이전 날짜 폴더의 토큰 파일에서 같은 제목(title_key)의 행을 재사용하고 바뀐 제목만 토큰화
+  (token id는 이전 vocabulary를 이어서 사용하므로 날짜가 달라도 같은 token은 같은 id)
+- CG_run_pipeline은 청크마다 TokenSnapshot으로 토큰 행렬을 만들어 분류에 사용하고 토큰 파일도 함께 저장
+  (--incremental이면 이전 상태와 같은 행은 이전 토큰 파일의 같은 Item number 행을 그대로 사용)
+
+사용 예:
+    python CG_token_matrix.py --report 30
+"""
+
+import argparse
+import itertools
+import os
+import time
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from CG_incremental import find_previous_state
+from CG_title_cache import title_keys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+LISTING_FILE = '00_CG_eBay_active_listing_data.csv'
+TOKEN_FILE = '06_CG_title_tokens'
+VOCAB_SUFFIX = '_vocab'
+
+
+class TokenMatrix:
+    """
+    리스팅 × token 이진 희소 행렬 (CSR)
+    """
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, vocabulary: Sequence[str]):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.vocabulary = pd.Index(vocabulary, dtype=object)
+
+    def __len__(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def row_lengths(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def take(self, positions: np.ndarray) -> 'TokenMatrix':
+        """
+        positions 행만 골라낸 행렬 (vocabulary 공유)
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        starts = self.indptr[positions]
+        lengths = self.indptr[positions + 1] - starts
+        indptr = np.zeros(len(positions) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        # 새 행렬의 k번째 값 = 원래 행렬의 (행 시작 위치 + 행 안에서의 순서)
+        gather = np.repeat(starts - indptr[:-1], lengths) + np.arange(indptr[-1])
+        return TokenMatrix(indptr, self.indices[gather], self.vocabulary)
+
+    def row_min(self, values_by_token: np.ndarray, fill) -> np.ndarray:
+        """
+        행별로 token 값의 최소값 (행렬 × 벡터를 (min, ·) 연산으로), token이 없는 행은 fill
+        """
+        result = np.full(len(self), fill, dtype=values_by_token.dtype)
+        nonempty = self.row_lengths > 0
+        if nonempty.any():
+            # 빈 행은 구간이 없으므로 비어 있지 않은 행의 시작 위치만으로 구간을 나눔
+            result[nonempty] = np.minimum.reduceat(values_by_token[self.indices], self.indptr[:-1][nonempty])
+        return result
+
+    def document_frequency(self) -> pd.Series:
+        """
+        token별 포함된 행 수 (열 합계, 많은 순)
+        """
+        counts = np.bincount(self.indices, minlength=len(self.vocabulary))
+        return pd.Series(counts, index=self.vocabulary, name='rows').sort_values(ascending=False, kind='stable')
+
+    def rows_with_any(self, tokens) -> np.ndarray:
+        """
+        tokens 중 하나라도 포함한 행 마스크
+        """
+        wanted = np.zeros(len(self.vocabulary) + 1, dtype=np.int32)
+        wanted[self.vocabulary.get_indexer(list(tokens))] = 1
+        wanted[-1] = 0  # vocabulary에 없는 token(-1)
+        return self.row_min(-wanted[:-1], 0) < 0
+
+    def compact(self) -> 'TokenMatrix':
+        """
+        행에 나온 token만 남긴 vocabulary로 바꾼 행렬 (규칙 매칭은 vocabulary 전체를 계산하므로 청크 단위로 작게)
+        """
+        used, indices = np.unique(self.indices, return_inverse=True)
+        # used가 정렬되어 있으므로 행 안의 token id 순서가 유지됨
+        return TokenMatrix(self.indptr, indices, self.vocabulary[used])
+
+    @staticmethod
+    def vstack(matrices: List['TokenMatrix']) -> 'TokenMatrix':
+        """
+        같은 vocabulary(또는 앞쪽이 같은 vocabulary)의 행렬을 세로로 이어 붙이기 (마지막 vocabulary 사용)
+        """
+        offsets = np.cumsum([0] + [len(matrix.indices) for matrix in matrices[:-1]])
+        indptr = np.concatenate([[0]] + [matrix.indptr[1:] + offset for matrix, offset in zip(matrices, offsets)])
+        indices = np.concatenate([matrix.indices for matrix in matrices])
+        return TokenMatrix(indptr, indices, matrices[-1].vocabulary)
+
+
+def tokenize_titles(titles: pd.Series, vocabulary: Optional[Sequence[str]] = None) -> TokenMatrix:
+    """
+    Title 칼럼 전체를 토큰 행렬로 변환
+
+    Args:
+        titles: Title 칼럼
+        vocabulary: 이어서 사용할 vocabulary (없는 token은 뒤에 추가)
+
+    Returns:
+        titles 순서의 TokenMatrix
+    """
+    words = titles.fillna('').astype(str).str.lower().str.split()
+    lengths = words.str.len().to_numpy(dtype=np.int64)
+    tokens = pd.Series(list(itertools.chain.from_iterable(words)), dtype=object)
+
+    # 고유 token만 vocabulary에서 찾고(없는 token은 뒤에 추가) 코드로 펼침
+    local_codes, uniques = pd.factorize(tokens)
+    vocabulary = pd.Index([] if vocabulary is None else vocabulary, dtype=object)
+    unique_codes = vocabulary.get_indexer(uniques)
+    unknown = unique_codes < 0
+    if unknown.any():
+        unique_codes[unknown] = len(vocabulary) + np.arange(unknown.sum())
+        vocabulary = vocabulary.append(pd.Index(uniques[unknown], dtype=object))
+    codes = unique_codes[local_codes].astype(np.int64)
+
+    # 행 안에서 중복 token 제거 + 정렬: (행, token)을 한 정수로 묶어서 정렬한 뒤 같은 값 제거
+    width = max(len(vocabulary), 1)
+    pairs = np.sort(np.repeat(np.arange(len(titles), dtype=np.int64), lengths) * width + codes)
+    keep = np.ones(len(pairs), dtype=bool)
+    np.not_equal(pairs[1:], pairs[:-1], out=keep[1:])
+    rows, indices = np.divmod(pairs[keep], width)
+    indptr = np.zeros(len(titles) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=len(titles)), out=indptr[1:])
+    return TokenMatrix(indptr, indices, vocabulary)
+
+
+class TokenMatrixWriter:
+    """
+    토큰 행렬을 청크 단위로 이어서 저장 (행 파일은 row group 추가, vocabulary 파일은 마지막에 한 번)
+    """
+
+    SCHEMA = pa.schema([('Item number', pa.string()), ('title_key', pa.int64()), ('tokens', pa.list_(pa.int32()))])
+
+    def __init__(self, base_path: str):
+        self.path = base_path + '.parquet'
+        self.vocab_path = base_path + VOCAB_SUFFIX + '.parquet'
+        self.rows = 0
+        self._writer = pq.ParquetWriter(self.path, self.SCHEMA)
+
+    def write(self, matrix: TokenMatrix, item_numbers: pd.Series, keys: pd.Series):
+        # 행 파일의 tokens 리스트 칼럼이 CSR indptr / indices와 같은 구조
+        tokens = pa.ListArray.from_arrays(pa.array(matrix.indptr, pa.int64()).cast(pa.int32()),
+                                          pa.array(matrix.indices, pa.int32()))
+        self._writer.write_table(pa.table([pa.array(item_numbers.astype(str).tolist(), pa.string()),
+                                           pa.array(keys.to_numpy(dtype=np.int64)), tokens], schema=self.SCHEMA))
+        self.rows += len(matrix)
+
+    def close(self, vocabulary: Sequence[str]):
+        """
+        Args:
+            vocabulary: 저장한 모든 행의 token id에 해당하는 vocabulary (마지막 청크까지의 vocabulary)
+        """
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            pq.write_table(pa.table({'token': pa.array(list(vocabulary), pa.string())}), self.vocab_path)
+
+
+def save_token_matrix(matrix: TokenMatrix, base_path: str, item_numbers: pd.Series, keys: pd.Series) -> str:
+    """
+    토큰 행렬 저장
+
+    Returns:
+        행 파일 경로
+    """
+    writer = TokenMatrixWriter(base_path)
+    writer.write(matrix, item_numbers, keys)
+    writer.close(matrix.vocabulary)
+    return writer.path
+
+
+def load_token_matrix(path: str) -> Tuple[TokenMatrix, pd.DataFrame]:
+    """
+    저장된 토큰 행렬 읽기
+
+    Args:
+        path: 행 파일 경로 (.parquet)
+
+    Returns:
+        (TokenMatrix, Item number / title_key DataFrame)
+    """
+    table = pq.read_table(path)
+    tokens = table.column('tokens').combine_chunks()
+    vocabulary = pq.read_table(path[:-len('.parquet')] + VOCAB_SUFFIX + '.parquet').column('token').to_pylist()
+    matrix = TokenMatrix(tokens.offsets.to_numpy(), tokens.values.to_numpy(), vocabulary)
+    rows = table.select(['Item number', 'title_key']).to_pandas()
+    return matrix, rows
+
+
+def update_token_matrix(titles: pd.Series, previous: Optional[Tuple[TokenMatrix, pd.DataFrame]] = None
+                        ) -> Tuple[TokenMatrix, pd.Series, int]:
+    """
+    이전 토큰 행렬에 같은 제목이 있으면 재사용하고 나머지 제목만 토큰화
+
+    Args:
+        titles: Title 칼럼
+        previous: load_token_matrix 결과 (없으면 전체 토큰화)
+
+    Returns:
+        (titles 순서의 TokenMatrix, title_key 칼럼, 재사용한 행 수)
+    """
+    keys = title_keys(titles)
+    if previous is None:
+        return tokenize_titles(titles), keys, 0
+
+    previous_matrix, previous_rows = previous
+    positions = _first_positions(previous_rows['title_key']).get_indexer(keys)
+    matrix = _merge_rows(previous_matrix, positions, titles, previous_matrix.vocabulary)
+    return matrix, keys, int((positions >= 0).sum())
+
+
+def _first_positions(values: pd.Series) -> pd.Series:
+    # 값 → 처음 나온 행 위치 (같은 값이 여러 행이면 처음 나온 행을 사용)
+    first = ~values.duplicated().to_numpy()
+    return pd.Series(np.flatnonzero(first), index=values.to_numpy()[first])
+
+
+def _merge_rows(previous_matrix: Optional[TokenMatrix], positions: np.ndarray, titles: pd.Series,
+                vocabulary: Sequence[str]) -> TokenMatrix:
+    # positions >= 0인 행은 이전 행렬의 그 행, 나머지는 vocabulary를 이어서 토큰화한 뒤 원래 순서로
+    reused = positions >= 0
+    new_part = tokenize_titles(titles[~reused], vocabulary)
+    if not reused.any():
+        return new_part
+    combined = TokenMatrix.vstack([previous_matrix.take(positions[reused]), new_part])
+    order = np.empty(len(titles), dtype=np.int64)
+    order[np.flatnonzero(reused)] = np.arange(reused.sum())
+    order[np.flatnonzero(~reused)] = reused.sum() + np.arange((~reused).sum())
+    return combined.take(order)
+
+
+class TokenSnapshot:
+    """
+    청크 단위 토큰 행렬 생성 (CG_run_pipeline용)
+
+    이전 상태와 같은 행(Title도 같음)은 이전 토큰 파일의 같은 Item number 행을 그대로 사용하고 나머지 행만 토큰화
+    (제목 해시로 찾는 update_token_matrix보다 싸게, 이미 아는 행 단위 비교 결과를 사용)
+    vocabulary는 이전 토큰 파일에서 이어서 청크 사이에도 공유하므로 모든 청크의 token id가 같은 vocabulary 기준
+
+    사용 예:
+        snapshot = TokenSnapshot(load_token_matrix(previous_path))
+        tokens, keys = snapshot.update(df['Title'], df['Item number'], unchanged)
+    """
+
+    def __init__(self, previous: Optional[Tuple[TokenMatrix, pd.DataFrame]] = None):
+        """
+        Args:
+            previous: load_token_matrix 결과 (없으면 모든 행 토큰화)
+        """
+        self.previous_matrix, self.previous_rows = previous if previous is not None else (None, None)
+        self.vocabulary = self.previous_matrix.vocabulary if previous is not None else pd.Index([], dtype=object)
+        self._positions = _first_positions(self.previous_rows['Item number']) if previous is not None else None
+        self.reused = 0
+        self.tokenized = 0
+
+    def update(self, titles: pd.Series, item_numbers: pd.Series, reusable: np.ndarray
+               ) -> Tuple[TokenMatrix, pd.Series]:
+        """
+        청크 하나의 토큰 행렬
+
+        Args:
+            titles: Title 칼럼
+            item_numbers: Item number 칼럼
+            reusable: 이전 토큰 파일의 행을 그대로 사용해도 되는 행 마스크 (이전 상태와 같은 행)
+
+        Returns:
+            (titles 순서의 TokenMatrix, title_key 칼럼) - 토큰화한 행만 title_key를 새로 계산
+        """
+        positions = np.full(len(titles), -1, dtype=np.int64)
+        if self._positions is not None and reusable.any():
+            found = self._positions.reindex(item_numbers[reusable].to_numpy())
+            positions[reusable] = found.fillna(-1).astype(np.int64)
+        reused = positions >= 0
+
+        matrix = _merge_rows(self.previous_matrix, positions, titles, self.vocabulary)
+        self.vocabulary = matrix.vocabulary
+
+        keys = np.empty(len(titles), dtype=np.int64)
+        if reused.any():
+            keys[reused] = self.previous_rows['title_key'].to_numpy()[positions[reused]]
+        if not reused.all():
+            keys[~reused] = title_keys(titles[~reused]).to_numpy()
+        self.reused += int(reused.sum())
+        self.tokenized += int((~reused).sum())
+        return matrix, pd.Series(keys, index=titles.index)
+
+
+def rule_coverage(matrix: TokenMatrix, rules) -> pd.DataFrame:
+    """
+    규칙별 키워드를 포함한 행 수 (우선순위와 관계없이)
+
+    Args:
+        rules: (라벨, 키워드 리스트) 튜플의 리스트
+
+    Returns:
+        label, rows, share(%) DataFrame
+    """
+    counts = [(label, int(matrix.rows_with_any(keywords).sum())) for label, keywords in rules]
+    report = pd.DataFrame(counts, columns=['label', 'rows'])
+    report['share'] = (report['rows'] / max(len(matrix), 1) * 100).round(2)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Title 토큰 행렬 생성 (이전 날짜 폴더의 토큰 파일 재사용)')
+    parser.add_argument('--input-dir', default=SCRIPT_DIR, help='리스팅 파일 디렉토리 (기본값: 스크립트 위치)')
+    parser.add_argument('--output-dir', default=None, help='토큰 파일 저장 디렉토리 (기본값: 입력 디렉토리)')
+    parser.add_argument('--previous', default=None, help='이전 토큰 파일 경로 (기본값: 이전 날짜 폴더에서 탐색)')
+    parser.add_argument('--full', action='store_true', help='이전 토큰 파일을 사용하지 않고 전체 토큰화')
+    parser.add_argument('--report', type=int, default=0, help='많이 나온 token 상위 N개와 카테고리 규칙별 행 수 출력')
+    args = parser.parse_args()
+    output_dir = args.output_dir or args.input_dir
+
+    started = time.perf_counter()
+    listing_path = os.path.join(args.input_dir, LISTING_FILE)
+    df = pd.read_csv(listing_path, usecols=['Item number', 'Title'], dtype=str, encoding='utf-8-sig')
+    print(f"리스팅 파일 로드: {listing_path} ({len(df):,}개 행)")
+
+    previous = None
+    previous_path = None if args.full else (args.previous or find_previous_state(output_dir, TOKEN_FILE + '.parquet'))
+    if previous_path:
+        previous = load_token_matrix(previous_path)
+        print(f"이전 토큰 파일 로드: {previous_path} ({len(previous[0]):,}개 행, token {len(previous[0].vocabulary):,}개)")
+
+    matrix, keys, reused = update_token_matrix(df['Title'], previous)
+    path = save_token_matrix(matrix, os.path.join(output_dir, TOKEN_FILE), df['Item number'], keys)
+
+    print(f"\n=== 완료 ===")
+    print(f"행 수: {len(matrix):,} (재사용: {reused:,}, 토큰화: {len(matrix) - reused:,})")
+    print(f"token 수: {len(matrix.vocabulary):,}, 0이 아닌 값: {len(matrix.indices):,}")
+    print(f"소요 시간: {time.perf_counter() - started:.1f}초")
+    print(f"파일 저장 완료: {path}")
+
+    if args.report:
+        from CG_taxonomy import load_taxonomy
+        print(f"\n=== 많이 나온 token 상위 {args.report}개 (포함된 행 수) ===")
+        print(matrix.document_frequency().head(args.report).to_string())
+        print(f"\n=== 카테고리 규칙별 키워드 포함 행 수 ===")
+        print(rule_coverage(matrix, load_taxonomy().category_rules).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+eBay 업로드(Revise) 상태 저장소 (SQLite)
+ItemID별로 마지막으로 업로드가 확인된 StoreCategory를 저장해 두고,
+새로 생긴 ItemID와 StoreCategory가 바뀐 ItemID만 업로드 파일(06_)에 넣음
+
+- 업로드 파일을 만들 때는 상태를 바꾸지 않고, 업로드가 성공한 것이 확인된 행만 저장
+  (CG_revise_client.py는 성공한 배치만 저장, 손으로 올린 경우 python CG_upload_state.py --confirm <업로드 파일>)
+- 업로드하지 않았거나 실패한 행은 확인될 때까지 다음 업로드 파일에도 계속 들어감
+- 날짜 폴더끼리 공유하도록 기본 경로는 Categorization 폴더
+"""
+
+import argparse
+import os
+import sqlite3
+import time
+from typing import Dict, Iterable, List
+
+import pandas as pd
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_STATE_PATH = os.path.join(os.path.dirname(SCRIPT_DIR), 'CG_upload_state.sqlite')
+
+# CG_FULL_UPLOAD=1이면 바뀌지 않은 행도 모두 업로드 파일에 넣음
+FULL_UPLOAD = os.environ.get('CG_FULL_UPLOAD', '0') == '1'
+
+# SQLite 한 쿼리의 바인딩 변수 수 제한보다 작게
+QUERY_BATCH_SIZE = 900
+
+
+class UploadState:
+    """
+    ItemID → 마지막으로 업로드가 확인된 StoreCategory 저장소
+
+    사용 예:
+        state = UploadState(path)
+        df_delta = state.select_delta(df_upload)   # 새로 생겼거나 바뀐 행만
+        ...                                        # 업로드
+        state.confirm(df_uploaded)                 # 업로드가 성공한 행만
+        print(state.counts)
+        state.close()
+    """
+
+    def __init__(self, path: str = DEFAULT_STATE_PATH, full: bool = FULL_UPLOAD):
+        self.path = path
+        self.full = full
+        self.counts = {'total': 0, 'new': 0, 'changed': 0, 'unchanged': 0}
+
+        self._conn = sqlite3.connect(path)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS uploads ('
+                           'item_id TEXT PRIMARY KEY, store_category TEXT NOT NULL, uploaded_at INTEGER NOT NULL)')
+        self._conn.commit()
+
+    @staticmethod
+    def _batches(values: List[str]) -> Iterable[List[str]]:
+        for start in range(0, len(values), QUERY_BATCH_SIZE):
+            yield values[start:start + QUERY_BATCH_SIZE]
+
+    def _lookup(self, item_ids: List[str]) -> Dict[str, str]:
+        stored = {}
+        for batch in self._batches(item_ids):
+            placeholders = ','.join('?' * len(batch))
+            stored.update(self._conn.execute(
+                f'SELECT item_id, store_category FROM uploads WHERE item_id IN ({placeholders})', batch).fetchall())
+        return stored
+
+    def select_delta(self, df_upload: pd.DataFrame) -> pd.DataFrame:
+        """
+        업로드 행 중 새로 생겼거나 StoreCategory가 바뀐 행만 선택 (full 모드이면 전체)
+
+        Args:
+            df_upload: Action, ItemID, StoreCategory 칼럼이 있는 업로드 DataFrame
+
+        Returns:
+            업로드 파일에 넣을 행
+        """
+        item_ids = df_upload['ItemID'].astype(str)
+        stored = pd.Series(self._lookup(item_ids.unique().tolist()), dtype=object)
+        previous = item_ids.map(stored)
+
+        is_new = previous.isna()
+        is_changed = ~is_new & (previous != df_upload['StoreCategory'].astype(str))
+
+        self.counts['total'] += len(df_upload)
+        self.counts['new'] += int(is_new.sum())
+        self.counts['changed'] += int(is_changed.sum())
+        self.counts['unchanged'] += int((~is_new & ~is_changed).sum())
+
+        if self.full:
+            return df_upload
+        return df_upload[(is_new | is_changed).to_numpy()]
+
+    def confirm(self, df_upload: pd.DataFrame):
+        """
+        업로드가 성공한 것이 확인된 행의 StoreCategory 저장 (이후 같은 StoreCategory면 업로드 파일에서 제외)
+        """
+        uploaded_at = int(time.time())
+        self._conn.executemany(
+            'INSERT OR REPLACE INTO uploads (item_id, store_category, uploaded_at) VALUES (?, ?, ?)',
+            zip(df_upload['ItemID'].astype(str).tolist(), df_upload['StoreCategory'].astype(str).tolist(),
+                [uploaded_at] * len(df_upload)))
+        self._conn.commit()
+
+    def summary(self) -> str:
+        """
+        업로드 행 수 요약 문자열
+        """
+        counts = self.counts
+        return (f"전체 {counts['total']:,}개 중 새 항목 {counts['new']:,}, 변경 {counts['changed']:,}, "
+                f"변경 없음 {counts['unchanged']:,}" + (' (전체 업로드)' if self.full else ''))
+
+    def close(self):
+        self._conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='업로드 상태 저장소에 업로드가 확인된 행 저장')
+    parser.add_argument('--confirm', required=True, help='업로드에 성공한 업로드 파일 (Action, ItemID, StoreCategory)')
+    parser.add_argument('--state', default=DEFAULT_STATE_PATH, help=f'업로드 상태 경로 (기본값: {DEFAULT_STATE_PATH})')
+    args = parser.parse_args()
+
+    df_upload = pd.read_csv(args.confirm, dtype=str)
+    state = UploadState(args.state)
+    try:
+        state.confirm(df_upload)
+    finally:
+        state.close()
+    print(f"업로드 확인 저장 완료: {args.confirm} ({len(df_upload):,}행) → {args.state}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import os
+import sys
+
+import pytest
+
+STAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 단계별 스크립트와 같은 방식으로 CG_ 모듈을 import (Categorization/260224, Categorization/common)
+sys.path.insert(0, STAGE_DIR)
+sys.path.append(os.path.join(os.path.dirname(STAGE_DIR), 'common'))
+
+from CG_run_pipeline import load_stage
+
+
+@pytest.fixture(scope='session')
+def brand_stage():
+    return load_stage('01_CG_parsing_brand.py')
+
+
+@pytest.fixture(scope='session')
+def category_stage():
+    return load_stage('02_CG_categorization.py')
+
+
+@pytest.fixture(scope='session')
+def subcategory_stage():
+    return load_stage('03_CG_subcategorization.py')
+
+
+@pytest.fixture(scope='session')
+def upload_stage():
+    return load_stage('04_CG_preprocessing_uploads_eBay.py')
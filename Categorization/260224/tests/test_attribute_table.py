@@ -0,0 +1,53 @@
+import json
+
+import pandas as pd
+
+from CG_attribute_table import build_attribute_table, flatten_spec
+
+
+def test_flatten_spec_nested_objects():
+    spec = {'Brand': 'Gucci', 'spec': {'Color': 'Black', 'size': {'width': 46, 'unit': 'cm'}},
+            'images': ['a.jpg', 'b.jpg'], 'origin_id': 'x', 'empty': None}
+    assert flatten_spec(json.dumps(spec)) == {
+        'brand': 'Gucci', 'spec_color': 'Black', 'spec_size_width': 46, 'spec_size_unit': 'cm',
+        'images': 'a.jpg | b.jpg', 'spec_origin_id': 'x'}
+    assert flatten_spec('{"brand": "X", bad}') == {}
+    assert flatten_spec('["brand"]') == {}
+
+
+def write_db(path, raw_data):
+    pd.DataFrame({'origin_id': [str(i) for i in range(len(raw_data))],
+                  'raw_data': [json.dumps(spec) for spec in raw_data]}).to_csv(path, index=False)
+
+
+def read_sorted(path):
+    return pd.read_parquet(path).sort_values('origin_id').reset_index(drop=True)
+
+
+def test_build_attribute_table_reuses_unchanged_rows(tmp_path):
+    db_path = str(tmp_path / 'db.csv')
+    attribute_path = str(tmp_path / 'attributes.parquet')
+    raw_data = [{'brand': 'Gucci', 'spec': {'size': {'width': 46 + i}}, 'flag': i % 2 == 0} for i in range(10)]
+    write_db(db_path, raw_data)
+    stats = build_attribute_table(db_path, attribute_path, chunk_size=3)
+    assert stats == {'rows': 10, 'parsed': 10, 'reused': 0}
+    table = read_sorted(attribute_path)
+    assert str(table['spec_size_width'].dtype) == 'Int64'
+    assert str(table['flag'].dtype) == 'boolean'
+
+    # 일부 행만 바뀌고 정수 칼럼에 실수 값이 섞이면 Float64
+    raw_data[4] = {'brand': 'Prada', 'spec': {'size': {'width': 10.5}}, 'extra': 'new'}
+    write_db(db_path, raw_data)
+    stats = build_attribute_table(db_path, attribute_path, chunk_size=3)
+    assert stats == {'rows': 10, 'parsed': 1, 'reused': 9}
+    incremental = read_sorted(attribute_path)
+    build_attribute_table(db_path, attribute_path, chunk_size=3, force=True)
+    pd.testing.assert_frame_equal(incremental, read_sorted(attribute_path))
+    assert str(incremental['spec_size_width'].dtype) == 'Float64'
+
+    # 숫자 칼럼에 문자열이 섞이면 전체 다시 파싱 (정수 값은 '47'처럼 str(값))
+    raw_data[5] = {'brand': 'Dior', 'spec': {'size': {'width': 'wide'}}}
+    write_db(db_path, raw_data)
+    build_attribute_table(db_path, attribute_path, chunk_size=3)
+    table = read_sorted(attribute_path)
+    assert table['spec_size_width'].tolist()[:6] == ['46', '47', '48', '49', '10.5', 'wide']
@@ -0,0 +1,17 @@
+import pandas as pd
+
+from CG_brand_index import check_regressions, load_brand_index
+from CG_brand_trie import load_brand_trie
+
+
+def test_brand_regressions():
+    assert check_regressions(load_brand_index()) == []
+
+
+def test_common_word_aliases_are_not_title_brands():
+    titles = pd.Series(['4 channel audio mixer bag', 'Cheap channel bag', 'Coco Chanel flap bag'])
+    assert [load_brand_index().find_alias(title) for title in titles] == [None, None, 'Chanel']
+
+    found = load_brand_trie().find(titles)
+    assert found.iloc[:2].isna().all()
+    assert found.iloc[2] == 'Chanel'
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+from CG_keyword_index import build_keyword_index, match_title, match_titles, match_tokens
+from CG_taxonomy import load_taxonomy
+from CG_token_matrix import tokenize_titles
+
+TAXONOMY = load_taxonomy()
+
+
+def ordered_any(title, rules, default='Others'):
+    # 규칙을 순서대로 확인하는 원래 방식 (if any(keyword in title_words ...): return label)
+    if pd.isna(title) or title == '':
+        return default
+    title_words = str(title).lower().split()
+    for label, keywords in rules:
+        if any(keyword in title_words for keyword in keywords):
+            return label
+    return default
+
+
+def sample_titles(rules, size=3000, seed=0):
+    # 여러 규칙의 키워드가 섞인 제목 (대소문자, 붙은 문장부호, 빈 값 포함)
+    rng = np.random.default_rng(seed)
+    keywords = sorted({keyword for _, words in rules for keyword in words})
+    fillers = ['gucci', 'vintage', 'black', 'leather', 'new', 'authentic', 'bag,', '(watch)', 'Size']
+    titles = []
+    for _ in range(size):
+        words = list(rng.choice(keywords, rng.integers(0, 4))) + list(rng.choice(fillers, rng.integers(0, 4)))
+        rng.shuffle(words)
+        titles.append(' '.join(word.upper() if rng.random() < 0.2 else word for word in words))
+    return pd.Series(titles + ['', '   ', None, np.nan, 'Bag  Watch\tshoes'], dtype=object)
+
+
+def rule_tables():
+    yield TAXONOMY.category_rules
+    yield from TAXONOMY.subcategory_rules.values()
+
+
+def test_keyword_priority_matches_ordered_scan():
+    for rules in rule_tables():
+        keyword_index, priority_to_label = build_keyword_index(rules)
+        titles = sample_titles(rules)
+        expected = [ordered_any(title, rules) for title in titles]
+
+        assert [match_title(title, keyword_index, priority_to_label) for title in titles] == expected
+        labels = match_titles(titles, keyword_index, priority_to_label)
+        assert labels.index.equals(titles.index)
+        assert labels.tolist() == expected
+        # 여러 규칙이 같은 토큰 행렬을 공유해도 (vocabulary에 다른 규칙의 token이 섞여도) 같은 결과
+        other = sample_titles(TAXONOMY.category_rules, 100, seed=1)
+        shared = tokenize_titles(pd.concat([other, titles]))
+        assert match_tokens(shared.take(np.arange(len(other), len(other) + len(titles))),
+                            keyword_index, priority_to_label).tolist() == expected
+
+
+def test_keyword_in_several_rules_uses_first_rule():
+    rules = [('A', ['x', 'y']), ('B', ['y', 'z']), ('C', ['z'])]
+    titles = pd.Series(['z y', 'z', 'Y', 'w', '', 'z x'])
+    assert match_titles(titles, *build_keyword_index(rules), default='D').tolist() == ['A', 'B', 'A', 'D', 'D', 'A']
+
+
+def test_categorize_titles_matches_ordered_scan(category_stage):
+    titles = sample_titles(TAXONOMY.category_rules, seed=2)
+    expected = [ordered_any(title, TAXONOMY.category_rules, TAXONOMY.default) for title in titles]
+    assert category_stage.categorize_titles(titles).tolist() == expected
+    assert category_stage.categorize_titles(titles, tokenize_titles(titles)).tolist() == expected
+    assert [category_stage.categorize_ebay_category(title) for title in titles] == expected
@@ -0,0 +1,39 @@
+import json
+
+import CG_metrics
+
+
+def _without_unix_modules(monkeypatch):
+    # Windows처럼 /proc와 resource 모듈이 없는 환경
+    def no_proc(*args, **kwargs):
+        raise OSError('no /proc')
+
+    monkeypatch.setattr(CG_metrics, 'open', no_proc, raising=False)
+    monkeypatch.setattr(CG_metrics, 'resource', None)
+
+
+def test_metrics_without_resource(tmp_path, monkeypatch):
+    _without_unix_modules(monkeypatch)
+    monkeypatch.setattr(CG_metrics, 'psutil', None)
+    assert CG_metrics.peak_rss_bytes() is None
+    assert CG_metrics._cpu_seconds() >= 0
+    record = CG_metrics.StageMetrics('02_categorization').finish()
+    monkeypatch.undo()
+
+    # 측정하지 못한 최대 메모리는 null로 기록하고 Prometheus 지표에서는 빠짐
+    assert record['peak_rss_bytes'] is None
+    assert '"peak_rss_bytes": null' in json.dumps(record)
+    prom_path = tmp_path / 'metrics.prom'
+    CG_metrics.write_prometheus(str(prom_path), record)
+    text = prom_path.read_text(encoding='utf-8')
+    assert 'cg_stage_wall_seconds' in text and 'cg_stage_peak_rss_bytes' not in text
+
+
+def test_peak_rss_from_psutil(monkeypatch):
+    class Process:
+        def memory_info(self):
+            return type('MemoryInfo', (), {'rss': 1, 'peak_wset': 4096})()
+
+    _without_unix_modules(monkeypatch)
+    monkeypatch.setattr(CG_metrics, 'psutil', type('psutil', (), {'Process': Process}))
+    assert CG_metrics.peak_rss_bytes() == 4096
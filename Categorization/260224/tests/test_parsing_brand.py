@@ -0,0 +1,94 @@
+import json
+
+import pandas as pd
+import pytest
+
+# json.loads로 전체 파싱한 결과와 비교할 raw_data (잘못된 JSON 포함)
+RAW_DATA = [
+    '',
+    '{}',
+    '{"brand": "Gucci"}',
+    '  {"brand": "Gucci"}\n',
+    '{"Brand": "Prada"}',
+    '{"brand": "", "Brand": "Prada"}',
+    '{"brand": ["Loewe", "Tiffany & Co."]}',
+    '{"brand": []}',
+    '{"brand": [1, "Loewe"]}',
+    '{"brand": 123}',
+    '{"brand": 1.5e3}',
+    '{"brand": null}',
+    '{"brand": true}',
+    '{"brand": {"name": "Coach"}}',
+    '{"brand": "Gu\\"cci\\u00e9"}',
+    '{"brand": "A", "brand": "B"}',
+    '{"spec": {"brand": "Nested"}, "title": "x"}',
+    '{"spec": {"brand": "Nested"}, "brand": "Top"}',
+    '{"title": "the \\"brand\\": \\"Fake\\" text", "brand": "Real"}',
+    '{"title": "{brand}", "brand": "Celine"}',
+    '{"brand": NaN}',
+    '{"brand": Infinity}',
+    '{"brand": 123456789012345678901234567890}',
+    '{"brand": "\\ud800"}',
+    '["brand", "Gucci"]',
+    '"brand"',
+    '   ',
+    # 잘못된 JSON
+    '{"brand": "X", bad}',
+    '{"brand": "X" "y"}',
+    '{"brand":"X"}garbage}',
+    '{"brand": "X"',
+    '{"brand": "X",}',
+    "{'brand': 'X'}",
+    '{"brand": "X\tY"}',
+    '{"brand": "\\x"}',
+    '{"brand": "X"} {"brand": "Y"}',
+    '{"spec": {"color": "Black"}, "brand": "X"}}',
+    '{"spec": {"color": "Black", "brand": "X"}',
+    'not json',
+    '{"title": "no brand", bad}',
+]
+
+
+def reference_brand(spec_str):
+    """기존 방식: json.loads 전체 파싱 (brand 값, JSON 파싱 실패 여부)"""
+    if not spec_str:
+        return '', False
+    try:
+        spec_dict = json.loads(spec_str)
+    except json.JSONDecodeError:
+        return '', True
+    if not isinstance(spec_dict, dict):
+        return '', False
+    for key in ('brand', 'Brand'):
+        if key in spec_dict:
+            value = spec_dict[key]
+            if isinstance(value, str):
+                brand = value
+            elif isinstance(value, list) and len(value) > 0:
+                brand = str(value[0])
+            else:
+                brand = str(value)
+            if brand:
+                return brand, False
+    return '', False
+
+
+@pytest.mark.parametrize('spec_str', RAW_DATA)
+def test_scan_brand_matches_json_loads(brand_stage, spec_str):
+    brand = brand_stage.scan_brand(spec_str)
+    expected, json_error = reference_brand(spec_str)
+    if json_error:
+        # 잘못된 JSON은 빠른 경로에서 brand를 반환하지 않음
+        assert brand is None
+    elif brand is not None:
+        assert brand == expected
+
+
+def test_extract_brands_matches_json_loads(brand_stage):
+    raw_data = pd.Series(RAW_DATA + [None], index=range(100, 100 + len(RAW_DATA) + 1))
+    brands, parse_stats = brand_stage.extract_brands(raw_data)
+
+    expected = [reference_brand(spec_str) for spec_str in RAW_DATA + ['']]
+    assert brands.index.equals(raw_data.index)
+    assert brands.tolist() == [brand for brand, _ in expected]
+    assert parse_stats['json_errors'] == sum(json_error for _, json_error in expected)
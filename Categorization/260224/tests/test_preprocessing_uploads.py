@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+# 원래 04_ 스크립트에 조합별로 적혀 있던 시크 강남 Category_id
+KNOWN_CATEGORY_IDS = {
+    ('Accessaries', 'Bracelets'): 42101761010, ('Accessaries', 'Earrings'): 42103078010,
+    ('Accessaries', 'Necklaces'): 42101762010, ('Accessaries', 'Rings'): 42101763010,
+    ('Accessaries', 'Others'): 42101764010,
+    ('Bags', 'Crossbody'): 42101755010, ('Bags', 'Clutch'): 42101756010, ('Bags', 'Shoulder'): 42101757010,
+    ('Bags', 'Tote'): 42101758010, ('Bags', 'Others'): 42101759010,
+    ('Clothes', 'Outer'): 42101765010, ('Clothes', 'Pants & Skirts'): 42101766010,
+    ('Clothes', 'Tops'): 42101767010, ('Clothes', 'Dress'): 42103319010, ('Clothes', 'Others'): 42101768010,
+    ('Shoes', 'Boots'): 42101769010, ('Shoes', 'Heels'): 42101770010, ('Shoes', 'Dress'): 42101771010,
+    ('Shoes', 'Sneakers'): 42101772010, ('Shoes', 'Others'): 42101773010,
+    ('Watches', 'Breitling'): 42101774010, ('Watches', 'Cartier'): 42101775010,
+    ('Watches', 'Ferragamo'): 42101776010, ('Watches', 'Gucci'): 42101777010, ('Watches', 'Mido'): 42101778010,
+    ('Watches', 'Montblanc'): 42101779010, ('Watches', 'Omega'): 42101780010,
+    ('Watches', 'Tag Heuer'): 42101781010, ('Watches', 'Others'): 42101782010,
+}
+
+UNKNOWN_PAIRS = [('Others', 'Others'), ('Bags', 'Dress'), ('Watches', 'Rolex'), ('Shoes', None), (None, 'Others')]
+
+
+def test_assign_category_id_known_pairs(upload_stage):
+    pairs = list(KNOWN_CATEGORY_IDS) + UNKNOWN_PAIRS
+    df = pd.DataFrame(pairs[::-1] * 2, columns=['Category', 'Subcategory'], index=np.arange(len(pairs) * 2) + 500)
+    df['Item number'] = [str(100 + i) for i in range(len(df))]
+
+    result = upload_stage.assign_category_id(df.copy())
+    assert result.index.equals(df.index)
+    expected = [KNOWN_CATEGORY_IDS.get(pair, np.nan) for pair in zip(df['Category'], df['Subcategory'])]
+    np.testing.assert_array_equal(result['Category_id'].to_numpy(), np.array(expected, dtype='float64'))
+
+    # category dtype 칼럼(메모리 절약 모드)도 같은 결과
+    compact = df.astype({'Category': 'category', 'Subcategory': 'category'})
+    np.testing.assert_array_equal(upload_stage.assign_category_id(compact)['Category_id'].to_numpy(),
+                                  result['Category_id'].to_numpy())
+
+    upload = upload_stage.build_upload_frame(result)
+    assert len(upload) == len(KNOWN_CATEGORY_IDS) * 2
+    assert set(upload['StoreCategory']) == {str(category_id) for category_id in KNOWN_CATEGORY_IDS.values()}
+
+
+def test_taxonomy_category_ids_are_unique(upload_stage):
+    ids = upload_stage.CATEGORY_IDS
+    assert not ids.duplicated(['Category', 'Subcategory']).any()
+    assert dict(zip(zip(ids['Category'], ids['Subcategory']), ids['Category_id'])) == KNOWN_CATEGORY_IDS
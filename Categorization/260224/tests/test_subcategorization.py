@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from CG_token_matrix import tokenize_titles
+
+
+def row_by_row(stage, chunk):
+    # 행마다 Category에 맞는 하위 카테고리 함수를 부르는 원래 방식
+    functions = {'Bags': stage.get_subcategory_bags, 'Clothes': stage.get_subcategory_clothes,
+                 'Shoes': stage.get_subcategory_shoes, 'Accessaries': stage.get_subcategory_accessaries}
+    subcategories = []
+    for _, row in chunk.iterrows():
+        if row['Category'] == 'Watches':
+            subcategories.append(stage.get_subcategory_watches(row['brand']))
+        elif row['Category'] in functions:
+            subcategories.append(functions[row['Category']](row['Title']))
+        else:
+            subcategories.append('Others')
+    return subcategories
+
+
+def sample_chunk(stage, size=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    keywords = sorted({keyword for rules in stage.SUBCATEGORY_RULES.values() for _, words in rules for keyword in words})
+    titles = [' '.join(rng.choice(keywords + ['gucci', 'Black', 'vintage'], rng.integers(0, 4))) for _ in range(size)]
+    brands = list(stage.WATCH_BRANDS) + ['TAG Heuer', 'Salvatore Ferragamo', 'Omegaa', 'Mont Blanc', 'Rolex',
+                                        'Seiko', '', None]
+    categories = list(stage.SUBCATEGORY_RULES) + ['Watches', 'Others', 'Unknown']
+    chunk = pd.DataFrame({'Category': rng.choice(categories, size),
+                          'Title': pd.Series(titles, dtype=object).where(rng.random(size) > 0.02),
+                          'brand': pd.Series(rng.choice(np.array(brands, dtype=object), size), dtype=object)})
+    # 청크는 이전 청크 뒤의 행이므로 0부터 시작하지 않는 인덱스
+    chunk.index = np.arange(size) + 10_000
+    return chunk
+
+
+def test_get_subcategories_matches_row_by_row(subcategory_stage):
+    chunk = sample_chunk(subcategory_stage)
+    expected = row_by_row(subcategory_stage, chunk)
+
+    result = subcategory_stage.get_subcategories(chunk)
+    assert result.index.equals(chunk.index)
+    assert result.tolist() == expected
+    assert subcategory_stage.get_subcategories(chunk, tokenize_titles(chunk['Title'])).tolist() == expected
+
+
+def test_watch_subcategories_by_brand(subcategory_stage):
+    brands = pd.Series(['Salvatore Ferragamo', 'TAG HEUER', 'Omegaa', 'Mont Blanc', 'Rolex', '', None], dtype=object)
+    assert subcategory_stage.get_watch_subcategories(brands).tolist() == [
+        'Ferragamo', 'Tag Heuer', 'Omega', 'Montblanc', 'Others', 'Others', 'Others']
+    assert [subcategory_stage.get_subcategory_watches(brand) for brand in brands] == \
+        subcategory_stage.get_watch_subcategories(brands).tolist()
@@ -0,0 +1,30 @@
+import pandas as pd
+
+from CG_run_pipeline import open_title_cache
+from CG_title_cache import lookup_titles, open_taxonomy_cache, title_keys
+
+
+def test_stage_and_pipeline_share_cache_version(tmp_path, category_stage, subcategory_stage):
+    stages = {'category': category_stage, 'subcategory': subcategory_stage}
+    pipeline_cache = open_title_cache(str(tmp_path / 'pipeline.sqlite'), stages)
+    stage_cache = open_taxonomy_cache(str(tmp_path / 'stage.sqlite'), category_stage.TAXONOMY)
+    assert pipeline_cache.version == stage_cache.version
+    pipeline_cache.close()
+    stage_cache.close()
+
+
+def test_lookup_titles(tmp_path, category_stage):
+    cache = open_taxonomy_cache(str(tmp_path / 'titles.sqlite'), category_stage.TAXONOMY)
+    stored = pd.Series(['Gucci Tote Bag', 'Rolex Submariner'])
+    cache.put_many(pd.DataFrame({'key': title_keys(stored), 'Category': ['Bags', 'Watches'],
+                                 'Subcategory': ['Tote Bags', None]}))
+
+    titles = pd.Series(['gucci  tote bag', 'Unknown item', 'Rolex Submariner'], index=[10, 11, 12])
+    cached = lookup_titles(cache, titles)
+    assert cached.index.equals(titles.index)
+    assert cached['found'].tolist() == [True, False, True]
+    assert cached.loc[10, 'Category'] == 'Bags' and cached.loc[10, 'Subcategory'] == 'Tote Bags'
+    assert pd.isna(cached.loc[12, 'Subcategory'])
+
+    assert not lookup_titles(None, titles)['found'].any()
+    cache.close()
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from CG_token_matrix import TokenMatrix, tokenize_titles
+
+
+def sample_titles(size=500, seed=0):
+    # 빈 행이 처음 / 중간 / 마지막에 모두 있도록
+    rng = np.random.default_rng(seed)
+    words = ['bag', 'Bag', 'watch', 'tote', 'shoes', 'black', 'gucci', 'x', '-']
+    titles = [' '.join(rng.choice(words, rng.integers(0, 5))) for _ in range(size)]
+    return pd.Series([''] + titles + [None, '   ', 'BAG bag Bag', ''], dtype=object)
+
+
+def row_tokens(titles):
+    return [set(str(title).lower().split()) if isinstance(title, str) else set() for title in titles]
+
+
+def test_tokenize_titles_rows():
+    titles = sample_titles()
+    matrix = tokenize_titles(titles)
+    assert len(matrix) == len(titles)
+    for row, tokens in enumerate(row_tokens(titles)):
+        ids = matrix.indices[matrix.indptr[row]:matrix.indptr[row + 1]]
+        assert list(ids) == sorted(set(ids))
+        assert set(matrix.vocabulary[ids]) == tokens
+
+
+def test_row_min_and_rows_with_any_match_naive():
+    titles = sample_titles()
+    matrix = tokenize_titles(titles, vocabulary=['unused', 'tote'])
+    rng = np.random.default_rng(1)
+    values = pd.Series(rng.integers(-5, 50, len(matrix.vocabulary)), index=matrix.vocabulary)
+    expected_min = [min((values[token] for token in tokens), default=99) for tokens in row_tokens(titles)]
+    assert matrix.row_min(values.to_numpy(), 99).tolist() == expected_min
+
+    for wanted in [['bag'], ['tote', 'x'], ['unused'], ['missing'], [], ['-', 'missing', 'watch']]:
+        expected_any = [bool(tokens & set(wanted)) for tokens in row_tokens(titles)]
+        assert matrix.rows_with_any(wanted).tolist() == expected_any
+
+    # 행을 골라낸 / 이어 붙인 / vocabulary를 줄인 행렬도 같은 결과
+    positions = rng.permutation(len(matrix))[:200]
+    assert matrix.take(positions).row_min(values.to_numpy(), 99).tolist() == [expected_min[p] for p in positions]
+    stacked = TokenMatrix.vstack([matrix.take(positions), matrix])
+    assert stacked.rows_with_any(['gucci']).tolist() == \
+        [bool('gucci' in tokens) for tokens in row_tokens(pd.concat([titles.iloc[positions], titles]))]
+    compact = matrix.compact()
+    assert compact.row_min(values.reindex(compact.vocabulary).to_numpy(), 99).tolist() == expected_min
+
+
+def test_row_min_all_rows_empty():
+    matrix = tokenize_titles(pd.Series(['', None, '  ']))
+    assert matrix.row_min(np.array([], dtype=np.int64), 7).tolist() == [7, 7, 7]
+    assert not matrix.rows_with_any(['bag']).any()
+    assert len(tokenize_titles(pd.Series([], dtype=object))) == 0
@@ -0,0 +1,318 @@
+"""
+브랜드명 표준화 모듈
+오타 / 표기 변형이 섞인 brand 문자열(Givency, Hermès, YSL 등)을 표준 브랜드명과 신뢰도로 변환
+Categorization(03_ Watches 하위 카테고리)과 Checktrend(Title 브랜드 추출)에서 공유
+(날짜 폴더가 바뀌어도 그대로 쓰도록 Categorization/common에 두고 sys.path에 추가해서 불러옴)
+
+- CG_brand_aliases.json: 표준 브랜드명과 별칭 목록 (정확히 일치하면 신뢰도 1.0)
+- 별칭 테이블에 없으면 SymSpell 방식 삭제 인덱스로 편집 거리 2 이내의 별칭을 찾음
+  (별칭마다 문자를 최대 2개 지운 문자열을 미리 색인 → 조회할 때도 지운 문자열만 찾아보고 후보만 거리 계산)
+- 7자 미만은 오타 보정을 하지 않음 (Pucci → Gucci, Carter → Cartier처럼 실제 다른 브랜드와 한 글자 차이)
+- 문자열 전체가 아니면 단어 묶음(최대 별칭 단어 수)으로도 확인 (예: 'OMEGA Speedmaster' → Omega)
+- 대량 변환(canonicalize)은 고유값만 한 번씩 계산하고 결과를 캐시
+- 상품 제목 같은 자유 텍스트는 find_alias로 별칭과 정확히 일치하는 단어 묶음만 찾음
+  (오타 보정 없음, common_words에 있는 일반 단어 별칭 'Channel' 등은 제외)
+
+다른 별칭 파일을 쓰려면 CG_BRAND_ALIASES 환경변수에 경로 지정
+"""
+
+import json
+import os
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BRAND_ALIASES_PATH = os.environ.get('CG_BRAND_ALIASES', os.path.join(SCRIPT_DIR, 'CG_brand_aliases.json'))
+
+# 편집 거리 허용 범위 (짧은 별칭은 오타 허용 시 다른 브랜드 / 단어와 겹치기 쉬움)
+MAX_EDIT_DISTANCE = 2
+MIN_FUZZY_LENGTH = 7
+# 신뢰도가 이 값 이하이면 표준 브랜드명 없음으로 처리
+MIN_CONFIDENCE = 0.8
+# 단어 묶음으로 찾았을 때의 신뢰도 배율 (문자열 전체 일치보다 낮게)
+CONTAINED_FACTOR = 0.9
+# 퍼지 조회는 이 길이까지만 (긴 문자열은 단어 묶음으로만 확인)
+MAX_FUZZY_QUERY_LENGTH = 32
+CACHE_SIZE = 1_000_000
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+def normalize_brand(value) -> str:
+    """
+    비교용 정규화: 악센트 제거, 소문자, 영문 / 숫자 외 문자는 공백 하나로 ('Hermès' → 'hermes', 'D&G' → 'd g')
+    """
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ''
+    text = unicodedata.normalize('NFKD', str(value))
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return _NON_ALNUM.sub(' ', text.casefold()).strip()
+
+
+def max_distance_for(length: int) -> int:
+    """
+    문자열 길이별 허용 편집 거리 (7자 미만: 0, 7자: 1, 8자 이상: MAX_EDIT_DISTANCE)
+    """
+    if length < MIN_FUZZY_LENGTH:
+        return 0
+    return 1 if length < 8 else MAX_EDIT_DISTANCE
+
+
+def _deletes(word: str, distance: int) -> Set[str]:
+    """
+    word에서 문자를 distance개 이하로 지운 문자열 전체 (word 포함)
+    """
+    result = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {item[:i] + item[i + 1:] for item in frontier for i in range(len(item))}
+        result |= frontier
+    return result
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    인접 문자 교환을 포함한 편집 거리 (OSA), max_distance를 넘으면 max_distance + 1
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+    return min(previous[-1], max_distance + 1)
+
+
+class BrandIndex:
+    """
+    별칭 테이블 + 삭제 인덱스 기반 브랜드명 표준화
+
+    사용 예:
+        index = load_brand_index()
+        index.resolve('Cartierr')                # ('Cartier', 0.875)
+        index.canonicalize(df['brand'])          # brand_canonical, brand_confidence DataFrame
+    """
+
+    def __init__(self, brands: Dict[str, List[str]], cache_size: int = CACHE_SIZE,
+                 common_words: List[str] = ()):
+        """
+        Args:
+            brands: {표준 브랜드명: 별칭 리스트}
+            cache_size: resolve 결과 캐시 최대 개수 (넘으면 비움)
+            common_words: 일반 단어이기도 한 별칭 (자유 텍스트의 find_alias에서는 브랜드로 보지 않음)
+        """
+        self.common_words = {normalize_brand(word) for word in common_words}
+        self.aliases: Dict[str, str] = {}
+        for name, aliases in brands.items():
+            for alias in [name] + list(aliases):
+                key = normalize_brand(alias)
+                if not key:
+                    continue
+                previous = self.aliases.get(key)
+                if previous is not None and previous != name:
+                    raise ValueError(f"별칭 '{alias}'이(가) '{previous}'와 '{name}'에 중복되어 있습니다.")
+                self.aliases[key] = name
+                # 공백 없이 붙여 쓴 표기 ('louisvuitton')도 같은 브랜드
+                self.aliases.setdefault(key.replace(' ', ''), name)
+
+        self.max_words = max(len(key.split()) for key in self.aliases)
+        self.deletes: Dict[str, List[str]] = {}
+        for key in self.aliases:
+            for deleted in _deletes(key, max_distance_for(len(key))):
+                self.deletes.setdefault(deleted, []).append(key)
+
+        self.cache_size = cache_size
+        self._cache: Dict[str, Tuple[Optional[str], float]] = {}
+
+    def _fuzzy(self, key: str) -> Tuple[Optional[str], float]:
+        """
+        편집 거리가 가장 가까운 별칭의 표준 브랜드명 (같은 거리에 다른 브랜드가 여럿이면 찾지 못한 것으로 처리)
+        """
+        distance = max_distance_for(len(key))
+        if distance == 0 or len(key) > MAX_FUZZY_QUERY_LENGTH:
+            return None, 0.0
+
+        best_distance, best, best_key = distance + 1, set(), ''
+        for deleted in _deletes(key, distance):
+            for alias in self.deletes.get(deleted, ()):
+                limit = min(distance, max_distance_for(len(alias)))
+                found = edit_distance(key, alias, limit)
+                if found > limit or found > best_distance:
+                    continue
+                if found < best_distance:
+                    best_distance, best, best_key = found, set(), ''
+                best.add(self.aliases[alias])
+                best_key = max(best_key, alias, key=len)
+        if len(best) != 1:
+            return None, 0.0
+        return best.pop(), 1.0 - best_distance / max(len(key), len(best_key))
+
+    def _windows(self, key: str) -> List[str]:
+        """
+        key의 단어 묶음 (최대 별칭 단어 수부터, 긴 묶음 / 앞쪽 위치 순)
+        """
+        words = key.split()
+        return [' '.join(words[start:start + size])
+                for size in range(min(self.max_words, len(words)), 0, -1)
+                for start in range(len(words) - size + 1)]
+
+    def _resolve_key(self, key: str) -> Tuple[Optional[str], float]:
+        if not key:
+            return None, 0.0
+        if key in self.aliases:
+            return self.aliases[key], 1.0
+
+        # 단어 묶음 정확히 일치 (긴 묶음, 앞쪽 위치 우선)
+        windows = [window for window in self._windows(key) if window != key]
+        for window in windows:
+            if window in self.aliases:
+                return self.aliases[window], CONTAINED_FACTOR
+
+        name, confidence = self._fuzzy(key)
+        if name is not None:
+            return name, confidence
+        for window in windows:
+            name, confidence = self._fuzzy(window)
+            if name is not None:
+                return name, confidence * CONTAINED_FACTOR
+        return None, 0.0
+
+    def resolve(self, value, min_confidence: float = MIN_CONFIDENCE) -> Tuple[Optional[str], float]:
+        """
+        brand 문자열 하나를 표준 브랜드명으로 변환
+
+        Args:
+            value: brand 문자열 (NaN / 빈 값 가능)
+            min_confidence: 신뢰도가 이 값 이하이면 (None, 신뢰도) 반환
+
+        Returns:
+            (표준 브랜드명 또는 None, 신뢰도 0 ~ 1)
+        """
+        key = normalize_brand(value)
+        result = self._cache.get(key)
+        if result is None:
+            result = self._resolve_key(key)
+            if len(self._cache) >= self.cache_size:
+                self._cache.clear()
+            self._cache[key] = result
+        name, confidence = result
+        return (name if confidence > min_confidence else None), round(confidence, 4)
+
+    def find_alias(self, text) -> Optional[str]:
+        """
+        상품 제목 같은 자유 텍스트에서 별칭과 정확히 일치하는 단어 묶음의 표준 브랜드명 (오타 보정 없음)
+
+        자유 텍스트의 단어 묶음에 오타 보정을 하면 일반 단어가 브랜드로 바뀌므로
+        별칭 테이블에 있는 표기만 인정하고, 일반 단어이기도 한 별칭(common_words, 'channel' 등)은 제외
+
+        Returns:
+            표준 브랜드명 (없으면 None)
+        """
+        for window in self._windows(normalize_brand(text)):
+            if window in self.aliases and window not in self.common_words:
+                return self.aliases[window]
+        return None
+
+    def canonicalize(self, values: pd.Series, min_confidence: float = MIN_CONFIDENCE) -> pd.DataFrame:
+        """
+        brand 칼럼 전체를 표준 브랜드명으로 변환 (고유값만 한 번씩 계산)
+
+        Args:
+            values: brand 칼럼
+            min_confidence: 신뢰도가 이 값 이하이면 brand_canonical은 NaN
+
+        Returns:
+            values와 같은 index의 brand_canonical, brand_confidence DataFrame
+        """
+        codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        resolved = [self.resolve(value, min_confidence) for value in uniques]
+        names = pd.Series([name for name, _ in resolved] + [None], dtype=object)
+        confidences = pd.Series([confidence for _, confidence in resolved] + [0.0], dtype='float64')
+        # NaN은 코드 -1 → 마지막에 붙인 (None, 0.0)
+        return pd.DataFrame({
+            'brand_canonical': names.to_numpy()[codes],
+            'brand_confidence': confidences.to_numpy()[codes],
+        }, index=values.index)
+
+
+def read_brand_aliases(path: str = BRAND_ALIASES_PATH) -> Dict[str, List[str]]:
+    """
+    별칭 파일 읽기
+
+    Returns:
+        {표준 브랜드명: 별칭 리스트}
+    """
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+    return {brand['name']: brand.get('aliases', []) for brand in config['brands']}
+
+
+def read_common_words(path: str = BRAND_ALIASES_PATH) -> List[str]:
+    """
+    별칭 파일의 common_words (일반 단어이기도 한 별칭, 없으면 빈 리스트)
+    """
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+    return config.get('common_words', [])
+
+
+@lru_cache(maxsize=None)
+def load_brand_index(path: str = BRAND_ALIASES_PATH) -> BrandIndex:
+    """
+    별칭 파일로 인덱스 생성 (같은 경로는 프로세스당 한 번만)
+    """
+    return BrandIndex(read_brand_aliases(path), common_words=read_common_words(path))
+
+
+# 실제로 다른 브랜드라 표준 브랜드명으로 바꾸면 안 되는 값 / 바꿔야 하는 오타 (python CG_brand_index.py로 확인)
+REGRESSION_CASES = [
+    ('Pucci', None), ('Emilio Pucci', None), ('Carter', None), ('Cucci', None), ('Lucci', None),
+    ('Gucci', 'Gucci'), ('Cartierr', 'Cartier'), ('Tag Hauer', 'Tag Heuer'), ('Breitlng', 'Breitling'),
+    ('OMEGA Speedmaster', 'Omega'), ('Hermès', 'Hermes'),
+]
+# 자유 텍스트(상품 제목)에서 find_alias로 찾아야 하는 / 찾으면 안 되는 브랜드
+TEXT_REGRESSION_CASES = [
+    ('4 channel audio mixer bag', None), ('Cheap channel bag', None),
+    ('Authentic LOUIS VUITTON Speedy 30', 'Louis Vuitton'), ('Yves Saint Laurent clutch', 'Saint Laurent'),
+    ('Givency Antigona tote', 'Givenchy'), ('Vintage LV Speedy', 'Louis Vuitton'),
+]
+
+
+def check_regressions(index: BrandIndex) -> List[str]:
+    """
+    REGRESSION_CASES 확인
+
+    Returns:
+        기대값과 다른 경우의 설명 리스트 (모두 맞으면 빈 리스트)
+    """
+    failures = []
+    for value, expected in REGRESSION_CASES:
+        name, confidence = index.resolve(value)
+        if name != expected:
+            failures.append(f"{value!r}: {name!r} ({confidence}) - 기대값 {expected!r}")
+    for text, expected in TEXT_REGRESSION_CASES:
+        name = index.find_alias(text)
+        if name != expected:
+            failures.append(f"{text!r}: {name!r} (find_alias) - 기대값 {expected!r}")
+    return failures
+
+
+if __name__ == "__main__":
+    failures = check_regressions(load_brand_index())
+    for failure in failures:
+        print(f"실패: {failure}")
+    total = len(REGRESSION_CASES) + len(TEXT_REGRESSION_CASES)
+    print(f"브랜드 변환 확인: {total - len(failures)}/{total} 통과")
+    raise SystemExit(1 if failures else 0)
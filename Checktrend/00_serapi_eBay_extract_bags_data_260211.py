@@ -9,6 +9,11 @@ from serpapi import GoogleSearch
 from datetime import datetime
 import time
 import re
+import sys
+
+# 브랜드 별칭 / 오타 보정은 Categorization과 같은 브랜드 표준화 인덱스 사용 (CG_brand_aliases.json)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Categorization', 'common'))
+from CG_brand_index import load_brand_index
 
 # Serapi API 키 설정 (환경변수 또는 직접 입력)
 API_KEY = os.getenv('SERPAPI_KEY', 'd266baa616db5d4f6a54863181fb1578c4eb6e2aa2888610f77155199b31b36c')
@@ -48,6 +53,10 @@ LUXURY_BRANDS = [
     'Goyard'
 ]
 
+BRAND_INDEX = load_brand_index()
+# 리스트 브랜드의 대표 브랜드명 (오타 보정 결과도 이 안에서만 인정)
+CANONICAL_BRANDS = {BRAND_INDEX.resolve(brand)[0] or brand for brand in LUXURY_BRANDS}
+
 # 통합 검색 키워드 (전체 시장 데이터 수집용)
 SEARCH_KEYWORDS = [
     'luxury designer bag authentic',
@@ -64,19 +73,13 @@ def extract_brand_from_title(title):
 
     for brand in sorted_brands:
         if brand.lower() in title_lower:
-            # 원본 브랜드명 중 가장 대표적인 것으로 통일
-            if brand.lower() in ['ysl', 'yves saint laurent']:
-                return 'Saint Laurent'
-            elif brand.lower() in ['hermès']:
-                return 'Hermes'
-            elif brand.lower() in ['dolce gabbana', 'dolce & gabbana']:
-                return 'Dolce & Gabbana'
-            elif brand.lower() in ['ferragamo']:
-                return 'Salvatore Ferragamo'
-            else:
-                return brand
-
-    return 'Other'
+            # 원본 브랜드명 중 가장 대표적인 것으로 통일 (YSL → Saint Laurent, Hermès → Hermes 등)
+            return BRAND_INDEX.resolve(brand)[0] or brand
+
+    # 리스트 표기와 다른 별칭 / 별칭 파일에 등록된 오타 (예: 'Givency' → Givenchy)
+    # 제목의 일반 단어를 오타 보정하면 다른 브랜드가 되므로 ('4 channel mixer bag' → Chanel) 정확히 일치하는 별칭만
+    canonical = BRAND_INDEX.find_alias(title)
+    return canonical if canonical in CANONICAL_BRANDS else 'Other'
 
 def extract_color_from_title(title):
     """상품 제목에서 색상 추출"""